@@ -0,0 +1,61 @@
+"""
+    Benchmark Fixture
+
+    configuration and employee information shared by every benchmark, kept
+    apart from the test suite so benchmark does not depend on it
+"""
+BPJS_CONFIGURATION = {
+    "health_max_fee"                    : 8000000,
+    "pension_max_fee"                   : 8094000,
+    "old_pension_max_fee"               : 7703500,
+    "individual_health_insurance_rate"  : 0.01,
+    "company_health_insurance_rate"     : 0.04,
+    "death_insurance_rate"              : 0.003,
+    "individual_old_age_insurance_rate" : 0.02,
+    "company_old_age_insurance_rate"    : 0.037,
+    "individual_pension_insurance_rate" : 0.01,
+    "company_pension_insurance_rate"    : 0.02,
+}
+
+CONFIGURATION = dict(BPJS_CONFIGURATION, **{
+    "max_occupation_support" : 6000000,
+    "occupation_support_rate": 0.05,
+    "tax_exemption_grade"    : {
+        "SINGLE"    : 54000000,
+        "MARRIED"   : 58500000,
+        "MARRIED_CI": 112500000,
+        "PERSON"    : 4500000
+    },
+    "pph_grade_rate" : {
+        "first" : 0.05,
+        "second": 0.15,
+        "third" : 0.25,
+        "fourth": 0.30
+    },
+    "pph_grade_range" : {
+        "first" : 50000000,
+        "second": 250000000,
+        "third" : 500000000
+    }
+})
+
+EMPLOYEE_INFO = {
+    "base_salary"          : 8000000,
+    "fixed_allowances"     : 0,
+    "non_fixed_allowances" : 0,
+    "overtime_allowances"  : 0,
+    "bonus_allowances"     : 0,
+    "start_work_date"      : "01/01/2018",
+    "end_work_date"        : "01/12/2018",
+    "tax_method"           : "GROSS",
+    "npwp_status"          : True,
+    "marital_status"       : "SINGLE",
+    "dependents"           : 0,
+    "is_salary_allowances"      : True,
+    "accident_insurance_status" : True,
+    "pension_insurance_status"  : True,
+    "old_age_insurance_status"  : True,
+    "death_insurance_status"    : True,
+    "health_insurance_status"   : True,
+    "industry_risk_rate"        : 0.24
+}
@@ -0,0 +1,77 @@
+"""
+    Import Time Benchmark
+
+    measure how long importing the package take in a fresh interpreter using
+    python -X importtime, short lived worker pay it on every start
+
+    usage : python -m benchmarks.importtime [statement]
+"""
+import os
+import subprocess
+import sys
+
+# run from the repository root so the package in the tree is imported
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_STATEMENT = "from tax_bpjs import Tax"
+
+def parse(output, package="tax_bpjs"):
+    """
+        Function to read python -X importtime output
+
+        Args:
+            output (string): stderr of the interpreter
+            package (string): package to measure
+
+        Returns:
+            modules (list) : (module, self microseconds, cumulative microseconds)
+            of every module of the package imported at the top level
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        #end if
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        # the name is indented by two spaces for every nesting level
+        name = name[1:]
+        if not self_time.strip().isdigit() or name.startswith(" "):
+            # header or module imported by another module
+            continue
+        #end if
+        name = name.rstrip()
+        if name == package or name.startswith(package + "."):
+            modules.append((name, int(self_time), int(cumulative)))
+        #end if
+    #end for
+    return modules
+#end def
+
+def measure(statement=DEFAULT_STATEMENT, package="tax_bpjs"):
+    """
+        Function to measure import time of a statement in a fresh interpreter
+
+        Args:
+            statement (string): python statement importing the package
+            package (string): package to measure
+
+        Returns:
+            seconds (float) : cumulative import time of the package
+            modules (list) : result of parse
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                               cwd=ROOT, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, universal_newlines=True,
+                               check=True)
+    modules = parse(completed.stderr, package)
+    return sum(cumulative for _, _, cumulative in modules) / 1e6, modules
+#end def
+
+if __name__ == "__main__":
+    STATEMENT = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_STATEMENT
+    SECONDS, MODULES = measure(STATEMENT)
+    for MODULE, SELF_TIME, CUMULATIVE in MODULES:
+        print("{:32} {:8d} us {:8d} us cumulative".format(MODULE, SELF_TIME, CUMULATIVE))
+    #end for
+    print("{:32} {:8.1f} ms".format(STATEMENT, SECONDS * 1000))
+#end if
@@ -0,0 +1,86 @@
+"""
+    Memory Benchmark
+
+    measure memory needed to keep one month of calculation result for every
+    employee, using the dictionary the calculator used to return (before) and
+    the slotted record (after)
+
+    usage : python -m benchmarks.memory [employees]
+"""
+import sys
+import gc
+import tracemalloc
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.records import Employee
+from tax_bpjs.configuration import CompiledConfiguration
+from benchmarks.fixtures import CONFIGURATION, EMPLOYEE_INFO
+
+def employees(size):
+    """ generate employee information with different salary """
+    for index in range(size):
+        yield dict(EMPLOYEE_INFO, base_salary=4000000 + (index % 500) * 10000)
+    #end for
+#end def
+
+def keep_dictionary(size, configuration):
+    """ result kept as dictionary (before) """
+    results = []
+    for employee_information in employees(size):
+        calculated_tax, deduction = Tax(employee_information,
+                                        configuration).calculate_tax(0, 0)
+        results.append((employee_information, calculated_tax.to_dict(),
+                        deduction.to_dict()))
+    #end for
+    return results
+#end def
+
+def keep_record(size, configuration):
+    """ result kept as record (after) """
+    results = []
+    for employee_information in employees(size):
+        employee = Employee.from_dict(employee_information)
+        calculated_tax, deduction = Tax(employee, configuration).calculate_tax(0, 0)
+        results.append((employee, calculated_tax, deduction))
+    #end for
+    return results
+#end def
+
+def measure(function, size, configuration):
+    """
+        Function to measure memory kept by the result of function
+
+        Returns:
+            per_employee (float) : bytes kept for every employee
+    """
+    gc.collect()
+    tracemalloc.start()
+    results = function(size, configuration)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return current / size
+#end def
+
+def run(size=10000):
+    """
+        run the benchmark
+
+        Returns:
+            result (dictionary) : bytes per employee before and after
+    """
+    configuration = CompiledConfiguration.compile(CONFIGURATION)
+    return {
+        "dictionary_bytes_per_employee" : measure(keep_dictionary, size, configuration),
+        "record_bytes_per_employee"     : measure(keep_record, size, configuration),
+    }
+#end def
+
+if __name__ == "__main__":
+    SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    RESULT = run(SIZE)
+    for key, value in RESULT.items():
+        print("{:32} {:10.0f}".format(key, value))
+    #end for
+    print("{:32} {:10.1%}".format("saved", 1 - RESULT["record_bytes_per_employee"] /
+                                  RESULT["dictionary_bytes_per_employee"]))
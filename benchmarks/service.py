@@ -0,0 +1,116 @@
+"""
+    Tax Service Load Test
+
+    concurrent client send single employee query, every client wait for its
+    answer before sending the next one. Each request either calculate the
+    tax by itself (direct) or go through the micro batching TaxService
+
+    usage : python -m benchmarks.service [requests] [concurrency]
+"""
+import asyncio
+import sys
+import time
+
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.service import TaxService, quote
+
+from benchmarks.workforce import Workforce
+
+def percentile(values, fraction):
+    """
+        Function to find the percentile of sorted values
+
+        Args:
+            values (list): sorted values
+            fraction (float): 0.5 for p50, 0.99 for p99
+
+        Returns:
+            value (float) : the percentile
+    """
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return values[index]
+#end def
+
+async def _load(handler, employees, concurrency):
+    """
+        Function to send every employee using concurrent client
+
+        Returns:
+            latencies (list) : seconds of every request
+            elapsed (float) : seconds of the whole load
+    """
+    latencies = []
+    requests = iter(employees)
+
+    async def client():
+        for employee_information in requests:
+            started = time.perf_counter()
+            await handler(employee_information)
+            latencies.append(time.perf_counter() - started)
+        #end for
+    #end def
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+#end def
+
+def load_test(handler, employees, concurrency):
+    """
+        run a load test
+
+        Args:
+            handler (coroutine function): answer one employee
+            employees (list): employee information of every request
+            concurrency (int): concurrent client
+
+        Returns:
+            result (dictionary) : p50_ms, p99_ms, throughput (request per second)
+    """
+    latencies, elapsed = asyncio.run(_load(handler, employees, concurrency))
+    latencies.sort()
+    return {
+        "p50_ms"     : percentile(latencies, 0.5) * 1000,
+        "p99_ms"     : percentile(latencies, 0.99) * 1000,
+        "throughput" : len(latencies) / elapsed,
+    }
+#end def
+
+def run(requests=20000, concurrency=200):
+    """
+        run the load test
+
+        Returns:
+            result (dictionary) : direct and service result
+    """
+    workforce = Workforce(requests)
+    configuration = CompiledConfiguration.compile(workforce.configuration)
+    employees = list(workforce)
+
+    async def direct(employee_information):
+        # let the other client queue like a web server would
+        await asyncio.sleep(0)
+        return quote(employee_information, configuration)
+    #end def
+
+    service = {}
+    async def batched(employee_information):
+        if "service" not in service:
+            service["service"] = TaxService(configuration)
+        #end if
+        return await service["service"].quote(employee_information)
+    #end def
+
+    return {
+        "direct"  : load_test(direct, employees, concurrency),
+        "service" : load_test(batched, employees, concurrency),
+    }
+#end def
+
+if __name__ == "__main__":
+    ARGUMENTS = [int(value) for value in sys.argv[1:3]]
+    for name, result in run(*ARGUMENTS).items():
+        print("{:<8} p50 {:8.3f} ms  p99 {:8.3f} ms  {:10.0f} request/s".format(
+            name, result["p50_ms"], result["p99_ms"], result["throughput"]))
+    #end for
+#end if
@@ -0,0 +1,394 @@
+"""
+    Benchmark Suite
+
+    usage :
+        python -m benchmarks --size 100k --output result.json
+        python -m benchmarks --size 100k --compare baseline.json --threshold 0.1
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from collections import OrderedDict
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.cache import ResultCache
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.grossup import gross_up_batch
+from tax_bpjs.money import DecimalBpjs, DecimalTax, IntegerBpjs, IntegerTax
+
+from benchmarks.importtime import measure as measure_import
+from benchmarks.workforce import Workforce
+
+BENCHMARKS = OrderedDict()
+
+def benchmark(name, requires=None, per_employee=True, passes=1):
+    """
+        Decorator to register a benchmark, a benchmark that measure itself
+        (ex : import time) return its seconds instead of being timed
+
+        Args:
+            name (string): benchmark name
+            requires (string): module that must be importable to run it
+            per_employee (bool): False when the cost does not grow with the
+                workforce (ex : import time), reported as absolute seconds
+            passes (int): number of time the benchmark calculate the whole
+                workforce
+    """
+    def register(function):
+        BENCHMARKS[name] = (function, requires, per_employee, passes)
+        return function
+    #end def
+    return register
+#end def
+
+@benchmark("import.tax", per_employee=False)
+def bench_import_tax(workforce, configuration):
+    """ from tax_bpjs import Tax in a fresh interpreter, -X importtime """
+    return measure_import("from tax_bpjs import Tax")[0]
+#end def
+
+@benchmark("import.bpjs", per_employee=False)
+def bench_import_bpjs(workforce, configuration):
+    """ from tax_bpjs import Bpjs in a fresh interpreter, -X importtime """
+    return measure_import("from tax_bpjs import Bpjs")[0]
+#end def
+
+@benchmark("bpjs.monthly_fee")
+def bench_monthly_fee(workforce, configuration):
+    """ Bpjs.monthly_fee """
+    for employee_information in workforce:
+        Bpjs(employee_information, configuration).monthly_fee()
+    #end for
+#end def
+
+def _annual_fee(workforce, configuration, year):
+    """ Bpjs.annual_fee for 1 - 12 working months """
+    working_months = 0
+    for employee_information in workforce:
+        working_months = working_months % 12 + 1
+        Bpjs(employee_information, configuration).annual_fee(working_months, year)
+    #end for
+#end def
+
+@benchmark("bpjs.annual_fee.2018")
+def bench_annual_fee_2018(workforce, configuration):
+    """ Bpjs.annual_fee in 2018 (old pension max fee) """
+    _annual_fee(workforce, configuration, 2018)
+#end def
+
+@benchmark("bpjs.annual_fee.2019")
+def bench_annual_fee_2019(workforce, configuration):
+    """ Bpjs.annual_fee after 2018 """
+    _annual_fee(workforce, configuration, 2019)
+#end def
+
+@benchmark("tax.working_months")
+def bench_working_months(workforce, configuration):
+    """ Tax.working_months """
+    working_months = Tax.working_months
+    for employee_information in workforce:
+        working_months(employee_information["start_work_date"],
+                       employee_information["end_work_date"])
+    #end for
+#end def
+
+@benchmark("tax.annual_tax")
+def bench_annual_tax(workforce, configuration):
+    """ Tax.annual_tax """
+    for employee_information in workforce:
+        tax = Tax(employee_information, configuration)
+        tax.annual_tax(tax.base_salary, tax.overtime_allowances,
+                       tax.non_fixed_allowances, tax.bonus_allowances)
+    #end for
+#end def
+
+@benchmark("tax.calculate_tax")
+def bench_calculate_tax(workforce, configuration):
+    """ Tax.calculate_tax without bonus """
+    for employee_information in workforce:
+        Tax(employee_information, configuration).calculate_tax(0, 0)
+    #end for
+#end def
+
+@benchmark("tax.calculate_tax.dict")
+def bench_calculate_tax_dict(workforce, configuration):
+    """ Tax.calculate_tax passing the configuration dictionary like the README """
+    configuration = workforce.configuration
+    for employee_information in workforce:
+        Tax(employee_information, configuration).calculate_tax(0, 0)
+    #end for
+#end def
+
+@benchmark("tax.calculate_tax.bonus")
+def bench_calculate_tax_bonus(workforce, configuration):
+    """ Tax.calculate_tax with bonus compared to the last annual tax """
+    for employee_information in workforce:
+        tax = Tax(employee_information, configuration)
+        tax.bonus_allowances = tax.base_salary
+        tax.calculate_tax(1000000, 1000000)
+    #end for
+#end def
+
+@benchmark("tax.calculate_tax.cache")
+def bench_calculate_tax_cache(workforce, configuration):
+    """ Tax.calculate_tax sharing a ResultCache """
+    cache = ResultCache()
+    for employee_information in workforce:
+        Tax(employee_information, configuration, cache=cache).calculate_tax(0, 0)
+    #end for
+#end def
+
+@benchmark("tax.gross_up")
+def bench_gross_up(workforce, configuration):
+    """ gross up tax allowance for NETT tax method """
+    for _ in gross_up_batch(workforce, configuration):
+        pass
+    #end for
+#end def
+
+@benchmark("money.monthly_fee.integer")
+def bench_monthly_fee_integer(workforce, configuration):
+    """ Bpjs.monthly_fee in integer money mode """
+    for employee_information in workforce:
+        IntegerBpjs(employee_information, configuration).monthly_fee()
+    #end for
+#end def
+
+@benchmark("money.monthly_fee.decimal")
+def bench_monthly_fee_decimal(workforce, configuration):
+    """ Bpjs.monthly_fee in Decimal money mode """
+    for employee_information in workforce:
+        DecimalBpjs(employee_information, configuration).monthly_fee()
+    #end for
+#end def
+
+@benchmark("money.calculate_tax.integer")
+def bench_calculate_tax_integer(workforce, configuration):
+    """ Tax.calculate_tax in integer money mode """
+    for employee_information in workforce:
+        IntegerTax(employee_information, configuration).calculate_tax(0, 0)
+    #end for
+#end def
+
+@benchmark("money.calculate_tax.decimal")
+def bench_calculate_tax_decimal(workforce, configuration):
+    """ Tax.calculate_tax in Decimal money mode """
+    for employee_information in workforce:
+        DecimalTax(employee_information, configuration).calculate_tax(0, 0)
+    #end for
+#end def
+
+@benchmark("bpjs.monthly_fee_batch", requires="numpy")
+def bench_monthly_fee_batch(workforce, configuration, columns):
+    """ Bpjs.monthly_fee_batch """
+    Bpjs.monthly_fee_batch(columns, configuration)
+#end def
+
+INDEX_PASSES = 4
+
+@benchmark("bpjs.monthly_fee_batch.index", requires="numpy", passes=INDEX_PASSES)
+def bench_monthly_fee_batch_index(workforce, configuration, columns):
+    """ Bpjs.monthly_fee_batch with a combination index built once per payroll """
+    from tax_bpjs.batch import combination_index
+    index = combination_index(columns)
+    for _ in range(INDEX_PASSES):
+        Bpjs.monthly_fee_batch(columns, configuration, index)
+    #end for
+#end def
+
+@benchmark("tax.annual_tax_batch", requires="numpy")
+def bench_annual_tax_batch(workforce, configuration, columns):
+    """ Tax.annual_tax_batch, compare with tax.annual_tax """
+    Tax.annual_tax_batch(columns, configuration)
+#end def
+
+@benchmark("whatif.scenarios", requires="numpy")
+def bench_what_if(workforce, configuration, columns):
+    """ WhatIf with 4 scenario, 2 of them only change the tax """
+    from tax_bpjs.whatif import what_if
+    what_if(columns, configuration, {
+        "health_max_fee"  : {"health_max_fee" : 12000000},
+        "pension_max_fee" : {"pension_max_fee" : 9000000},
+        "pph_grade_range" : {"pph_grade_range" : {"first" : 60000000, "second" : 250000000,
+                                                  "third" : 500000000}},
+        "pph_grade_rate"  : {"pph_grade_rate" : {"first" : 0.05, "second" : 0.15,
+                                                 "third" : 0.25, "fourth" : 0.35}},
+    })
+#end def
+
+def _available(module):
+    """ check whether the module can be imported """
+    if module is None:
+        return True
+    #end if
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    #end try
+    return True
+#end def
+
+def run(size="1k", repeat=3, names=None, seed=0):
+    """
+        run the benchmark
+
+        Args:
+            size (int / string): number of employee
+            repeat (int): every benchmark is repeated, the best time is kept
+            names (list): benchmark to run, default to every benchmark
+            seed (int): random seed of the workforce
+
+        Returns:
+            result (dictionary) : machine readable result
+    """
+    workforce = Workforce(size, seed)
+    configuration = CompiledConfiguration.compile(workforce.configuration)
+    columns = None
+
+    results = OrderedDict()
+    for name, (function, requires, per_employee, passes) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        #end if
+        if not _available(requires):
+            continue
+        #end if
+        arguments = (workforce, configuration)
+        if requires == "numpy":
+            if columns is None:
+                columns = workforce.columns()
+            #end if
+            arguments = arguments + (columns,)
+        #end if
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            measured = function(*arguments)
+            elapsed = time.perf_counter() - started
+            if isinstance(measured, (int, float)):
+                elapsed = measured
+            #end if
+            timings.append(elapsed)
+        #end for
+        best = min(timings)
+        if not per_employee:
+            results[name] = {
+                "seconds"            : best,
+                "employees"          : None,
+                "ns_per_employee"    : None,
+                "employees_per_second": None,
+            }
+            continue
+        #end if
+        employees = len(workforce) * passes
+        results[name] = {
+            "seconds"            : best,
+            "employees"          : employees,
+            "ns_per_employee"    : best / employees * 1e9,
+            "employees_per_second": employees / best if best else None,
+        }
+    #end for
+    return {
+        "meta" : {
+            "size"     : len(workforce),
+            "repeat"   : repeat,
+            "python"   : platform.python_version(),
+            "platform" : platform.platform(),
+        },
+        "results" : results,
+    }
+#end def
+
+def compare(current, baseline, threshold=0.1):
+    """
+        Function to compare benchmark result against a baseline
+
+        Args:
+            current (dictionary): result of run
+            baseline (dictionary): result of run from another commit
+            threshold (float): allowed slow down, 0.1 means 10% slower
+
+        Returns:
+            regressions (list) : (name, baseline, current, change, unit) where
+                unit is "ns/employee", or "ms" for absolute benchmark
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        #end if
+        if result["ns_per_employee"] is None:
+            # absolute benchmark, compare its own time whatever the size
+            before = baseline["results"][name]["seconds"] * 1e3
+            after = result["seconds"] * 1e3
+            unit = "ms"
+        else:
+            before = baseline["results"][name]["ns_per_employee"]
+            after = result["ns_per_employee"]
+            unit = "ns/employee"
+        #end if
+        change = after / before - 1 if before else 0.0
+        if change > threshold:
+            regressions.append((name, before, after, change, unit))
+        #end if
+    #end for
+    return regressions
+#end def
+
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(prog="benchmarks")
+    parser.add_argument("--size", default="1k", help="workforce size, ex : 1k, 100k, 1M")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", help="benchmark name to run")
+    parser.add_argument("--output", help="write the result as JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slow down before failing, 0.1 means 10%%")
+    parser.add_argument("--list", action="store_true", help="list benchmark")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        #end for
+        return 0
+    #end if
+
+    result = run(args.size, args.repeat, args.only, args.seed)
+    for name, value in result["results"].items():
+        if value["ns_per_employee"] is None:
+            print("{:28} {:12.1f} ms".format(name, value["seconds"] * 1e3))
+            continue
+        #end if
+        print("{:28} {:12.0f} ns/employee {:12.0f} employees/s".format(
+            name, value["ns_per_employee"], value["employees_per_second"] or 0))
+    #end for
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+        #end with
+    #end if
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        #end with
+        regressions = compare(result, baseline, args.threshold)
+        for name, before, after, change, unit in regressions:
+            print("REGRESSION {} : {:.1f} -> {:.1f} {} ({:+.1%})".format(
+                name, before, after, unit, change))
+        #end for
+        if regressions:
+            return 1
+        #end if
+    #end if
+    return 0
+#end def
@@ -0,0 +1,124 @@
+"""
+    Synthetic Workforce
+"""
+import random
+from itertools import cycle, islice
+
+from benchmarks.fixtures import CONFIGURATION
+
+# distinct employee generated, bigger workforce repeat them
+POOL_SIZE = 4096
+
+MARITAL_STATUS = ("SINGLE", "MARRIED", "MARRIED_CI")
+INDUSTRY_RISK_RATE = (0.24, 0.54, 0.89, 1.27, 1.74)
+
+def parse_size(size):
+    """
+        Function to convert 1k / 100k / 1M into number
+
+        Args:
+            size (string / int): workforce size
+
+        Returns:
+            size (int) : number of employee
+    """
+    if isinstance(size, int):
+        return size
+    #end if
+    text = size.strip().lower()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1000000, text[:-1]
+    #end if
+    return int(float(text) * multiplier)
+#end def
+
+def employee(generator, year=2019):
+    """
+        Function to generate one employee
+
+        Args:
+            generator (Random): random generator
+            year (int): working year
+
+        Returns:
+            employee_information (dictionary) : employee information
+    """
+    start_month = generator.choice((1, 1, 1, 1, 3, 6, 9))
+    return {
+        "base_salary"          : generator.randrange(3000000, 40000000, 50000),
+        "fixed_allowances"     : {
+            "transport" : generator.randrange(0, 1500000, 50000),
+            "meal"      : generator.randrange(0, 1000000, 50000),
+        },
+        "non_fixed_allowances" : {
+            "living" : generator.randrange(0, 2000000, 50000),
+        },
+        "overtime_allowances"  : generator.randrange(0, 1000000, 10000),
+        "bonus_allowances"     : 0,
+        "start_work_date"      : "01/{:02d}/{}".format(start_month, year),
+        "end_work_date"        : "01/12/{}".format(year),
+        "tax_method"           : "GROSS",
+        "npwp_status"          : generator.random() > 0.1,
+        "marital_status"       : generator.choice(MARITAL_STATUS),
+        "dependents"           : generator.randrange(0, 5),
+        "is_salary_allowances"      : generator.random() > 0.5,
+        "accident_insurance_status" : True,
+        "pension_insurance_status"  : generator.random() > 0.1,
+        "old_age_insurance_status"  : True,
+        "death_insurance_status"    : True,
+        "health_insurance_status"   : True,
+        "industry_risk_rate"        : generator.choice(INDUSTRY_RISK_RATE),
+    }
+#end def
+
+class Workforce:
+    """ deterministic synthetic workforce """
+
+    def __init__(self, size, seed=0, year=2019):
+        """
+        Args:
+            size (int / string): number of employee (ex : 1000, "100k", "1M")
+            seed (int): random seed
+            year (int): working year
+        """
+        self.size = parse_size(size)
+        self.year = year
+        generator = random.Random(seed)
+        self.pool = [employee(generator, year) for _ in range(min(self.size, POOL_SIZE))]
+        self.configuration = CONFIGURATION
+    #end def
+
+    def __len__(self):
+        return self.size
+    #end def
+
+    def __iter__(self):
+        return islice(cycle(self.pool), self.size)
+    #end def
+
+    def columns(self):
+        """
+            Function to convert the workforce into columns (require numpy)
+
+            Returns:
+                columns (dictionary) : column name -> array with length of size
+        """
+        import numpy as np
+        from tax_bpjs.bpjs import Bpjs
+
+        columns = {}
+        for key in self.pool[0]:
+            values = [employee_information[key] for employee_information in self.pool]
+            if isinstance(values[0], dict):
+                values = [Bpjs.summarize(value) for value in values]
+            #end if
+            column = np.asarray(values)
+            repeat = -(-self.size // len(column))
+            columns[key] = np.tile(column, repeat)[:self.size]
+        #end for
+        return columns
+    #end def
+#end class
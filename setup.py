@@ -13,12 +13,22 @@ setup(name='tax_bpjs',
       author='Kelvin Desman',
       author_email='kelvindsmn@gmail.com',
       license='MIT',
-      packages=find_packages(),
+      packages=find_packages(exclude=["benchmarks"]),
       zip_safe=False,
       classifiers=[
           "Programming Language :: Python :: 3",
           "License :: OSI Approved :: MIT License",
           "Operating System :: OS Independent",
       ],
-      install_requires=["python-dateutil"],
+      install_requires=[],
+      extras_require={
+          "batch": ["numpy"],
+          "parquet": ["numpy", "pyarrow"],
+      },
+      entry_points={
+          "console_scripts": [
+              "tax-bpjs-stream=tax_bpjs.stream:main",
+              "tax-bpjs-parquet=tax_bpjs.columnar:main",
+          ],
+      },
       python_requires='>=3')
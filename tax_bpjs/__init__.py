@@ -0,0 +1,31 @@
+"""
+    Tax & BPJS Calculation
+
+    Bpjs, Tax, CompiledConfiguration and Employee are imported on first
+    use, importing the package alone doesn't import the calculator.
+"""
+# public name -> module defining it
+_LAZY = {
+    "Bpjs"                  : "tax_bpjs.bpjs",
+    "Tax"                   : "tax_bpjs.tax",
+    "CompiledConfiguration" : "tax_bpjs.configuration",
+    "Employee"              : "tax_bpjs.records",
+}
+
+__all__ = tuple(_LAZY)
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    #end if
+    # __import__ instead of importlib so -X importtime report it too
+    value = getattr(__import__(module, fromlist=(name,)), name)
+    # the next access doesn't go through __getattr__
+    globals()[name] = value
+    return value
+#end def
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+#end def
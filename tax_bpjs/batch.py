@@ -0,0 +1,962 @@
+"""
+    Batch BPJS Calculator
+"""
+from collections import namedtuple
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover
+    np = None
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.records import EMPLOYEE_FIELDS
+
+FLAG_COLUMNS = (
+    "is_salary_allowances",
+    "accident_insurance_status",
+    "pension_insurance_status",
+    "old_age_insurance_status",
+    "death_insurance_status",
+    "health_insurance_status",
+)
+
+# distinct combination are only calculated once when every combination is
+# shared by this many employee on average
+MIN_REPEAT = 8
+
+def require_numpy():
+    """
+        Make sure numpy is available before doing any batch calculation
+
+        Raises:
+            ImportError : when numpy is not installed
+    """
+    if np is None:
+        raise ImportError("numpy is required for batch calculation, "
+                          "install it using pip install tax_bpjs[batch]")
+    #end if
+#end def
+
+def _size(employees_table):
+    """
+        Function to find how many employees inside the table
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar
+
+        Returns:
+            size (int) : the amount of employees
+    """
+    for value in employees_table.values():
+        if not np.isscalar(value) and not isinstance(value, (dict, bool)):
+            return len(value)
+        #end if
+    #end for
+    return 1
+#end def
+
+def _column(employees_table, key, size, dtype=None):
+    """
+        Function to fetch a column from the table and broadcast scalar value
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar
+            key (string) : column name
+            size (int) : the amount of employees
+            dtype : numpy dtype the column converted into
+
+        Returns:
+            column (ndarray) : one dimension array with length of size
+    """
+    value = employees_table[key]
+    if isinstance(value, dict) or np.isscalar(value):
+        value = [value] * size
+    #end if
+    return np.asarray(value, dtype=dtype)
+#end def
+
+def flag_column(employees_table, key, size):
+    """
+        Function to fetch a flag column, only True is True like the scalar
+        calculator (is True), 1 / "yes" / numpy.True_ inside a list is False
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar
+            key (string) : flag column name
+            size (int) : the amount of employees
+
+        Returns:
+            flags (ndarray) : boolean array with length of size
+    """
+    value = employees_table[key]
+    if isinstance(value, np.ndarray):
+        if value.dtype == bool:
+            return value
+        #end if
+        value = value.tolist()
+    elif value is None or np.isscalar(value):
+        return np.full(size, value is True)
+    #end if
+    # the original value is checked, numpy would turn [True, "yes"] into string
+    return np.fromiter((item is True for item in value), dtype=bool, count=size)
+#end def
+
+def allowance_column(employees_table, key, size):
+    """
+        Function to fetch allowances column, dictionary allowances are summarized
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar
+            key (string) : fixed_allowances / non_fixed_allowances
+            size (int) : the amount of employees
+
+        Returns:
+            allowances (ndarray) : total allowances for every employee
+    """
+    value = employees_table[key]
+    if isinstance(value, dict):
+        # every employee share the same allowances, summarized once
+        return np.full(size, Bpjs.summarize(value), dtype=np.int64)
+    #end if
+    column = _column(employees_table, key, size)
+    if column.dtype == object:
+        column = summarize_column(column.tolist())
+    #end if
+    return column
+#end def
+
+def summarize_column(allowances):
+    """
+        Function to summarize the allowances of every employee at once, every
+        allowance value is flattened into one array and reduced per employee
+
+        Args:
+            allowances (list): dictionary / summarized allowances of every employee
+
+        Returns:
+            allowances (ndarray) : total allowances for every employee, same
+            as Bpjs.summarize
+    """
+    size = len(allowances)
+    if not all(isinstance(value, dict) for value in allowances):
+        # summarized allowances is kept as it is like Bpjs.summarize, float
+        # allowances give a float column
+        return np.asarray(list(map(Bpjs.summarize, allowances)))
+    #end if
+    counts = np.fromiter(map(len, allowances), dtype=np.int64, count=size)
+    ends = np.cumsum(counts)
+    # dictionary value is truncated into int64 like int() inside Bpjs.summarize
+    values = np.fromiter(chain.from_iterable(map(dict.values, allowances)),
+                         dtype=np.int64, count=int(ends[-1]) if size else 0)
+    cumulative = np.concatenate(([0], np.cumsum(values)))
+    return cumulative[ends] - cumulative[ends - counts]
+#end def
+
+def round_tenth(values):
+    """
+        Vectorized version of round(value, 1)
+
+        np.rint work on the already scaled value, so a value that sits right
+        at .x5 could be rounded differently than the builtin round, those
+        value are rounded again using the builtin round.
+
+        Args:
+            values (ndarray) : values that going to be rounded
+
+        Returns:
+            rounded (ndarray) : values rounded to 1 decimal
+    """
+    scaled = values * 10
+    rounded = np.rint(scaled) / 10
+    distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    near_tie = np.flatnonzero(distance <= 8 * np.spacing(np.abs(scaled)))
+    for index in near_tie:
+        rounded[index] = round(float(values[index]), 1)
+    #end for
+    return rounded
+#end def
+
+def total_salary_column(employees_table, size):
+    """
+        Function to calculate total salary for every employee
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar
+            size (int) : the amount of employees
+
+        Returns:
+            total_salary (ndarray) : base salary + allowances when
+            is_salary_allowances is True
+    """
+    base_salary = _column(employees_table, "base_salary", size)
+    is_salary_allowances = flag_column(employees_table, "is_salary_allowances", size)
+
+    fixed_allowances = allowance_column(employees_table, "fixed_allowances", size)
+    non_fixed_allowances = allowance_column(employees_table,
+                                            "non_fixed_allowances", size)
+    with_allowances = base_salary + non_fixed_allowances + fixed_allowances
+    return np.where(is_salary_allowances, with_allowances, base_salary)
+#end def
+
+class CombinationIndex(namedtuple("CombinationIndex", [
+        "total_salary",
+        "flags",
+        "industry_risk_rate",
+        "inverse"])):
+    """
+        distinct (total salary, flags, industry risk rate) of a workforce,
+        inverse is the combination of every employee. The monthly fee only
+        depend on these, build it once for a payroll and reuse it for every
+        configuration
+    """
+    __slots__ = ()
+#end class
+
+def combination_index(employees_table):
+    """
+        Function to find every distinct combination the monthly fee depend on
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar,
+            using the same key as Bpjs employee_information
+
+        Returns:
+            index (CombinationIndex) : the index, None when the combinations
+            don't repeat enough to be worth it (less than MIN_REPEAT employee
+            for every combination on average)
+    """
+    require_numpy()
+    size = _size(employees_table)
+    total_salary = total_salary_column(employees_table, size)
+    flags = {
+        key : flag_column(employees_table, key, size)
+        for key in FLAG_COLUMNS
+    }
+    industry_risk_rate = _column(employees_table, "industry_risk_rate", size, float)
+
+    limit = size // MIN_REPEAT
+    salary_code, salaries = _factorize(total_salary, limit)
+    if salary_code is None:
+        return None
+    #end if
+    risk_code, risk_rates = _factorize(industry_risk_rate, limit)
+    if risk_code is None:
+        return None
+    #end if
+    # every column is combined into a single integer code
+    code = salary_code
+    if risk_rates > 1:
+        code = code * risk_rates + risk_code
+    #end if
+    flag_code = np.zeros(size, dtype=np.uint8)
+    for bit, key in enumerate(FLAG_COLUMNS):
+        flag_code |= flags[key].view(np.uint8) << bit
+    #end for
+    code = (code << len(FLAG_COLUMNS)) | flag_code
+
+    span = salaries * risk_rates << len(FLAG_COLUMNS)
+    if span <= max(4 * size, 1 << 20):
+        inverse, combinations, first = _dense(code, span)
+    else:
+        _, first, inverse = np.unique(code, return_index=True, return_inverse=True)
+        inverse, combinations = inverse.reshape(-1), len(first)
+    #end if
+    if combinations > limit:
+        return None
+    #end if
+    return CombinationIndex(
+        total_salary=total_salary[first],
+        flags={key : value[first] for key, value in flags.items()},
+        industry_risk_rate=industry_risk_rate[first],
+        inverse=inverse
+    )
+#end def
+
+def _factorize(values, limit):
+    """
+        Function to give every distinct value a dense code without sorting
+
+        Args:
+            values (ndarray): one dimension array
+            limit (int): maximum distinct value
+
+        Returns:
+            codes (ndarray) : code of every value from 0, None when there is
+            more than limit distinct value or the values cannot be coded
+            without sorting
+            count (int) : how many distinct value
+    """
+    size = len(values)
+    if size == 0 or (values == values[0]).all():
+        return np.zeros(size, dtype=np.int64), min(size, 1)
+    #end if
+    if values.dtype.kind not in "iu":
+        if values.dtype.kind != "f":
+            return None, 0
+        #end if
+        # few distinct rate, ex : industry risk rate
+        distinct = np.unique(values[:limit + 1])
+        if len(distinct) > limit or not np.isin(values, distinct).all():
+            return None, 0
+        #end if
+        return np.searchsorted(distinct, values).astype(np.int64), len(distinct)
+    #end if
+
+    # salary grade are multiple of a round amount, the offset from the lowest
+    # salary divided by it is used as lookup table position
+    offsets = (values - values.min()).astype(np.int64)
+    step = int(np.gcd.reduce(offsets))
+    if step > 1:
+        offsets //= step
+    #end if
+    span = int(offsets.max()) + 1
+    if span <= max(4 * size, 1 << 20):
+        codes, count, _ = _dense(offsets, span)
+    elif size <= 1 << 16:
+        # sorting a small workforce is cheap
+        distinct, codes = np.unique(offsets, return_inverse=True)
+        codes, count = codes.reshape(-1), len(distinct)
+    else:
+        return None, 0
+    #end if
+    if count > limit:
+        return None, 0
+    #end if
+    return codes, count
+#end def
+
+def _dense(codes, span):
+    """
+        Function to renumber codes between 0 and span into dense codes
+
+        Args:
+            codes (ndarray): code of every value, between 0 and span
+            span (int): upper bound of the code
+
+        Returns:
+            codes (ndarray) : dense code of every value
+            count (int) : how many distinct code
+            first (ndarray) : index of one value of every dense code
+    """
+    representative = np.full(span, -1, dtype=np.int64)
+    representative[codes] = np.arange(len(codes), dtype=np.int64)
+    present = representative >= 0
+    renumber = np.cumsum(present) - 1
+    return renumber[codes], int(renumber[-1]) + 1, representative[present]
+#end def
+
+def _gather(monthly, inverse):
+    """
+        Function to broadcast the result of every combination to every employee
+
+        Args:
+            monthly (dictionary): result of _monthly_fee_arrays
+            inverse (ndarray): combination of every employee
+
+        Returns:
+            monthly (dictionary) : same structure with a value for every employee
+    """
+    return {
+        key : _gather(value, inverse) if isinstance(value, dict) else value.take(inverse)
+        for key, value in monthly.items()
+    }
+#end def
+
+def monthly_fee_batch(employees_table, configuration, index=None):
+    """
+        calculate bpjs monthly fee for a whole workforce at once
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar,
+            using the same key as Bpjs employee_information
+            configuration (dictionary / CompiledConfiguration): same as Bpjs
+            configuration
+            index (CombinationIndex / boolean): calculate every distinct
+            combination once and gather the result for every employee, True
+            build the index of employees_table, a CombinationIndex built
+            before by combination_index(employees_table) is reused as it is
+
+        return:
+            old_age_insurance
+            pension_insurance
+            health_insurance
+            death_insurance
+            accident_insurance
+            every value is an array that match Bpjs.monthly_fee
+    """
+    require_numpy()
+    configuration = CompiledConfiguration.compile(configuration)
+    if index is True:
+        index = combination_index(employees_table)
+    #end if
+    if index:
+        monthly = _monthly_fee_arrays(index.total_salary, index.flags,
+                                      index.industry_risk_rate, configuration)
+        return _gather(monthly, index.inverse)
+    #end if
+
+    size = _size(employees_table)
+    total_salary = total_salary_column(employees_table, size)
+    flags = {
+        key : flag_column(employees_table, key, size)
+        for key in FLAG_COLUMNS
+    }
+    industry_risk_rate = _column(employees_table, "industry_risk_rate", size,
+                                 float)
+    return _monthly_fee_arrays(total_salary, flags, industry_risk_rate, configuration)
+#end def
+
+def _monthly_fee_arrays(total_salary, flags, industry_risk_rate, configuration):
+    """
+        Function to calculate bpjs monthly fee from the prepared columns
+
+        Args:
+            total_salary (ndarray): total salary of every employee
+            flags (dictionary): flag column name -> bool array
+            industry_risk_rate (ndarray): industry risk rate of every employee
+            configuration (CompiledConfiguration): configuration
+
+        Returns:
+            monthly (dictionary) : same as monthly_fee_batch
+    """
+    old_age = flags["old_age_insurance_status"]
+    company_old_age_insurance = np.where(
+        old_age, configuration.company_old_age_insurance_rate * total_salary, 0)
+    individual_old_age_insurance = np.where(
+        old_age, configuration.individual_old_age_insurance_rate * total_salary, 0)
+
+    pension = flags["pension_insurance_status"]
+    pension_salary = np.minimum(total_salary, configuration.pension_max_fee)
+    company_pension_insurance = np.where(
+        pension, pension_salary * configuration.company_pension_insurance_rate, 0)
+    individual_pension_insurance = np.where(
+        pension, pension_salary * configuration.individual_pension_insurance_rate, 0)
+
+    health = flags["health_insurance_status"]
+    health_salary = np.minimum(total_salary, configuration.health_max_fee)
+    company_health_insurance = np.where(
+        health, health_salary * configuration.company_health_insurance_rate, 0)
+    individual_health_insurance = np.where(
+        health, health_salary * configuration.individual_health_insurance_rate, 0)
+
+    death_insurance = np.where(
+        flags["death_insurance_status"],
+        np.trunc(total_salary * configuration.death_insurance_rate), 0
+    ).astype(np.int64)
+
+    accident_insurance = np.where(
+        flags["accident_insurance_status"],
+        round_tenth((industry_risk_rate / 100) * total_salary), 0)
+
+    monthly = {
+        "old_age_insurance" : {
+            "company"    : company_old_age_insurance,
+            "individual" : individual_old_age_insurance,
+        },
+        "pension_insurance" : {
+            "company"    : company_pension_insurance,
+            "individual" : individual_pension_insurance,
+        },
+        "health_insurance" : {
+            "company"    : company_health_insurance,
+            "individual" : individual_health_insurance,
+        },
+        "death_insurance" : death_insurance,
+        "accident_insurance" : accident_insurance
+    }
+    return monthly
+#end def
+
+def employees_table(employees):
+    """
+        Function to convert employee information into columns
+
+        Args:
+            employees (iterable): employee information (dictionary / Employee)
+
+        Returns:
+            employees_table (dictionary) : column name -> list
+    """
+    employees = list(employees)
+    return {
+        key : [employee_information[key] for employee_information in employees]
+        for key in EMPLOYEE_FIELDS
+    }
+#end def
+
+def _string_codes(values):
+    """
+        Function to code a fixed width string column without sorting the
+        strings, the characters are hashed and every code is checked
+        against the column
+
+        Args:
+            values (ndarray): unicode / bytes array
+
+        Returns:
+            codes (ndarray) : code of every value from 0, None when two
+            different string share the same hash
+            count (int) : how many distinct value
+    """
+    size = len(values)
+    if (values == values[0]).all():
+        return np.zeros(size, dtype=np.int64), 1
+    #end if
+    values = np.ascontiguousarray(values)
+    itemsize = values.dtype.itemsize
+    word = np.uint64 if itemsize % 8 == 0 else np.uint32 if itemsize % 4 == 0 else np.uint8
+    words = values.view(word).reshape(size, -1)
+    hashed = np.zeros(size, dtype=np.uint64)
+    for index in range(words.shape[1]):
+        # wrap around on overflow
+        hashed *= np.uint64(1000003)
+        hashed += words[:, index]
+    #end for
+    distinct, first, codes = np.unique(hashed, return_index=True, return_inverse=True)
+    codes = codes.reshape(-1)
+    if not (values.take(first).take(codes) == values).all():
+        return None, 0
+    #end if
+    return codes, len(distinct)
+#end def
+
+def _column_codes(column):
+    """
+        Function to give every distinct value of a column a dense code
+
+        Args:
+            column (ndarray): one dimension array
+
+        Returns:
+            codes (ndarray) : code of every value from 0
+            count (int) : how many distinct value
+    """
+    size = len(column)
+    kind = column.dtype.kind
+    codes = None
+    if kind in "mM":
+        column = column.view(np.int64)
+        kind = "i"
+    elif kind == "b":
+        column = column.astype(np.int64)
+        kind = "i"
+    #end if
+    if kind in "iuf":
+        codes, count = _factorize(column, size)
+        if codes is None:
+            distinct, codes = np.unique(column, return_inverse=True)
+            codes, count = codes.reshape(-1), len(distinct)
+        #end if
+    elif kind in "US" and column.dtype.itemsize:
+        codes, count = _string_codes(column)
+    #end if
+    if codes is None:
+        # python object, ex : date, equal value share the same code
+        values = column.tolist()
+        unique = dict.fromkeys(values)
+        for code, value in enumerate(unique):
+            unique[value] = code
+        #end for
+        codes = np.fromiter(map(unique.__getitem__, values), dtype=np.int64, count=size)
+        count = len(unique)
+    #end if
+    return codes, count
+#end def
+
+def _unique_apply(function, *columns):
+    """
+        Function to call a scalar function once for every unique combination,
+        every column is coded and the codes are combined without building a
+        tuple for every employee
+
+        Args:
+            function (callable): scalar function
+            columns (ndarray): argument of the function for every employee
+
+        Returns:
+            results (list) : result of every unique combination
+            inverse (ndarray) : index of the result for every employee
+    """
+    size = len(columns[0])
+    if size == 0:
+        return [], np.zeros(0, dtype=np.int64)
+    #end if
+    inverse = np.zeros(size, dtype=np.int64)
+    span = 1
+    for column in columns:
+        codes, count = _column_codes(column)
+        inverse = inverse * count + codes
+        span = span * count
+        if span > max(4 * size, 1 << 20):
+            distinct, inverse = np.unique(inverse, return_inverse=True)
+            inverse, span = inverse.reshape(-1), len(distinct)
+        #end if
+    #end for
+    inverse, _, first = _dense(inverse, span)
+    keys = zip(*(column.take(first).tolist() for column in columns))
+    return [function(*key) for key in keys], inverse
+#end def
+
+def _employee_columns(employees_table):
+    """
+        Function to prepare everything of the employees that doesn't depend
+        on the configuration
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar,
+            using the same key as Tax employee_information
+
+        Returns:
+            columns (dictionary) : column name -> array
+    """
+    from tax_bpjs.tax import Tax
+
+    size = _size(employees_table)
+    columns = {
+        "size"                 : size,
+        "base_salary"          : _column(employees_table, "base_salary", size),
+        "total_salary"         : total_salary_column(employees_table, size),
+        "overtime_allowances"  : _column(employees_table, "overtime_allowances", size),
+        "non_fixed_allowances" : allowance_column(employees_table, "non_fixed_allowances",
+                                                  size),
+        "industry_risk_rate"   : _column(employees_table, "industry_risk_rate", size, float),
+        "marital_status"       : _column(employees_table, "marital_status", size),
+        "dependents"           : _column(employees_table, "dependents", size),
+    }
+    for key in FLAG_COLUMNS:
+        columns[key] = flag_column(employees_table, key, size)
+    #end for
+    # additional charge is added when npwp_status is not True
+    columns["npwp_status"] = flag_column(employees_table, "npwp_status", size)
+
+    # most employee share the same handful of working period
+    periods, inverse = _unique_apply(Tax.working_months,
+                                     _column(employees_table, "start_work_date", size),
+                                     _column(employees_table, "end_work_date", size))
+    columns["working_months"] = np.asarray([months for months, _ in periods],
+                                           dtype=np.int64)[inverse]
+    columns["working_year"] = np.asarray([year for _, year in periods],
+                                         dtype=np.int64)[inverse]
+    return columns
+#end def
+
+def _month_groups(working_months):
+    """
+        Function to group employees sharing the same working months
+
+        Args:
+            working_months (ndarray): how many month for every employee
+
+        Returns:
+            groups (list) : (working months, mask of the employees) of every
+            group, mask is None when every employee share the working months
+    """
+    months = np.flatnonzero(np.bincount(working_months)).tolist()
+    if len(months) == 1:
+        return [(months[0], None)]
+    #end if
+    return [(month, working_months == month) for month in months]
+#end def
+
+def _accumulate_arrays(monthly_values, working_months, groups=None):
+    """
+        Vectorized version of Bpjs._accumulate, the monthly value is added
+        month by month so the floating point result is identical, the total
+        of every group is taken once it reach the working months of the group
+
+        Args:
+            monthly_values (list): value of every month, ndarray or scalar
+            working_months (ndarray): how many month for every employee
+            groups (list): result of _month_groups when it is already calculated
+
+        Returns:
+            total (ndarray) : total of the working months
+    """
+    if groups is None:
+        groups = _month_groups(working_months)
+    #end if
+    size = len(working_months)
+    dtype = np.result_type(*monthly_values)
+    result = np.zeros(size, dtype=dtype)
+    if not groups:
+        return result
+    #end if
+    ends = dict(groups)
+    total = np.zeros(size, dtype=dtype)
+    for month in range(max(ends)):
+        np.add(total, monthly_values[month], out=total)
+        if month + 1 in ends:
+            mask = ends[month + 1]
+            if mask is None:
+                return total
+            #end if
+            np.copyto(result, total, where=mask)
+        #end if
+    #end for
+    return result
+#end def
+
+def _annual_bpjs_arrays(columns, configuration, with_bpjs=True):
+    """
+        Vectorized version of Bpjs.annual_fee
+
+        Args:
+            columns (dictionary): result of _employee_columns
+            configuration (CompiledConfiguration): configuration
+            with_bpjs (boolean): calculate bpjs or not
+
+        Returns:
+            annual bpjs (dictionary) : same key as annual_fee where every value is an array
+    """
+    size = columns["size"]
+    total_salary = columns["total_salary"]
+    working_months = columns["working_months"]
+    if with_bpjs is not True:
+        working_months = np.zeros(size, dtype=np.int64)
+    #end if
+
+    groups = _month_groups(working_months)
+
+    def annual(flag, monthly_value):
+        monthly_value = np.where(columns[flag], monthly_value, 0)
+        return _accumulate_arrays([monthly_value] * 12, working_months, groups)
+    #end def
+
+    def annual_pension(rate, max_pension_insurance, old_max_pension_insurance):
+        monthly_value = np.where(total_salary > configuration.pension_max_fee,
+                                 max_pension_insurance, total_salary * rate)
+        old_monthly_value = np.where(total_salary > configuration.old_pension_max_fee,
+                                     old_max_pension_insurance, total_salary * rate)
+        # special case in 2018, january and february use old pension max fee
+        old_monthly_value = np.where(columns["working_year"] == 2018,
+                                     old_monthly_value, monthly_value)
+        flag = columns["pension_insurance_status"]
+        return _accumulate_arrays(
+            [np.where(flag, old_monthly_value, 0)] * 2 + [np.where(flag, monthly_value, 0)] * 10,
+            working_months, groups)
+    #end def
+
+    health_salary = np.minimum(total_salary, configuration.health_max_fee)
+    return {
+        "old_age_insurance" : {
+            "company"    : annual("old_age_insurance_status",
+                                  configuration.company_old_age_insurance_rate * total_salary),
+            "individual" : annual("old_age_insurance_status",
+                                  configuration.individual_old_age_insurance_rate * total_salary),
+        },
+        "pension_insurance" : {
+            "company"    : annual_pension(configuration.company_pension_insurance_rate,
+                                          configuration.max_company_pension_insurance,
+                                          configuration.old_max_company_pension_insurance),
+            "individual" : annual_pension(configuration.individual_pension_insurance_rate,
+                                          configuration.max_individual_pension_insurance,
+                                          configuration.old_max_individual_pension_insurance),
+        },
+        "health_insurance" : {
+            "company"    : annual("health_insurance_status",
+                                  health_salary * configuration.company_health_insurance_rate),
+            "individual" : annual("health_insurance_status",
+                                  health_salary * configuration.individual_health_insurance_rate),
+        },
+        "death_insurance" : annual("death_insurance_status",
+                                   np.trunc(total_salary * configuration.death_insurance_rate)
+                                   .astype(np.int64)),
+        "accident_insurance" : annual("accident_insurance_status",
+                                      round_tenth((columns["industry_risk_rate"] / 100)
+                                                  * total_salary)),
+    }
+#end def
+
+def _monthly_array(annual_values, working_months):
+    """
+        Vectorized version of Tax._monthly
+
+        Args:
+            annual_values (ndarray): annual value of every employee
+            working_months (ndarray): how many month for every employee
+
+        Returns:
+            monthly (ndarray) : annual value / working months truncated
+    """
+    return np.trunc(annual_values / working_months).astype(np.int64)
+#end def
+
+def _tax_exemption_array(columns, configuration):
+    """
+        Function to find the tax exemption of every employee
+
+        Args:
+            columns (dictionary): result of _employee_columns
+            configuration (CompiledConfiguration): configuration
+
+        Returns:
+            tax_exemption (ndarray) : tax exemption of every employee
+    """
+    exemptions, inverse = _unique_apply(configuration.tax_exemption,
+                                        columns["marital_status"], columns["dependents"])
+    return np.asarray(exemptions)[inverse]
+#end def
+
+def _occupation_support_array(annual_bruto_income, configuration):
+    """
+        Vectorized version of Tax._occupation_support
+
+        Args:
+            annual_bruto_income (ndarray): annual bruto income of every employee
+            configuration (CompiledConfiguration): configuration
+
+        Returns:
+            occupation_support (ndarray) : occupation support of every employee
+    """
+    occupation_support = annual_bruto_income * configuration.occupation_support_rate
+    return np.where(occupation_support > configuration.max_occupation_support,
+                    configuration.max_occupation_support, occupation_support)
+#end def
+
+def _annual_tax_arrays(columns, annual_bpjs, configuration, tax_exemption=None, bonus=None):
+    """
+        Vectorized version of Tax.annual_tax
+
+        Args:
+            columns (dictionary): result of _employee_columns
+            annual_bpjs (dictionary): result of _annual_bpjs_arrays
+            configuration (CompiledConfiguration): configuration
+            tax_exemption (ndarray): result of _tax_exemption_array when it
+            is already calculated
+            bonus (ndarray): bonus allowances of every employee, default
+            calculate the annual tax without bonus
+
+        Returns:
+            annual_salary
+            annual_allowances
+            annual_bpjs_work
+            annual_bpjs_health
+            annual_bruto_income
+            occupation_support
+            thr_occupation_support
+            annual_net_income
+            tax_exemption
+            annual_taxable_income
+            annual_tax
+            every value is an array that match Tax.annual_tax
+    """
+    if tax_exemption is None:
+        tax_exemption = _tax_exemption_array(columns, configuration)
+    #end if
+
+    # same order of addition as Tax.total_year_income
+    annual_salary = columns["base_salary"] * columns["working_months"]
+    annual_allowances = columns["overtime_allowances"] + columns["non_fixed_allowances"]
+    annual_work = annual_bpjs["death_insurance"] + annual_bpjs["accident_insurance"]
+    annual_health = annual_bpjs["health_insurance"]["company"]
+    annual_bruto_income = annual_salary + annual_allowances + annual_work + annual_health
+
+    # same as Tax.annual_net_income
+    occupation_support = _occupation_support_array(annual_bruto_income, configuration)
+    thr_occupation_support = configuration.zero_occupation_support
+    if bonus is not None:
+        # same as Tax._annual_tax_from_base, bonus is the last component of
+        # bruto income and the occupation support without bonus is reused
+        # when removing the bonus give back the same bruto income
+        base_bruto_income = annual_bruto_income
+        annual_bruto_income = base_bruto_income + bonus
+        without_bonus = annual_bruto_income - bonus
+        occupation_support = np.where(
+            without_bonus == base_bruto_income, occupation_support,
+            _occupation_support_array(without_bonus, configuration))
+        thr_occupation_support = np.where(bonus == 0, thr_occupation_support,
+                                          _occupation_support_array(bonus, configuration))
+    #end if
+    annual_net_income = annual_bruto_income - \
+                        (occupation_support + thr_occupation_support +
+                         annual_bpjs["pension_insurance"]["individual"] +
+                         annual_bpjs["old_age_insurance"]["individual"])
+
+    # same as Tax._taxable_income_yearly
+    annual_taxable_income = np.where(annual_net_income > tax_exemption,
+                                     annual_net_income - tax_exemption, 0)
+    annual_taxable_income = annual_taxable_income - annual_taxable_income % 1000
+
+    # same as Tax._tax_on_taxable_income_yearly and Tax._non_tax_charge
+    annual_tax = configuration.bracket_table.tax_batch(annual_taxable_income)
+    annual_tax = annual_tax + np.where(columns["npwp_status"], 0, annual_tax * 0.2)
+    return {
+        "annual_salary"          : annual_salary,
+        "annual_allowances"      : annual_allowances,
+        "annual_bpjs_work"       : annual_work,
+        "annual_bpjs_health"     : annual_health,
+        "annual_bruto_income"    : annual_bruto_income,
+        "occupation_support"     : occupation_support,
+        "thr_occupation_support" : thr_occupation_support,
+        "annual_net_income"      : annual_net_income,
+        "tax_exemption"          : tax_exemption,
+        "annual_taxable_income"  : annual_taxable_income,
+        "annual_tax"             : annual_tax,
+    }
+#end def
+
+def annual_tax_batch(employees_table, configuration, with_bpjs=True, with_bonus=True):
+    """
+        Vectorized version of Tax.annual_tax for many employees (require numpy).
+        Employees are grouped by (start_work_date, end_work_date) so working
+        months is resolved once for every group, every other stage is an
+        array operation over the whole table
+
+        Args:
+            employees_table (dictionary): column name -> sequence / scalar,
+            using the same key as Tax employee_information
+            configuration (dictionary / CompiledConfiguration): configuration
+            with_bpjs (boolean): calculate bpjs or not
+            with_bonus (boolean): include bonus_allowances, same as passing
+            bonus_allowances / 0 to Tax.annual_tax
+
+        Returns:
+            same structure as AnnualTaxResult where every value is an array,
+            identical with Tax(employee_information, configuration,
+            with_bpjs).annual_tax(base_salary, overtime_allowances,
+            non_fixed_allowances, bonus_allowances) of every employee
+    """
+    require_numpy()
+    configuration = CompiledConfiguration.compile(configuration)
+    if not configuration.has_tax:
+        raise ValueError("configuration is missing tax configuration")
+    #end if
+    columns = _employee_columns(employees_table)
+    size = columns["size"]
+
+    bonus = None
+    if with_bonus and "bonus_allowances" in employees_table:
+        bonus = _column(employees_table, "bonus_allowances", size)
+    #end if
+    annual_bpjs = _annual_bpjs_arrays(columns, configuration, with_bpjs)
+    annual = _annual_tax_arrays(columns, annual_bpjs, configuration, bonus=bonus)
+
+    thr_occupation_support = annual["thr_occupation_support"]
+    if np.isscalar(thr_occupation_support):
+        thr_occupation_support = np.full(size, thr_occupation_support)
+    #end if
+    return {
+        "working_months" : columns["working_months"],
+        "total_income_result" : {
+            "annual_salary"       : annual["annual_salary"],
+            "annual_allowances"   : annual["annual_allowances"],
+            "annual_bpjs_work"    : annual["annual_bpjs_work"],
+            "annual_bpjs_health"  : annual["annual_bpjs_health"],
+            "bonus"               : bonus if bonus is not None else np.zeros(size, np.int64),
+            "annual_bruto_income" : annual["annual_bruto_income"],
+        },
+        "net_income_result" : {
+            "occupation_support"     : annual["occupation_support"],
+            "thr_occupation_support" : thr_occupation_support,
+            "bpjs_pension_insurance" : annual_bpjs["pension_insurance"]["individual"],
+            "bpjs_old_age_insurance" : annual_bpjs["old_age_insurance"]["individual"],
+            "annual_net_income"      : annual["annual_net_income"],
+        },
+        "annual_taxable_income" : annual["annual_taxable_income"],
+        "tax_exemption"         : annual["tax_exemption"],
+        "annual_tax"            : annual["annual_tax"],
+        "annual_bpjs"           : annual_bpjs,
+    }
+#end def
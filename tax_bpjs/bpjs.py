@@ -1,12 +1,58 @@
 """
     BPJS Calculator
 """
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.records import BpjsContribution, InsuranceShare
+
 class Bpjs:
     """ BPJS Class """
-    def __init__(self, employee_information, configuration):
+    __slots__ = (
+        "base_salary",
+        "fixed_allowances",
+        "non_fixed_allowances",
+        "is_salary_allowances",
+        "accident_insurance_status",
+        "pension_insurance_status",
+        "old_age_insurance_status",
+        "death_insurance_status",
+        "health_insurance_status",
+        "industry_risk_rate",
+        "configuration",
+        "cache",
+        # summarized (fixed, non fixed) allowances, see _allowance_totals
+        "_allowances",
+        # calculator input part of the cache key, see _cache_key
+        "_key",
+    )
+
+    # every input used by the calculation, part of the cache key
+    _cache_fields = (
+        "base_salary",
+        "fixed_allowances",
+        "non_fixed_allowances",
+        "is_salary_allowances",
+        "accident_insurance_status",
+        "pension_insurance_status",
+        "old_age_insurance_status",
+        "death_insurance_status",
+        "health_insurance_status",
+        "industry_risk_rate",
+    )
+
+    # input only checked using `is True`, keyed by that check
+    _flag_fields = frozenset((
+        "is_salary_allowances",
+        "accident_insurance_status",
+        "pension_insurance_status",
+        "old_age_insurance_status",
+        "death_insurance_status",
+        "health_insurance_status",
+    ))
+
+    def __init__(self, employee_information, configuration, cache=None):
         """
         Args:
-            employee_information (dictionary):
+            employee_information (dictionary / Employee):
                 base_salary -- (Integer) Gaji Pokok
                 fixed_allowances -- (Integer) Tunjangan Tetap
                 non_fixed_allowances -- (Integer) Tunjangan Tidak Tetap
@@ -22,7 +68,7 @@ class Bpjs:
                 Enrollment Status
                 industry_risk_rate -- (Float) Industry Risk Rate (ex : 0.24)
 
-            configuration -- (dictionary):
+            configuration -- (dictionary / CompiledConfiguration):
                 pension_max_fee -- (Integer) Jumlah Maksimal BPJS Pensiun
                 health_max_fee -- (Integer) Jumlah Maksimal BPJS
                 old_pension_max_fee -- (Integer) Jumlah Maksimal BPJS
@@ -33,6 +79,9 @@ class Bpjs:
                 company_old_age_insurance_rate -- (Integer) Jumlah Maksimal BPJS
                 individual_pension_insurance_rate -- (Integer) Jumlah Maksimal BPJS
                 company_pension_insurance_rate -- (Integer) Jumlah Maksimal BPJS
+
+            cache -- (ResultCache) optional cache shared between calculator,
+            result of the same input and configuration is calculated once
         """
         self.base_salary               = employee_information["base_salary"]
         self.fixed_allowances          = employee_information["fixed_allowances"]
@@ -45,27 +94,59 @@ class Bpjs:
         self.health_insurance_status   = employee_information["health_insurance_status"]
         self.industry_risk_rate        = employee_information["industry_risk_rate"]
 
-        self.health_max_fee  = configuration["health_max_fee"]
-        self.pension_max_fee = configuration["pension_max_fee"]
-        self.old_pension_max_fee = configuration["old_pension_max_fee"]
+        # shared between every calculator, compile it once using
+        # CompiledConfiguration.compile and pass it for a whole payroll
+        self.configuration = CompiledConfiguration.compile(configuration)
+        self.cache = cache
+        if cache is not None:
+            cache.validate(self.configuration)
+        #end if
+        self._allowances = None
+        self._key = None
+    #end def
 
-        self.individual_health_insurance_rate =\
-        configuration["individual_health_insurance_rate"]
-        self.company_health_insurance_rate =\
-        configuration["company_health_insurance_rate"]
+    def _cache_key(self, name, *arguments):
+        """
+            Function to build the cache key of a calculation
 
-        self.death_insurance_rate =\
-        configuration["death_insurance_rate"]
+            Args:
+                name (string): calculation name
+                arguments : argument of the calculation, number
 
-        self.individual_old_age_insurance_rate=\
-        configuration["individual_old_age_insurance_rate"]
-        self.company_old_age_insurance_rate=\
-        configuration["company_old_age_insurance_rate"]
+            Returns:
+                key (tuple) : calculator input, arguments and configuration
+                fingerprint, fingerprint(key) give a stable digest
+        """
+        # summarize again when the allowances change in place
+        self._allowance_totals()
+        key = self._key
+        if key is None:
+            key = self._input_key()
+            self._key = key
+        #end if
+        return (type(self).__name__, name, self.configuration.fingerprint, key, arguments)
+    #end def
 
-        self.individual_pension_insurance_rate =\
-        configuration["individual_pension_insurance_rate"]
-        self.company_pension_insurance_rate =\
-        configuration["company_pension_insurance_rate"]
+    def _input_key(self):
+        """
+            Function to build the calculator input part of the cache key,
+            allowances is keyed by its total and flags by `is True` like the
+            calculation use them, so True and 1 are different input. It is
+            built on the first lookup, allowances changed in place build it
+            again
+
+            Returns:
+                key (tuple) : value of every _cache_fields
+        """
+        fixed_allowances, non_fixed_allowances = self._allowance_totals()
+        flags = self._flag_fields
+        return tuple([
+            fixed_allowances if key == "fixed_allowances" else
+            non_fixed_allowances if key == "non_fixed_allowances" else
+            getattr(self, key) is True if key in flags else
+            getattr(self, key)
+            for key in self._cache_fields
+        ])
     #end def
 
     @staticmethod
@@ -74,19 +155,67 @@ class Bpjs:
             Function to summarize allowances
 
             Args:
-                allowances (dictionary): { }
+                allowances (dictionary / int): { } or total allowances that
+                has been summarized, returned as it is
 
             Returns:
                 allowances(int) : total allowances
         """
-        total_allowances = 0
+        if allowances.__class__ is int:
+            return allowances
+        #end if
         if isinstance(allowances, dict):
-            for key, value in allowances.items():
-                total_allowances = total_allowances + int(value)
-            #end for
-        else:
-            total_allowances = allowances
-        return total_allowances
+            return sum(map(int, allowances.values()))
+        #end if
+        return allowances
+    #end def
+
+    @staticmethod
+    def _same_allowances(snapshot, allowances):
+        """
+            Function to compare allowances with the snapshot taken when it
+            was summarized
+
+            Args:
+                snapshot : allowances when it was summarized
+                allowances : current allowances
+
+            Returns:
+                same (boolean) : True when the summarized total is still valid
+        """
+        if isinstance(allowances, dict):
+            return isinstance(snapshot, dict) and snapshot == allowances
+        #end if
+        return type(snapshot) is type(allowances) and snapshot == allowances
+    #end def
+
+    def _allowance_totals(self):
+        """
+            Function to summarize fixed and non fixed allowances once per
+            calculator, the allowances is compared with a snapshot of its
+            content so changing the dictionary in place summarize it again
+
+            Returns:
+                fixed_allowances (int) : total fixed allowances
+                non_fixed_allowances (int) : total non fixed allowances
+        """
+        fixed_allowances = self.fixed_allowances
+        non_fixed_allowances = self.non_fixed_allowances
+        totals = self._allowances
+        if totals is None or not self._same_allowances(totals[0], fixed_allowances) \
+           or not self._same_allowances(totals[1], non_fixed_allowances):
+            totals = (
+                dict(fixed_allowances) if isinstance(fixed_allowances, dict)
+                else fixed_allowances,
+                dict(non_fixed_allowances) if isinstance(non_fixed_allowances, dict)
+                else non_fixed_allowances,
+                self.summarize(fixed_allowances),
+                self.summarize(non_fixed_allowances)
+            )
+            self._allowances = totals
+            self._key = None
+        #end if
+        return totals[2], totals[3]
     #end def
 
     def _individual_health_insurance(self, total_salary):
@@ -101,13 +230,14 @@ class Bpjs:
                 health insurance that person have to pay monthly
         """
         individual_health_insurance = 0
+        configuration = self.configuration
 
-        if total_salary <= self.health_max_fee:
+        if total_salary <= configuration.health_max_fee:
             individual_health_insurance = total_salary \
-            * self.individual_health_insurance_rate
+            * configuration.individual_health_insurance_rate
         else:
-            individual_health_insurance = self.health_max_fee\
-            * self.individual_health_insurance_rate
+            individual_health_insurance = \
+            configuration.max_individual_health_insurance
         #end if
         return individual_health_insurance
     #end def
@@ -124,13 +254,14 @@ class Bpjs:
                 bpjs health insurance that person have to pay monthly
         """
         company_health_insurance = 0
+        configuration = self.configuration
 
-        if total_salary <= self.health_max_fee:
+        if total_salary <= configuration.health_max_fee:
             company_health_insurance = total_salary *\
-            self.company_health_insurance_rate
+            configuration.company_health_insurance_rate
         else:
-            company_health_insurance = self.health_max_fee\
-            * self.company_health_insurance_rate
+            company_health_insurance = \
+            configuration.max_company_health_insurance
         #end if
         return company_health_insurance
     #end def
@@ -166,7 +297,7 @@ class Bpjs:
             Returns:
                 death_insurance(int) : amount of accident insurance that person have to pay
         """
-        return int(total_salary * self.death_insurance_rate)
+        return int(total_salary * self.configuration.death_insurance_rate)
     #end def
 
     def _company_old_age_insurance(self, total_salary):
@@ -180,7 +311,7 @@ class Bpjs:
                 company_old_age_insurance(int) : \
                         amount of company person old age insurance fee.
         """
-        return self.company_old_age_insurance_rate * total_salary
+        return self.configuration.company_old_age_insurance_rate * total_salary
     #end def
 
     def _individual_old_age_insurance(self, total_salary):
@@ -194,7 +325,7 @@ class Bpjs:
                 individual_health_insurance (int) :\
                         amount of company person old age insurance fee.
         """
-        return self.individual_old_age_insurance_rate * total_salary
+        return self.configuration.individual_old_age_insurance_rate * total_salary
     #end def
 
     def _individual_pension_insurance(self, total_salary, month=None, year=None):
@@ -209,21 +340,24 @@ class Bpjs:
                 pension insurance.
         """
         individual_pension_insurance = 0
+        configuration = self.configuration
 
-        pension_max_fee = self.pension_max_fee
+        pension_max_fee = configuration.pension_max_fee
+        max_pension_insurance = configuration.max_individual_pension_insurance
         # special case in 2018
         if year == 2018:
             if month <= 2:
-                pension_max_fee = self.old_pension_max_fee
+                pension_max_fee = configuration.old_pension_max_fee
+                max_pension_insurance = \
+                configuration.old_max_individual_pension_insurance
             #end if
         #end if
 
         if total_salary > pension_max_fee:
-            individual_pension_insurance = pension_max_fee \
-            * self.individual_pension_insurance_rate
+            individual_pension_insurance = max_pension_insurance
         else:
             individual_pension_insurance = total_salary \
-            * self.individual_pension_insurance_rate
+            * configuration.individual_pension_insurance_rate
         #end if
         return individual_pension_insurance
     #end def
@@ -240,40 +374,70 @@ class Bpjs:
                 penson insurance.
         """
         company_pension_insurance = 0
+        configuration = self.configuration
 
-        pension_max_fee = self.pension_max_fee
+        pension_max_fee = configuration.pension_max_fee
+        max_pension_insurance = configuration.max_company_pension_insurance
         # special case in 2018
         if year == 2018:
             if month <= 2:
-                pension_max_fee = self.old_pension_max_fee
+                pension_max_fee = configuration.old_pension_max_fee
+                max_pension_insurance = \
+                configuration.old_max_company_pension_insurance
             #end if
         #end if
 
         if total_salary > pension_max_fee:
-            company_pension_insurance = pension_max_fee *\
-            self.company_pension_insurance_rate
+            company_pension_insurance = max_pension_insurance
         else:
             company_pension_insurance = total_salary * \
-            self.company_pension_insurance_rate
+            configuration.company_pension_insurance_rate
         #end if
         return company_pension_insurance
     #end def
 
-    def monthly_fee(self):
+    def monthly_fee(self, month=None, year=None):
+        """
+            calculate person bpjs monthly fee, using the cache when available
+
+            args:
+                month -- month of the fee, only needed for 2018 pension
+                year -- year of the fee, only needed for 2018 pension
+
+            return:
+                BpjsContribution
+        """
+        if self.cache is None:
+            return self._monthly_fee(month, year)
+        #end if
+        key = self._cache_key("monthly_fee", month, year)
+        monthly = self.cache.get(key)
+        if monthly is None:
+            monthly = self._monthly_fee(month, year)
+            self.cache.put(key, monthly)
+        #end if
+        return monthly
+    #end def
+
+    def _monthly_fee(self, month=None, year=None):
         """
             calculate person bpjs monthly fee
 
+            args:
+                month -- month of the fee, only needed for 2018 pension
+                year -- year of the fee, only needed for 2018 pension
+
             return:
-                old_age_insurance
-                pension_insurance
-                health_insurance
-                death_insurance
-                accident_insurance
+                BpjsContribution
+                    old_age_insurance
+                    pension_insurance
+                    health_insurance
+                    death_insurance
+                    accident_insurance
         """
         total_salary = self.base_salary
         if self.is_salary_allowances is True:
-            fixed_allowances = self.summarize( self.fixed_allowances )
-            non_fixed_allowances = self.summarize( self.non_fixed_allowances )
+            fixed_allowances, non_fixed_allowances = self._allowance_totals()
             total_salary = total_salary + non_fixed_allowances + fixed_allowances
         #end if
 
@@ -291,10 +455,10 @@ class Bpjs:
         individual_pension_insurance = 0
         if self.pension_insurance_status is True:
             company_pension_insurance = \
-            self._company_pension_insurance(total_salary)
+            self._company_pension_insurance(total_salary, month, year)
 
             individual_pension_insurance = \
-            self._individual_pension_insurance(total_salary)
+            self._individual_pension_insurance(total_salary, month, year)
         #end if
 
         company_health_insurance    = 0
@@ -319,25 +483,91 @@ class Bpjs:
                                           self.industry_risk_rate)
         #end if
 
-        monthly = {
-            "old_age_insurance" : {
-                "company"    : company_old_age_insurance,
-                "individual" : individual_old_age_insurance,
-            },
-            "pension_insurance" : {
-                "company"    : company_pension_insurance,
-                "individual" : individual_pension_insurance,
-            },
-            "health_insurance" : {
-                "company"    : company_health_insurance,
-                "individual" : individual_health_insurance,
-            },
-            "death_insurance" : death_insurance,
-            "accident_insurance" : accident_insurance
-        }
+        monthly = BpjsContribution(
+            old_age_insurance=InsuranceShare(company_old_age_insurance,
+                                             individual_old_age_insurance),
+            pension_insurance=InsuranceShare(company_pension_insurance,
+                                             individual_pension_insurance),
+            health_insurance=InsuranceShare(company_health_insurance,
+                                            individual_health_insurance),
+            death_insurance=death_insurance,
+            accident_insurance=accident_insurance
+        )
         return monthly
     #end def
 
+    @staticmethod
+    def monthly_fee_batch(employees_table, configuration, index=None):
+        """
+            calculate bpjs monthly fee for many person at once (require numpy)
+
+            args:
+                employees_table -- column name -> array of employee_information
+                configuration -- configuration
+                index -- True / CombinationIndex, calculate every distinct
+                salary, flags and industry risk rate once (see
+                batch.combination_index)
+
+            return:
+                same structure as monthly_fee where every value is an array
+        """
+        from tax_bpjs.batch import monthly_fee_batch
+        return monthly_fee_batch(employees_table, configuration, index)
+    #end def
+
+    @staticmethod
+    def _pension_segments(working_months, year):
+        """
+            Function to group working months that share the same pension max fee
+
+            Args:
+                working_months (int): how many month that person has been working
+                year (int): working year
+
+            Returns:
+                segments (list) : [(first month of the segment, months), ...]
+        """
+        segments = []
+        # special case in 2018, january and february use old pension max fee
+        old_months = 0
+        if year == 2018:
+            old_months = min(2, working_months)
+        #end if
+
+        if old_months > 0:
+            segments.append((1, old_months))
+        #end if
+        if working_months > old_months:
+            segments.append((old_months + 1, working_months - old_months))
+        #end if
+        return segments
+    #end def
+
+    @staticmethod
+    def _accumulate(total, monthly_value, months):
+        """
+            Function to add the same monthly value for several months
+
+            Args:
+                total (int): the accumulated value so far
+                monthly_value (int): value that added every month
+                months (int): how many month
+
+            Returns:
+                total (int) : total + monthly_value for every month
+        """
+        if float(total).is_integer() and float(monthly_value).is_integer():
+            # whole number is exact, multiplying give the same result
+            return total + monthly_value * months
+        #end if
+        # adding month by month keep the exact same floating point result
+        # as the value paid every month
+        for _ in range(months):
+            total = total + monthly_value
+        #end for
+        return total
+    #end def
+
     def annual_fee(self, working_months, year, with_bpjs=True):
         """
             calculate annual bpjs fee
@@ -350,13 +580,13 @@ class Bpjs:
             parameter:
                 working_months -- working_months
                 year -- year
-        """
-        monthly_bpjs = []
 
+            return:
+                BpjsContribution
+        """
         total_salary = self.base_salary
         if self.is_salary_allowances is True:
-            fixed_allowances = self.summarize( self.fixed_allowances )
-            non_fixed_allowances = self.summarize( self.non_fixed_allowances )
+            fixed_allowances, non_fixed_allowances = self._allowance_totals()
             total_salary = total_salary + non_fixed_allowances + fixed_allowances
         #end if
 
@@ -370,113 +600,60 @@ class Bpjs:
         annual_death_insurance     = 0
         annual_accident_insurance  = 0
 
-        if with_bpjs is True:
+        if with_bpjs is True and working_months > 0:
         # only calculate bpjs if is enabled and automatically set everthing to zero when is false
-            start_month = 1
-            for month in range(start_month, working_months+1):
-
-                company_old_age_insurance = 0
-                individual_old_age_insurance = 0
-                if self.old_age_insurance_status is True:
-                    company_old_age_insurance = \
-                    self._company_old_age_insurance(total_salary)
-
-                    individual_old_age_insurance = \
-                    self._individual_old_age_insurance(total_salary)
-                #end if
-
-                company_pension_insurance    = 0
-                individual_pension_insurance = 0
-                if self.pension_insurance_status is True:
-                    company_pension_insurance = \
-                    self._company_pension_insurance(total_salary, month, year)
-
-                    individual_pension_insurance = \
-                    self._individual_pension_insurance(total_salary, month, year)
-                #end if
-
-                company_health_insurance    = 0
-                individual_health_insurance = 0
-                if self.health_insurance_status is True:
-                    company_health_insurance = \
-                    self._company_health_insurance(total_salary)
-
-                    individual_health_insurance = \
-                    self._individual_health_insurance(total_salary)
-                #end if
-
-                death_insurance = 0
-                if self.death_insurance_status is True:
-                    death_insurance = self._death_insurance(total_salary)
-                #end if
-
-                accident_insurance = 0
-                if self.accident_insurance_status is True:
-                    accident_insurance = \
-                    self._accident_insurance(total_salary, \
-                                                  self.industry_risk_rate)
-                #end if
-
-                monthly = {
-                    "old_age_insurance" : {
-                        "company"    : company_old_age_insurance,
-                        "individual" : individual_old_age_insurance,
-                    },
-                    "pension_insurance" : {
-                        "company"    : company_pension_insurance,
-                        "individual" : individual_pension_insurance,
-                    },
-                    "health_insurance" : {
-                        "company"    : company_health_insurance,
-                        "individual" : individual_health_insurance,
-                    },
-                    "death_insurance" : death_insurance,
-                    "accident_insurance" : accident_insurance
-                }
-
-                monthly_bpjs.append(monthly)
-
-                annual_c_old_age_insurance = annual_c_old_age_insurance \
-                                                  + company_old_age_insurance
-
-                annual_i_old_age_insurance = annual_i_old_age_insurance \
-                                                  + individual_old_age_insurance
-
-                annual_c_pension_insurance = annual_c_pension_insurance \
-                                                  + company_pension_insurance
-
-                annual_i_pension_insurance = annual_i_pension_insurance \
-                                                  + individual_pension_insurance
-
-                annual_c_health_insurance = annual_c_health_insurance \
-                                                 + company_health_insurance
-
-                annual_i_health_insurance = annual_i_health_insurance \
-                                                 + individual_health_insurance
-
-                annual_death_insurance = annual_death_insurance\
-                                              + death_insurance
-
-                annual_accident_insurance = annual_accident_insurance\
-                                                 + accident_insurance
-            #end for
-
-        annual_bpjs = {
-            "old_age_insurance" : {
-                "company"    : annual_c_old_age_insurance,
-                "individual" : annual_i_old_age_insurance,
-            },
-            "pension_insurance" : {
-                "company"    : annual_c_pension_insurance,
-                "individual" : annual_i_pension_insurance,
-            },
-            "health_insurance" : {
-                "company"    : annual_c_health_insurance,
-                "individual" : annual_i_health_insurance,
-            },
-            "death_insurance" : annual_death_insurance,
-            "accident_insurance" : annual_accident_insurance
-        }
+            accumulate = self._accumulate
+
+            # every contribution except pension is the same for every month
+            if self.old_age_insurance_status is True:
+                annual_c_old_age_insurance = accumulate(
+                    0, self._company_old_age_insurance(total_salary), working_months)
+                annual_i_old_age_insurance = accumulate(
+                    0, self._individual_old_age_insurance(total_salary), working_months)
+            #end if
+
+            if self.pension_insurance_status is True:
+                for month, months in self._pension_segments(working_months, year):
+                    annual_c_pension_insurance = accumulate(
+                        annual_c_pension_insurance,
+                        self._company_pension_insurance(total_salary, month, year),
+                        months)
+                    annual_i_pension_insurance = accumulate(
+                        annual_i_pension_insurance,
+                        self._individual_pension_insurance(total_salary, month, year),
+                        months)
+                #end for
+            #end if
+
+            if self.health_insurance_status is True:
+                annual_c_health_insurance = accumulate(
+                    0, self._company_health_insurance(total_salary), working_months)
+                annual_i_health_insurance = accumulate(
+                    0, self._individual_health_insurance(total_salary), working_months)
+            #end if
+
+            if self.death_insurance_status is True:
+                annual_death_insurance = accumulate(
+                    0, self._death_insurance(total_salary), working_months)
+            #end if
+
+            if self.accident_insurance_status is True:
+                annual_accident_insurance = accumulate(
+                    0, self._accident_insurance(total_salary, self.industry_risk_rate),
+                    working_months)
+            #end if
+        #end if
+
+        annual_bpjs = BpjsContribution(
+            old_age_insurance=InsuranceShare(annual_c_old_age_insurance,
+                                             annual_i_old_age_insurance),
+            pension_insurance=InsuranceShare(annual_c_pension_insurance,
+                                             annual_i_pension_insurance),
+            health_insurance=InsuranceShare(annual_c_health_insurance,
+                                            annual_i_health_insurance),
+            death_insurance=annual_death_insurance,
+            accident_insurance=annual_accident_insurance
+        )
         return annual_bpjs
     #end def
 #end class
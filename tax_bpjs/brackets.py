@@ -0,0 +1,114 @@
+"""
+    Progressive Tax Bracket
+"""
+from bisect import bisect_left
+
+ORDINALS = (
+    "first", "second", "third", "fourth", "fifth",
+    "sixth", "seventh", "eighth", "ninth", "tenth"
+)
+
+def ordered_values(grade):
+    """
+        Function to convert pph grade configuration into ordered list
+
+        Args:
+            grade (dictionary / list): {"first" : .., "second" : ..} or [.., ..]
+
+        Returns:
+            values (list) : grade value ordered from the lowest bracket
+    """
+    if isinstance(grade, dict):
+        keys = [key for key in ORDINALS if key in grade]
+        if len(keys) == len(grade):
+            return [grade[key] for key in keys]
+        #end if
+        return list(grade.values())
+    #end if
+    return list(grade)
+#end def
+
+class BracketTable:
+    """ Compiled progressive tax bracket """
+    __slots__ = ("thresholds", "rates", "lower_bounds", "cumulative_tax",
+                 "_arrays")
+
+    def __init__(self, pph_grade_rate, pph_grade_range):
+        """
+        Args:
+            pph_grade_rate (dictionary / list): tax rate for every bracket
+            pph_grade_range (dictionary / list): upper limit of every bracket
+            except the last one
+        """
+        rates = ordered_values(pph_grade_rate)
+        thresholds = ordered_values(pph_grade_range)
+
+        if len(rates) != len(thresholds) + 1:
+            raise ValueError("pph_grade_rate must have one more grade than "
+                             "pph_grade_range")
+        #end if
+        for lower, upper in zip(thresholds, thresholds[1:]):
+            if upper <= lower:
+                raise ValueError("pph_grade_range must be increasing")
+            #end if
+        #end for
+
+        lower_bounds = [0] + thresholds
+        # tax paid when income reach the lower bound of every bracket
+        cumulative_tax = [0]
+        for index, threshold in enumerate(thresholds):
+            cumulative_tax.append(cumulative_tax[index] + rates[index] *
+                                  (threshold - lower_bounds[index]))
+        #end for
+
+        self.thresholds     = tuple(thresholds)
+        self.rates          = tuple(rates)
+        self.lower_bounds   = tuple(lower_bounds)
+        self.cumulative_tax = tuple(cumulative_tax)
+        self._arrays        = None
+    #end def
+
+    def tax(self, annual_taxable_income):
+        """
+            Function to calculate tax on annual taxable income
+
+            Args:
+                annual_taxable_income (int): The amount of person annual taxable income.
+
+            Returns:
+                tax_on_income (int) : The amount of tax that person have to pay annually.
+        """
+        index = bisect_left(self.thresholds, annual_taxable_income)
+        return self.cumulative_tax[index] + \
+               (annual_taxable_income - self.lower_bounds[index]) * self.rates[index]
+    #end def
+
+    def tax_batch(self, annual_taxable_income):
+        """
+            Function to calculate tax on many annual taxable income at once (require numpy)
+
+            Args:
+                annual_taxable_income (ndarray): annual taxable income
+
+            Returns:
+                tax_on_income (ndarray) : tax for every taxable income
+        """
+        from tax_bpjs.batch import np, require_numpy
+        require_numpy()
+
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self.thresholds),
+                np.asarray(self.rates, dtype=float),
+                np.asarray(self.lower_bounds),
+                np.asarray(self.cumulative_tax, dtype=float),
+            )
+        #end if
+        thresholds, rates, lower_bounds, cumulative_tax = self._arrays
+
+        annual_taxable_income = np.asarray(annual_taxable_income)
+        index = np.searchsorted(thresholds, annual_taxable_income, side="left")
+        return cumulative_tax[index] + \
+               (annual_taxable_income - lower_bounds[index]) * rates[index]
+    #end def
+#end class
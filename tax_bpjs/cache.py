@@ -0,0 +1,177 @@
+"""
+    Result Cache
+
+    Employee sharing the same salary grade, allowances and status get the
+    same result, the cache keep the result keyed by a fingerprint of every
+    input used by the calculation and the configuration.
+"""
+from collections import OrderedDict
+from datetime import date
+from hashlib import blake2b
+
+# fingerprint size in bytes
+FINGERPRINT_SIZE = 16
+
+DEFAULT_CACHE_SIZE = 65536
+
+# value that already has a stable repr, tagged with its type because equal
+# value of different type (True, 1, 1.0) is not calculated the same way
+_SCALAR_TYPES = frozenset((int, float, str, bool, type(None)))
+
+def canonical(value):
+    """
+        Function to convert value into a form that always has the same repr
+
+        Args:
+            value : number, string, date, dictionary, list
+
+        Returns:
+            value : scalar is converted into (type name, value), dictionary
+            into sorted tuple, list into tuple
+    """
+    kind = type(value)
+    if kind in _SCALAR_TYPES:
+        return (kind.__name__, value)
+    #end if
+    if isinstance(value, dict):
+        return tuple(sorted([(str(key), canonical(item)) for key, item in value.items()],
+                            key=lambda item: item[0]))
+    #end if
+    if isinstance(value, (list, tuple)):
+        return tuple([canonical(item) for item in value])
+    #end if
+    if isinstance(value, date):
+        return (kind.__name__, value.isoformat())
+    #end if
+    return (kind.__name__, value)
+#end def
+
+def fingerprint(*values):
+    """
+        Function to calculate a stable fingerprint, the same value give the
+        same fingerprint in every process
+
+        Args:
+            values : anything supported by canonical
+
+        Returns:
+            fingerprint (string) : hex digest
+    """
+    text = repr(canonical(values)).encode("utf-8")
+    return blake2b(text, digest_size=FINGERPRINT_SIZE).hexdigest()
+#end def
+
+class ResultCache:
+    """ bounded LRU cache of calculation result """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            maxsize (int): maximum result kept, the least recently used is
+            evicted first
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than zero. Current value was : {}"
+                             .format(maxsize))
+        #end if
+        self.maxsize = maxsize
+        self.configuration = None
+        self._results = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    #end def
+
+    def validate(self, configuration):
+        """
+            Function to drop every result when the configuration change
+
+            Args:
+                configuration (CompiledConfiguration): configuration used
+                by the calculator
+        """
+        if configuration.fingerprint != self.configuration:
+            if self._results:
+                self.invalidations += 1
+            #end if
+            self._results.clear()
+            self.configuration = configuration.fingerprint
+        #end if
+    #end def
+
+    def get(self, key, default=None):
+        """
+            Function to fetch a result
+
+            Args:
+                key (string): fingerprint
+                default : returned when the result is not cached
+
+            Returns:
+                result : cached result or default
+        """
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        #end try
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+    #end def
+
+    def put(self, key, result):
+        """
+            Function to keep a result
+
+            Args:
+                key (string): fingerprint
+                result : calculation result
+        """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+        #end if
+    #end def
+
+    def clear(self):
+        """ drop every result and reset the counter """
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    #end def
+
+    def stats(self):
+        """
+            Function to report the cache usage
+
+            Returns:
+                stats (dictionary) : size, hits, misses, hit_rate, evictions, invalidations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size"          : len(self._results),
+            "maxsize"       : self.maxsize,
+            "hits"          : self.hits,
+            "misses"        : self.misses,
+            "hit_rate"      : self.hits / lookups if lookups else 0.0,
+            "evictions"     : self.evictions,
+            "invalidations" : self.invalidations,
+        }
+    #end def
+
+    def __len__(self):
+        return len(self._results)
+    #end def
+
+    def __contains__(self, key):
+        return key in self._results
+    #end def
+#end class
@@ -0,0 +1,342 @@
+"""
+    Columnar Arrow / Parquet Payroll (require numpy, pyarrow for the file)
+
+    Employee columns are read from Arrow / Parquet straight into numpy array
+    (without copy when the type allow it), calculated by the batch
+    calculator and written back as Parquet columns. No dictionary is built
+    for any row, allowances stored as struct / map column are summarized
+    column by column.
+
+    usage : python -m tax_bpjs.columnar employees.parquet result.parquet -c configuration.json
+"""
+import argparse
+import json
+import sys
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # pragma: no cover
+    pa = None
+    pq = None
+
+from tax_bpjs import batch
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.records import EMPLOYEE_DEFAULTS, EMPLOYEE_FIELDS
+from tax_bpjs.stream import ID_FIELD, STATE_FIELDS
+from tax_bpjs.tax import Tax
+
+# value of a missing column, same as Employee and the stream reader
+DEFAULTS = {key : value for key, value in EMPLOYEE_DEFAULTS.items() if value is not None}
+
+def require_pyarrow():
+    """
+        Make sure pyarrow is available before reading / writing Arrow data
+
+        Raises:
+            ImportError : when pyarrow is not installed
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow / Parquet, "
+                          "install it using pip install tax_bpjs[parquet]")
+    #end if
+#end def
+
+def to_numpy(column):
+    """
+        Function to convert Arrow column into numpy array, numeric column
+        without null is not copied
+
+        Args:
+            column (Array / ChunkedArray): Arrow column
+
+        Returns:
+            values (ndarray) : one dimension array, struct / map / list column
+            is summarized for every row, null number become 0
+    """
+    np = batch.np
+    if isinstance(column, pa.ChunkedArray):
+        if column.num_chunks == 1:
+            column = column.chunk(0)
+        elif column.num_chunks == 0:
+            column = pa.array([], type=column.type)
+        else:
+            column = pa.concat_arrays(column.chunks)
+        #end if
+    #end if
+    kind = column.type
+
+    if pa.types.is_dictionary(kind):
+        column = column.dictionary_decode()
+        kind = column.type
+    #end if
+
+    if pa.types.is_struct(kind):
+        # allowance component stored as struct field
+        total = np.zeros(len(column), dtype=np.int64)
+        for index in range(kind.num_fields):
+            total = total + to_numpy(column.field(index))
+        #end for
+        return total
+    #end if
+
+    if pa.types.is_map(kind) or pa.types.is_list(kind) or pa.types.is_large_list(kind):
+        # allowance component stored as map / list, every row sum its own slice
+        values = to_numpy(column.items if pa.types.is_map(kind) else column.values)
+        offsets = column.offsets.to_numpy()
+        cumulative = np.concatenate(([0], np.cumsum(values)))
+        return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+    #end if
+
+    if pa.types.is_integer(kind) or pa.types.is_floating(kind):
+        if column.null_count:
+            column = column.fill_null(0)
+        #end if
+        return column.to_numpy(zero_copy_only=False)
+    #end if
+
+    values = column.to_numpy(zero_copy_only=False)
+    if np.issubdtype(values.dtype, np.datetime64):
+        # date is what Tax.working_months expect
+        values = values.astype("datetime64[D]")
+    #end if
+    return values
+#end def
+
+def read_table(table):
+    """
+        Function to convert Arrow table into employee columns
+
+        Args:
+            table (Table / RecordBatch): employee with the same column name as
+            Tax employee_information, employee_id and first / last annual tax
+            are kept when available
+
+        Returns:
+            columns (dictionary) : column name -> ndarray, missing column use
+            the Employee default as scalar
+    """
+    require_pyarrow()
+    batch.require_numpy()
+    columns = OrderedDict()
+    for name in table.column_names:
+        if name in EMPLOYEE_FIELDS or name == ID_FIELD or name in STATE_FIELDS:
+            columns[name] = to_numpy(table.column(name))
+        #end if
+    #end for
+    for key, value in DEFAULTS.items():
+        columns.setdefault(key, value)
+    #end for
+    return columns
+#end def
+
+def read_parquet(path):
+    """
+        Function to read employee columns from Parquet, other column is not read
+
+        Args:
+            path (string / file): Parquet file
+
+        Returns:
+            columns (dictionary) : same as read_table
+    """
+    require_pyarrow()
+    names = pq.read_schema(path).names
+    wanted = [name for name in names
+              if name in EMPLOYEE_FIELDS or name == ID_FIELD or name in STATE_FIELDS]
+    return read_table(pq.read_table(path, columns=wanted))
+#end def
+
+def _row_columns(columns):
+    """
+        Function to prepare the employee columns read by _row once, scalar
+        column (ex : missing column using its default) is kept as it is
+        instead of broadcast for every row
+
+        Args:
+            columns (dictionary): column name -> ndarray / scalar
+
+        Returns:
+            row_columns (dictionary) : employee field -> ndarray / scalar
+    """
+    np = batch.np
+    row_columns = OrderedDict()
+    for key in EMPLOYEE_FIELDS:
+        value = columns[key]
+        if not (isinstance(value, dict) or np.isscalar(value)):
+            value = np.asarray(value)
+        #end if
+        row_columns[key] = value
+    #end for
+    return row_columns
+#end def
+
+def _row(row_columns, index):
+    """
+        Function to build employee information of one employee, only used
+        for the row the vectorized calculation doesn't cover
+
+        Args:
+            row_columns (dictionary): result of _row_columns
+            index (int): employee index
+
+        Returns:
+            employee_information (dictionary) : employee information
+    """
+    ndarray = batch.np.ndarray
+    employee_information = {}
+    for key, value in row_columns.items():
+        if isinstance(value, ndarray):
+            value = value[index]
+        #end if
+        employee_information[key] = value.item() if hasattr(value, "item") else value
+    #end for
+    return employee_information
+#end def
+
+def calculate(columns, configuration, mode="tax", with_bpjs=True):
+    """
+        calculate every employee column at once (require numpy)
+
+        Args:
+            columns (dictionary): column name -> ndarray / scalar, ex : read_table
+            configuration (dictionary / CompiledConfiguration): configuration
+            mode (string): tax -- Tax.calculate_tax / bpjs -- Bpjs.monthly_fee
+            with_bpjs (boolean): calculate bpjs for tax
+
+        Returns:
+            results (dictionary) : column name -> ndarray, same column as
+            tax_bpjs.stream calculate
+    """
+    np = batch.np
+    batch.require_numpy()
+    configuration = CompiledConfiguration.compile(configuration)
+    results = OrderedDict()
+    if ID_FIELD in columns:
+        results[ID_FIELD] = columns[ID_FIELD]
+    #end if
+
+    if mode == "bpjs":
+        monthly = batch.monthly_fee_batch(columns, configuration)
+        for key, value in monthly.items():
+            if isinstance(value, dict):
+                for share, values in value.items():
+                    results[key + "_" + share] = values
+                #end for
+            else:
+                results[key] = value
+            #end if
+        #end for
+        return results
+    #end if
+    if mode != "tax":
+        raise ValueError("Invalid mode : {}".format(mode))
+    #end if
+
+    employee_columns = batch._employee_columns(columns)
+    size = employee_columns["size"]
+    working_months = employee_columns["working_months"]
+    annual_bpjs = batch._annual_bpjs_arrays(employee_columns, configuration, with_bpjs)
+    annual = batch._annual_tax_arrays(employee_columns, annual_bpjs, configuration)
+    annual_tax = annual["annual_tax"]
+
+    # same as Tax._deduction
+    monthly_tax = batch._monthly_array(annual_tax, working_months)
+    if "first_annual_tax" in columns:
+        first_annual_tax = batch._column(columns, "first_annual_tax", size, float)
+        monthly_tax = np.where(first_annual_tax > 0,
+                               batch._monthly_array(first_annual_tax, working_months),
+                               monthly_tax)
+    #end if
+    last_annual_tax = None
+    if "last_annual_tax" in columns:
+        last_annual_tax = batch._column(columns, "last_annual_tax", size, float)
+        monthly_tax = monthly_tax + np.where(last_annual_tax > 0,
+                                             annual_tax - last_annual_tax, 0)
+    #end if
+
+    results["monthly_tax"] = monthly_tax
+    for key in ("old_age_insurance", "pension_insurance", "health_insurance"):
+        results[key] = batch._monthly_array(annual_bpjs[key]["individual"], working_months)
+    #end for
+    results["working_months"] = working_months
+    results["annual_taxable_income"] = annual["annual_taxable_income"]
+    results["annual_tax"] = annual_tax
+
+    if last_annual_tax is not None:
+        # bonus tax is taken from the annual tax with bonus, the few employee
+        # with bonus and previous annual tax use the scalar calculator
+        bonus = batch._column(columns, "bonus_allowances", size)
+        first_annual_tax = batch._column(columns, "first_annual_tax", size, float) \
+                           if "first_annual_tax" in columns else np.zeros(size)
+        row_columns = None
+        for index in np.flatnonzero((last_annual_tax > 0) & (bonus > 0)).tolist():
+            if row_columns is None:
+                row_columns = _row_columns(columns)
+            #end if
+            tax = Tax(_row(row_columns, index), configuration, with_bpjs)
+            calculated_tax, deduction = tax.calculate_tax(float(last_annual_tax[index]),
+                                                          float(first_annual_tax[index]))
+            for key, value in deduction.items():
+                results[key][index] = value
+            #end for
+            results["annual_taxable_income"][index] = calculated_tax.annual_taxable_income
+            results["annual_tax"][index] = calculated_tax.annual_tax
+        #end for
+    #end if
+    return results
+#end def
+
+def to_table(results):
+    """
+        Function to convert result columns into Arrow table, numeric array
+        is not copied
+
+        Args:
+            results (dictionary): result of calculate
+
+        Returns:
+            table (Table) : Arrow table
+    """
+    require_pyarrow()
+    return pa.table(OrderedDict((name, pa.array(values)) for name, values in results.items()))
+#end def
+
+def write_parquet(results, path, **options):
+    """
+        Function to write result columns as Parquet
+
+        Args:
+            results (dictionary): result of calculate
+            path (string / file): Parquet file
+            options : passed to pyarrow.parquet.write_table, ex : compression
+    """
+    pq.write_table(to_table(results), path, **options)
+#end def
+
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(prog="tax_bpjs.columnar",
+                                     description="Calculate tax / bpjs from Parquet")
+    parser.add_argument("input", help="Parquet file")
+    parser.add_argument("output", help="Parquet file")
+    parser.add_argument("-c", "--configuration", required=True,
+                        help="configuration JSON file")
+    parser.add_argument("-m", "--mode", choices=("tax", "bpjs"), default="tax")
+    parser.add_argument("--without-bpjs", action="store_true",
+                        help="calculate tax without bpjs")
+    args = parser.parse_args(argv)
+
+    with open(args.configuration) as configuration_file:
+        configuration = CompiledConfiguration(json.load(configuration_file))
+    #end with
+
+    results = calculate(read_parquet(args.input), configuration, args.mode,
+                        not args.without_bpjs)
+    write_parquet(results, args.output)
+    return 0
+#end def
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+    Compiled Configuration
+"""
+import copy
+from numbers import Real
+
+from tax_bpjs.brackets import BracketTable
+from tax_bpjs.cache import fingerprint
+
+BPJS_KEYS = (
+    "health_max_fee",
+    "pension_max_fee",
+    "old_pension_max_fee",
+    "individual_health_insurance_rate",
+    "company_health_insurance_rate",
+    "death_insurance_rate",
+    "individual_old_age_insurance_rate",
+    "company_old_age_insurance_rate",
+    "individual_pension_insurance_rate",
+    "company_pension_insurance_rate",
+)
+
+TAX_KEYS = (
+    "max_occupation_support",
+    "occupation_support_rate",
+    "tax_exemption_grade",
+    "pph_grade_rate",
+    "pph_grade_range",
+)
+
+# dependents more than this considered as this
+MAX_DEPENDENTS = 3
+
+# configuration dictionary compiled by compile, see CompiledConfiguration.compile
+COMPILED_CACHE_SIZE = 32
+_compiled = {}
+
+class CompiledConfiguration:
+    """ Validated configuration that shared between calculator """
+    __slots__ = BPJS_KEYS + TAX_KEYS + (
+        "source",
+        "_fingerprint",
+        "max_individual_health_insurance",
+        "max_company_health_insurance",
+        "max_individual_pension_insurance",
+        "max_company_pension_insurance",
+        "old_max_individual_pension_insurance",
+        "old_max_company_pension_insurance",
+        "bracket_table",
+        "tax_exemption_table",
+        "zero_occupation_support",
+    )
+
+    def __init__(self, configuration):
+        """
+        Args:
+            configuration (dictionary): same configuration used by Bpjs / Tax,
+            tax configuration is optional when only BPJS is calculated
+        """
+        set_value = super().__setattr__
+        set_value("source", copy.deepcopy(configuration))
+        set_value("_fingerprint", None)
+
+        for key in BPJS_KEYS:
+            set_value(key, self._number(configuration, key))
+        #end for
+
+        set_value("max_individual_health_insurance",
+                  self.health_max_fee * self.individual_health_insurance_rate)
+        set_value("max_company_health_insurance",
+                  self.health_max_fee * self.company_health_insurance_rate)
+        set_value("max_individual_pension_insurance",
+                  self.pension_max_fee * self.individual_pension_insurance_rate)
+        set_value("max_company_pension_insurance",
+                  self.pension_max_fee * self.company_pension_insurance_rate)
+        set_value("old_max_individual_pension_insurance",
+                  self.old_pension_max_fee * self.individual_pension_insurance_rate)
+        set_value("old_max_company_pension_insurance",
+                  self.old_pension_max_fee * self.company_pension_insurance_rate)
+
+        for key in TAX_KEYS:
+            set_value(key, None)
+        #end for
+        set_value("bracket_table", None)
+        set_value("tax_exemption_table", None)
+        set_value("zero_occupation_support", None)
+
+        if any(key in configuration for key in TAX_KEYS):
+            self._compile_tax(configuration)
+        #end if
+    #end def
+
+    @staticmethod
+    def _number(configuration, key):
+        """
+            Function to fetch and validate numeric configuration value
+
+            Args:
+                configuration (dictionary): configuration
+                key (string): configuration key
+
+            Returns:
+                value (int) : configuration value
+        """
+        try:
+            value = configuration[key]
+        except KeyError:
+            raise ValueError("configuration is missing {}".format(key))
+        #end try
+        if isinstance(value, bool) or not isinstance(value, Real):
+            raise ValueError("configuration {} must be a number. Current value was : {}"
+                             .format(key, value))
+        #end if
+        if value < 0:
+            raise ValueError("configuration {} cannot be less than zero. Current value was : {}"
+                             .format(key, value))
+        #end if
+        return value
+    #end def
+
+    def _compile_tax(self, configuration):
+        """
+            Function to validate and precompute tax configuration
+
+            Args:
+                configuration (dictionary): configuration
+        """
+        set_value = super().__setattr__
+        set_value("max_occupation_support",
+                  self._number(configuration, "max_occupation_support"))
+        set_value("occupation_support_rate",
+                  self._number(configuration, "occupation_support_rate"))
+        # occupation support of a zero bonus
+        set_value("zero_occupation_support", 0 * self.occupation_support_rate)
+
+        for key in ("tax_exemption_grade", "pph_grade_rate", "pph_grade_range"):
+            if key not in configuration:
+                raise ValueError("configuration is missing {}".format(key))
+            #end if
+            set_value(key, self.source[key])
+        #end for
+
+        set_value("bracket_table", BracketTable(self.pph_grade_rate,
+                                                self.pph_grade_range))
+
+        tax_exemption_grade = self.tax_exemption_grade
+        if "PERSON" not in tax_exemption_grade:
+            raise ValueError("configuration tax_exemption_grade is missing PERSON")
+        #end if
+        # tax exemption for every marital status and dependents
+        tax_exemption_table = {}
+        for marital_status, base_tax_grade in tax_exemption_grade.items():
+            for dependents in range(MAX_DEPENDENTS + 1):
+                tax_exemption_table[(marital_status, dependents)] = \
+                base_tax_grade + tax_exemption_grade["PERSON"] * dependents
+            #end for
+        #end for
+        set_value("tax_exemption_table", tax_exemption_table)
+    #end def
+
+    @classmethod
+    def compile(cls, configuration):
+        """
+            Function to compile configuration, compiled configuration is returned as it is
+
+            the same dictionary passed again (ex : Tax(info, configuration) for
+            every employee) reuse its compiled configuration as long as its
+            content doesn't change
+
+            Args:
+                configuration (dictionary / CompiledConfiguration): configuration
+
+            Returns:
+                configuration (CompiledConfiguration) : compiled configuration
+        """
+        if isinstance(configuration, cls):
+            return configuration
+        #end if
+        key = (cls, id(configuration))
+        compiled = _compiled.get(key)
+        if compiled is not None and compiled.source == configuration:
+            return compiled
+        #end if
+        compiled = cls(configuration)
+        if len(_compiled) >= COMPILED_CACHE_SIZE:
+            _compiled.clear()
+        #end if
+        _compiled[key] = compiled
+        return compiled
+    #end def
+
+    @property
+    def fingerprint(self):
+        """ stable between process, used to key cached result """
+        if self._fingerprint is None:
+            super().__setattr__("_fingerprint", fingerprint(self.source))
+        #end if
+        return self._fingerprint
+    #end def
+
+    @property
+    def has_tax(self):
+        """ True when the tax part of the configuration is available """
+        return self.bracket_table is not None
+    #end def
+
+    def tax_exemption(self, marital_status, dependents):
+        """
+            Function to determine a person tax exemption amount
+
+            Args:
+                marital_status (string): The marital status of a person
+                dependents(int) : How many dependents that person have.
+
+            Returns:
+                tax_exemption(int) : The tax exemption amount for a person\
+                                     based on marital status and dependents.
+        """
+        if dependents > MAX_DEPENDENTS:
+            dependents = MAX_DEPENDENTS
+        #end if
+        try:
+            return self.tax_exemption_table[(marital_status, dependents)]
+        except KeyError:
+            if marital_status not in self.tax_exemption_grade:
+                return 0
+            #end if
+        #end try
+        return self.tax_exemption_grade[marital_status] + \
+               self.tax_exemption_grade["PERSON"] * dependents
+    #end def
+
+    def __setattr__(self, key, value):
+        raise AttributeError("CompiledConfiguration is immutable")
+    #end def
+
+    def __reduce__(self):
+        return (self.__class__, (self.source,))
+    #end def
+
+    def __repr__(self):
+        return "CompiledConfiguration({!r})".format(self.source)
+    #end def
+#end class
@@ -0,0 +1,293 @@
+"""
+    Gross Up Solver for NETT Tax Method
+
+    The employer pay a tax allowance so the employee take home pay doesn't
+    change, the allowance is part of the bruto income so it is taxed too.
+    The solver find the smallest annual allowance A where
+
+        A == annual tax of (bruto income + A)
+
+    The annual tax is piecewise linear on A (occupation support cap and tax
+    bracket) except the taxable income that is rounded down to 1000. Every
+    linear piece is solved in closed form, the answer is then refined using
+    the exact calculation which only take a few evaluations. Bisection is
+    used when no linear piece can be solved.
+"""
+from collections import namedtuple
+
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.records import Record
+from tax_bpjs.tax import Tax
+
+# taxable income is rounded down to this
+TAXABLE_INCOME_ROUNDING = 1000
+
+# exact evaluation allowed before falling back to bisection
+MAX_ITERATIONS = 32
+
+class GrossUp(Record, namedtuple("GrossUp", [
+        "working_months",
+        "tax_allowance",
+        "annual_tax_allowance",
+        "annual_tax",
+        "evaluations"])):
+    """
+        tax allowance that cover the tax of itself, tax_allowance is monthly,
+        evaluations is how many time the annual tax has been calculated.
+        The allowance is added to the bruto income only, it is not part of
+        the BPJS salary
+    """
+    __slots__ = ()
+#end class
+
+class _AnnualTaxFunction:
+    """ annual tax of an employee as a function of the annual tax allowance """
+    __slots__ = ("tax", "annual_base", "annual_bruto_income", "bonus", "evaluations")
+
+    def __init__(self, tax, bonus_allowances):
+        """
+        Args:
+            tax (Tax): calculator of the employee
+            bonus_allowances (int): bonus included in the annual tax
+        """
+        self.tax = tax
+        self.annual_base = tax._annual_base(tax.base_salary, tax.overtime_allowances,
+                                            tax.non_fixed_allowances)
+        self.annual_bruto_income = self.annual_base[2].annual_bruto_income
+        self.bonus = bonus_allowances
+        self.evaluations = 0
+    #end def
+
+    def net_income(self, annual_tax_allowance):
+        """
+            Function to calculate annual net income including the allowance
+
+            Args:
+                annual_tax_allowance (int): annual tax allowance
+
+            Returns:
+                annual_net_income (int) : annual net income
+        """
+        tax = self.tax
+        annual_bruto_income = self.annual_bruto_income + annual_tax_allowance + self.bonus
+        return tax.annual_net_income(annual_bruto_income, self.bonus,
+                                     self.annual_base[1]).annual_net_income
+    #end def
+
+    def __call__(self, annual_tax_allowance):
+        """
+            Function to calculate annual tax including the allowance
+
+            Args:
+                annual_tax_allowance (int): annual tax allowance
+
+            Returns:
+                annual_tax (int) : annual tax
+        """
+        self.evaluations += 1
+        tax = self.tax
+        annual_taxable_income = tax._taxable_income_yearly(
+            self.net_income(annual_tax_allowance), tax.marital_status, tax.dependents,
+            self.annual_base[3])
+        annual_tax = tax._tax_on_taxable_income_yearly(annual_taxable_income)
+        return annual_tax + tax._non_tax_charge(tax.npwp_status, annual_tax)
+    #end def
+#end class
+
+def _closed_form(function):
+    """
+        Function to solve every linear piece of the annual tax without the
+        rounding of the taxable income
+
+        Args:
+            function (_AnnualTaxFunction): annual tax
+
+        Returns:
+            annual_tax_allowance (float) : the allowance, None when no piece
+            can be solved
+            slope (float) : the highest slope of the annual tax
+    """
+    tax = function.tax
+    configuration = tax.configuration
+    bracket_table = configuration.bracket_table
+    # additional charge scale the whole tax
+    charge = 1 + float(tax._non_tax_charge(tax.npwp_status, 1000000)) / 1000000
+
+    tax_exemption = function.annual_base[3]
+    # taxable income without allowance before rounding
+    taxable_income = float(function.net_income(0) - tax_exemption)
+    salary_income = float(function.annual_bruto_income)
+    rate = configuration.occupation_support_rate
+    maximum = configuration.max_occupation_support
+
+    # (first allowance of the piece, taxable income at the first allowance,
+    # taxable income added for every allowance, last allowance of the piece)
+    pieces = []
+    if rate > 0 and salary_income * rate < maximum:
+        cap = maximum / rate - salary_income
+        pieces.append((0, taxable_income, 1 - rate, cap))
+        pieces.append((cap, taxable_income + cap * (1 - rate), 1, None))
+    else:
+        pieces.append((0, taxable_income, 1, None))
+    #end if
+
+    slope = charge * max(bracket_table.rates)
+    for start, taxable_income, growth, end in pieces:
+        for index, lower in enumerate(bracket_table.lower_bounds):
+            upper = None
+            if index < len(bracket_table.thresholds):
+                upper = bracket_table.thresholds[index]
+            #end if
+            bracket_rate = bracket_table.rates[index]
+            denominator = 1 - charge * bracket_rate * growth
+            if denominator <= 0:
+                continue
+            #end if
+            # A = charge x (cumulative tax + rate x (taxable income + growth x (A - start) - lower))
+            allowance = charge * (bracket_table.cumulative_tax[index] + bracket_rate *
+                                  (taxable_income - growth * start - lower)) / denominator
+            taxable = taxable_income + growth * (allowance - start)
+            if allowance < start or (end is not None and allowance > end):
+                continue
+            #end if
+            if taxable < lower or (upper is not None and taxable > upper):
+                continue
+            #end if
+            return allowance, slope
+        #end for
+    #end for
+    return None, slope
+#end def
+
+def _iterate(function, annual_tax_allowance):
+    """
+        Function to apply the annual tax until the allowance cover its own tax
+
+        Args:
+            function (_AnnualTaxFunction): annual tax
+            annual_tax_allowance (int): allowance not greater than the answer
+
+        Returns:
+            annual_tax_allowance (int) : the answer, None when it doesn't converge
+    """
+    for _ in range(MAX_ITERATIONS):
+        annual_tax = function(annual_tax_allowance)
+        if annual_tax == annual_tax_allowance:
+            return annual_tax_allowance
+        #end if
+        annual_tax_allowance = annual_tax
+    #end for
+    return None
+#end def
+
+def _bisect(function):
+    """
+        Function to find the allowance using bisection
+
+        Args:
+            function (_AnnualTaxFunction): annual tax
+
+        Returns:
+            annual_tax_allowance (int) : the answer
+    """
+    lower = 0
+    upper = max(function(0), 1)
+    while function(upper) > upper:
+        lower, upper = upper, upper * 2
+    #end while
+    # lower doesn't cover its own tax, upper does
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        if function(middle) > middle:
+            lower = middle
+        else:
+            upper = middle
+        #end if
+    #end while
+    annual_tax_allowance = _iterate(function, lower)
+    if annual_tax_allowance is None:
+        raise ValueError("tax allowance doesn't converge")
+    #end if
+    # neighbouring taxable income could cover its own tax too, keep the smallest
+    while annual_tax_allowance > 0:
+        smaller = _iterate(function, max(annual_tax_allowance - TAXABLE_INCOME_ROUNDING, 0))
+        if smaller is None or smaller >= annual_tax_allowance:
+            break
+        #end if
+        annual_tax_allowance = smaller
+    #end while
+    return annual_tax_allowance
+#end def
+
+def solve(tax, bonus_allowances=0):
+    """
+        Function to calculate tax allowance of a calculator
+
+        Args:
+            tax (Tax): calculator of the employee
+            bonus_allowances (int): bonus included in the annual tax
+
+        Returns:
+            GrossUp
+    """
+    function = _AnnualTaxFunction(tax, bonus_allowances)
+
+    annual_tax_allowance = None
+    if function(0) == 0:
+        annual_tax_allowance = 0
+    else:
+        estimate, slope = _closed_form(function)
+        if estimate is not None and slope < 1:
+            # rounding down the taxable income lower the tax by less than
+            # slope x rounding, start below the answer by that much
+            margin = slope * TAXABLE_INCOME_ROUNDING / (1 - slope) + 1
+            annual_tax_allowance = _iterate(function, max(int(estimate - margin), 0))
+        #end if
+        if annual_tax_allowance is None:
+            annual_tax_allowance = _bisect(function)
+        #end if
+    #end if
+
+    working_months = function.annual_base[0]
+    return GrossUp(
+        working_months=working_months,
+        tax_allowance=tax._monthly(annual_tax_allowance, working_months),
+        annual_tax_allowance=annual_tax_allowance,
+        annual_tax=annual_tax_allowance,
+        evaluations=function.evaluations
+    )
+#end def
+
+def gross_up(employee_information, configuration, with_bpjs=True, bonus_allowances=0):
+    """
+        calculate tax allowance for an employee
+
+        Args:
+            employee_information (dictionary / Employee): same as Tax
+            configuration (dictionary / CompiledConfiguration): same as Tax
+            with_bpjs (boolean): calculate bpjs or not
+            bonus_allowances (int): bonus included in the annual tax
+
+        Returns:
+            GrossUp
+    """
+    return solve(Tax(employee_information, configuration, with_bpjs), bonus_allowances)
+#end def
+
+def gross_up_batch(employees, configuration, with_bpjs=True):
+    """
+        calculate tax allowance for a whole payroll
+
+        Args:
+            employees (iterable): employee information
+            configuration (dictionary / CompiledConfiguration): same as Tax
+            with_bpjs (boolean): calculate bpjs or not
+
+        Returns:
+            results (generator) : GrossUp for every employee in the same order
+    """
+    configuration = CompiledConfiguration.compile(configuration)
+    for employee_information in employees:
+        yield solve(Tax(employee_information, configuration, with_bpjs))
+    #end for
+#end def
@@ -0,0 +1,533 @@
+"""
+    Exact Money Mode
+
+    Integer mode keep every rate as parts per million and every amount as
+    whole rupiah, Decimal mode do the same calculation using Decimal. Both
+    use the same explicit rounding :
+        contribution, occupation support and tax -- half up to whole rupiah
+        death insurance -- truncated to whole rupiah
+        accident insurance -- half up to whole rupiah
+        monthly value -- truncated toward zero
+"""
+from bisect import bisect_left
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from functools import lru_cache
+from numbers import Integral
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+
+# rate unit of the integer mode
+PPM = 1000000
+HALF_PPM = PPM // 2
+
+# additional charge when the employee doesn't have NPWP, same as Tax._non_tax_charge
+NON_NPWP_CHARGE_RATE = 0.2
+
+ONE = Decimal(1)
+
+def to_decimal(value):
+    """
+        Function to convert number into Decimal without binary floating point error
+
+        Args:
+            value (int / float / Decimal): number
+
+        Returns:
+            value (Decimal) : 0.037 is Decimal("0.037")
+    """
+    if isinstance(value, Decimal):
+        return value
+    #end if
+    if isinstance(value, Integral):
+        return Decimal(value)
+    #end if
+    return Decimal(repr(value))
+#end def
+
+def to_ppm(rate, scale=1):
+    """
+        Function to convert rate into parts per million
+
+        Args:
+            rate (int / float / Decimal): rate, ex : 0.037
+            scale (int): rate is divided by this, 100 for percentage
+
+        Returns:
+            rate (int) : 0.037 is 37000
+    """
+    value = to_decimal(rate) * PPM / scale
+    if value != value.to_integral_value():
+        raise ValueError("rate {} cannot be represented in parts per million".format(rate))
+    #end if
+    return int(value)
+#end def
+
+def to_rupiah(value):
+    """
+        Function to convert amount into whole rupiah
+
+        Args:
+            value (int / float / Decimal): amount
+
+        Returns:
+            value (int) : amount in rupiah
+    """
+    if type(value) is int:
+        return value
+    #end if
+    if isinstance(value, Integral) and not isinstance(value, bool):
+        return int(value)
+    #end if
+    value = to_decimal(value)
+    if value != value.to_integral_value():
+        raise ValueError("amount {} is not a whole rupiah".format(value))
+    #end if
+    return int(value)
+#end def
+
+class MoneyRates:
+    """ configuration rates converted for one money mode """
+    __slots__ = (
+        "individual_health_insurance_rate",
+        "company_health_insurance_rate",
+        "death_insurance_rate",
+        "individual_old_age_insurance_rate",
+        "company_old_age_insurance_rate",
+        "individual_pension_insurance_rate",
+        "company_pension_insurance_rate",
+        "max_individual_health_insurance",
+        "max_company_health_insurance",
+        "max_individual_pension_insurance",
+        "max_company_pension_insurance",
+        "old_max_individual_pension_insurance",
+        "old_max_company_pension_insurance",
+        "occupation_support_rate",
+        "max_occupation_support",
+        "non_npwp_charge_rate",
+        "pph_grade_rate",
+        "cumulative_tax",
+    )
+
+    def __init__(self, configuration, money):
+        """
+        Args:
+            configuration (CompiledConfiguration): configuration
+            money (class): IntegerMoney / DecimalMoney
+        """
+        rate = money.rate
+        amount = money.amount
+        half_up = money._half_up
+
+        for key in ("individual_health_insurance_rate", "company_health_insurance_rate",
+                    "death_insurance_rate", "individual_old_age_insurance_rate",
+                    "company_old_age_insurance_rate", "individual_pension_insurance_rate",
+                    "company_pension_insurance_rate"):
+            setattr(self, key, rate(getattr(configuration, key)))
+        #end for
+
+        health_max_fee = amount(configuration.health_max_fee)
+        pension_max_fee = amount(configuration.pension_max_fee)
+        old_pension_max_fee = amount(configuration.old_pension_max_fee)
+        self.max_individual_health_insurance = \
+        half_up(health_max_fee * self.individual_health_insurance_rate)
+        self.max_company_health_insurance = \
+        half_up(health_max_fee * self.company_health_insurance_rate)
+        self.max_individual_pension_insurance = \
+        half_up(pension_max_fee * self.individual_pension_insurance_rate)
+        self.max_company_pension_insurance = \
+        half_up(pension_max_fee * self.company_pension_insurance_rate)
+        self.old_max_individual_pension_insurance = \
+        half_up(old_pension_max_fee * self.individual_pension_insurance_rate)
+        self.old_max_company_pension_insurance = \
+        half_up(old_pension_max_fee * self.company_pension_insurance_rate)
+
+        self.occupation_support_rate = None
+        self.max_occupation_support = None
+        self.non_npwp_charge_rate = None
+        self.pph_grade_rate = None
+        self.cumulative_tax = None
+        if configuration.has_tax:
+            self.occupation_support_rate = rate(configuration.occupation_support_rate)
+            self.max_occupation_support = amount(configuration.max_occupation_support)
+            self.non_npwp_charge_rate = rate(NON_NPWP_CHARGE_RATE)
+
+            bracket_table = configuration.bracket_table
+            self.pph_grade_rate = tuple(rate(value) for value in bracket_table.rates)
+            # tax at the lower bound of every bracket, not rounded yet
+            cumulative_tax = [0]
+            for index, threshold in enumerate(bracket_table.thresholds):
+                cumulative_tax.append(cumulative_tax[index] + self.pph_grade_rate[index] *
+                                      (amount(threshold) - amount(bracket_table.lower_bounds[index])))
+            #end for
+            self.cumulative_tax = tuple(cumulative_tax)
+        #end if
+    #end def
+#end class
+
+@lru_cache(maxsize=32)
+def _compile_rates(configuration, money):
+    """
+        Function to convert configuration rates once for every configuration
+
+        Args:
+            configuration (CompiledConfiguration): configuration
+            money (class): IntegerMoney / DecimalMoney
+
+        Returns:
+            rates (MoneyRates) : converted rates
+    """
+    return MoneyRates(configuration, money)
+#end def
+
+class ExactMoney:
+    """
+        calculation shared by the exact money mode, every amount is
+        multiplied by the converted rate then rounded explicitly
+    """
+    __slots__ = ()
+
+    def _individual_health_insurance(self, total_salary):
+        """ bpjs health individual, rounded half up """
+        rates = self.rates
+        if total_salary <= self.configuration.health_max_fee:
+            return self._half_up(total_salary * rates.individual_health_insurance_rate)
+        #end if
+        return rates.max_individual_health_insurance
+    #end def
+
+    def _company_health_insurance(self, total_salary):
+        """ bpjs health paid by company, rounded half up """
+        rates = self.rates
+        if total_salary <= self.configuration.health_max_fee:
+            return self._half_up(total_salary * rates.company_health_insurance_rate)
+        #end if
+        return rates.max_company_health_insurance
+    #end def
+
+    def _accident_insurance(self, total_salary, industry_risk_rate):
+        """ bpjs accident insurance, industry risk rate is a percentage, rounded half up """
+        return self._half_up(total_salary * self.risk_rate(industry_risk_rate))
+    #end def
+
+    def _death_insurance(self, total_salary):
+        """ bpjs death insurance, truncated """
+        return self._truncate(total_salary * self.rates.death_insurance_rate)
+    #end def
+
+    def _company_old_age_insurance(self, total_salary):
+        """ company old age insurance, rounded half up """
+        return self._half_up(total_salary * self.rates.company_old_age_insurance_rate)
+    #end def
+
+    def _individual_old_age_insurance(self, total_salary):
+        """ individual old age insurance, rounded half up """
+        return self._half_up(total_salary * self.rates.individual_old_age_insurance_rate)
+    #end def
+
+    def _individual_pension_insurance(self, total_salary, month=None, year=None):
+        """ individual pension insurance, rounded half up """
+        rates = self.rates
+        pension_max_fee = self.configuration.pension_max_fee
+        max_pension_insurance = rates.max_individual_pension_insurance
+        # special case in 2018
+        if year == 2018 and month <= 2:
+            pension_max_fee = self.configuration.old_pension_max_fee
+            max_pension_insurance = rates.old_max_individual_pension_insurance
+        #end if
+        if total_salary > pension_max_fee:
+            return max_pension_insurance
+        #end if
+        return self._half_up(total_salary * rates.individual_pension_insurance_rate)
+    #end def
+
+    def _company_pension_insurance(self, total_salary, month=None, year=None):
+        """ company pension insurance, rounded half up """
+        rates = self.rates
+        pension_max_fee = self.configuration.pension_max_fee
+        max_pension_insurance = rates.max_company_pension_insurance
+        # special case in 2018
+        if year == 2018 and month <= 2:
+            pension_max_fee = self.configuration.old_pension_max_fee
+            max_pension_insurance = rates.old_max_company_pension_insurance
+        #end if
+        if total_salary > pension_max_fee:
+            return max_pension_insurance
+        #end if
+        return self._half_up(total_salary * rates.company_pension_insurance_rate)
+    #end def
+
+    @staticmethod
+    def _accumulate(total, monthly_value, months):
+        """ exact amount can always be multiplied """
+        return total + monthly_value * months
+    #end def
+
+    def _occupation_support(self, annual_bruto_income):
+        """ occupation support, rounded half up """
+        rates = self.rates
+        occupation_support = self._half_up(annual_bruto_income * rates.occupation_support_rate)
+        if occupation_support > rates.max_occupation_support:
+            return rates.max_occupation_support
+        #end if
+        return occupation_support
+    #end def
+
+    @property
+    def _zero_occupation_support(self):
+        """ occupation support of a zero bonus """
+        return self.amount(0)
+    #end def
+
+    def _tax_on_taxable_income_yearly(self, annual_taxable_income):
+        """ progressive tax, rounded half up once """
+        rates = self.rates
+        bracket_table = self.configuration.bracket_table
+        index = bisect_left(bracket_table.thresholds, annual_taxable_income)
+        return self._half_up(rates.cumulative_tax[index] +
+                             (annual_taxable_income - bracket_table.lower_bounds[index]) *
+                             rates.pph_grade_rate[index])
+    #end def
+
+    def _non_tax_charge(self, npwp_status, annual_taxable_income):
+        """ 20% additional charge without NPWP, rounded half up """
+        if npwp_status is not True:
+            return self._half_up(annual_taxable_income * self.rates.non_npwp_charge_rate)
+        #end if
+        return self.amount(0)
+    #end def
+#end class
+
+class IntegerMoney(ExactMoney):
+    """ integer rupiah and parts per million rate """
+    __slots__ = ()
+
+    @staticmethod
+    def rate(value):
+        """ rate in parts per million """
+        return to_ppm(value)
+    #end def
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def risk_rate(industry_risk_rate):
+        """ industry risk percentage in parts per million """
+        return to_ppm(industry_risk_rate, 100)
+    #end def
+
+    @staticmethod
+    def amount(value):
+        """ amount in whole rupiah """
+        return to_rupiah(value)
+    #end def
+
+    @staticmethod
+    def _half_up(value):
+        """ amount x ppm rate rounded half up to rupiah """
+        return (value + HALF_PPM) // PPM
+    #end def
+
+    @staticmethod
+    def _truncate(value):
+        """ amount x ppm rate truncated to rupiah """
+        return value // PPM
+    #end def
+
+    @staticmethod
+    def _monthly(annual_net_income, working_months):
+        """ monthly value truncated toward zero """
+        if annual_net_income < 0:
+            return -(-annual_net_income // working_months)
+        #end if
+        return annual_net_income // working_months
+    #end def
+
+    @staticmethod
+    def summarize(allowances):
+        """ total allowances in whole rupiah """
+        if isinstance(allowances, dict):
+            return sum(map(int, allowances.values()))
+        #end if
+        return to_rupiah(allowances)
+    #end def
+
+    # the contribution below are called for every employee every month,
+    # rounding is inlined so integer mode is not slower than float
+
+    def _individual_health_insurance(self, total_salary):
+        """ bpjs health individual, rounded half up """
+        rates = self.rates
+        if total_salary <= self.configuration.health_max_fee:
+            return (total_salary * rates.individual_health_insurance_rate + HALF_PPM) // PPM
+        #end if
+        return rates.max_individual_health_insurance
+    #end def
+
+    def _company_health_insurance(self, total_salary):
+        """ bpjs health paid by company, rounded half up """
+        rates = self.rates
+        if total_salary <= self.configuration.health_max_fee:
+            return (total_salary * rates.company_health_insurance_rate + HALF_PPM) // PPM
+        #end if
+        return rates.max_company_health_insurance
+    #end def
+
+    def _accident_insurance(self, total_salary, industry_risk_rate):
+        """ bpjs accident insurance, industry risk rate is a percentage, rounded half up """
+        return (total_salary * self.risk_rate(industry_risk_rate) + HALF_PPM) // PPM
+    #end def
+
+    def _death_insurance(self, total_salary):
+        """ bpjs death insurance, truncated """
+        return total_salary * self.rates.death_insurance_rate // PPM
+    #end def
+
+    def _company_old_age_insurance(self, total_salary):
+        """ company old age insurance, rounded half up """
+        return (total_salary * self.rates.company_old_age_insurance_rate + HALF_PPM) // PPM
+    #end def
+
+    def _individual_old_age_insurance(self, total_salary):
+        """ individual old age insurance, rounded half up """
+        return (total_salary * self.rates.individual_old_age_insurance_rate + HALF_PPM) // PPM
+    #end def
+
+    def _individual_pension_insurance(self, total_salary, month=None, year=None):
+        """ individual pension insurance, rounded half up """
+        rates = self.rates
+        # special case in 2018
+        if year == 2018 and month <= 2:
+            if total_salary > self.configuration.old_pension_max_fee:
+                return rates.old_max_individual_pension_insurance
+            #end if
+        elif total_salary > self.configuration.pension_max_fee:
+            return rates.max_individual_pension_insurance
+        #end if
+        return (total_salary * rates.individual_pension_insurance_rate + HALF_PPM) // PPM
+    #end def
+
+    def _company_pension_insurance(self, total_salary, month=None, year=None):
+        """ company pension insurance, rounded half up """
+        rates = self.rates
+        # special case in 2018
+        if year == 2018 and month <= 2:
+            if total_salary > self.configuration.old_pension_max_fee:
+                return rates.old_max_company_pension_insurance
+            #end if
+        elif total_salary > self.configuration.pension_max_fee:
+            return rates.max_company_pension_insurance
+        #end if
+        return (total_salary * rates.company_pension_insurance_rate + HALF_PPM) // PPM
+    #end def
+
+    def _occupation_support(self, annual_bruto_income):
+        """ occupation support, rounded half up """
+        rates = self.rates
+        occupation_support = (annual_bruto_income * rates.occupation_support_rate
+                              + HALF_PPM) // PPM
+        if occupation_support > rates.max_occupation_support:
+            return rates.max_occupation_support
+        #end if
+        return occupation_support
+    #end def
+#end class
+
+class DecimalMoney(ExactMoney):
+    """ Decimal rupiah and Decimal rate """
+    __slots__ = ()
+
+    @staticmethod
+    def rate(value):
+        """ rate as Decimal """
+        return to_decimal(value)
+    #end def
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def risk_rate(industry_risk_rate):
+        """ industry risk percentage as Decimal """
+        return to_decimal(industry_risk_rate) / 100
+    #end def
+
+    @staticmethod
+    def amount(value):
+        """ amount as Decimal """
+        return to_decimal(value)
+    #end def
+
+    @staticmethod
+    def _half_up(value):
+        """ Decimal rounded half up to rupiah """
+        return to_decimal(value).quantize(ONE, rounding=ROUND_HALF_UP)
+    #end def
+
+    @staticmethod
+    def _truncate(value):
+        """ Decimal truncated to rupiah """
+        return to_decimal(value).quantize(ONE, rounding=ROUND_DOWN)
+    #end def
+
+    @staticmethod
+    def _monthly(annual_net_income, working_months):
+        """ monthly value truncated toward zero """
+        return (to_decimal(annual_net_income) / working_months).quantize(ONE,
+                                                                        rounding=ROUND_DOWN)
+    #end def
+
+    @staticmethod
+    def summarize(allowances):
+        """ total allowances as Decimal """
+        return to_decimal(Bpjs.summarize(allowances))
+    #end def
+#end class
+
+
+class IntegerBpjs(IntegerMoney, Bpjs):
+    """ BPJS calculated in whole rupiah """
+    __slots__ = ("rates",)
+
+    def __init__(self, employee_information, configuration, cache=None):
+        super().__init__(employee_information, configuration, cache)
+        self.base_salary = self.amount(self.base_salary)
+        self.rates = _compile_rates(self.configuration, IntegerMoney)
+    #end def
+#end class
+
+class IntegerTax(IntegerMoney, Tax):
+    """ PPh 21 calculated in whole rupiah """
+    __slots__ = ("rates",)
+
+    def __init__(self, employee_information, configuration, with_bpjs=True, cache=None):
+        super().__init__(employee_information, configuration, with_bpjs, cache)
+        amount = self.amount
+        self.base_salary = amount(self.base_salary)
+        self.overtime_allowances = amount(self.overtime_allowances)
+        self.bonus_allowances = amount(self.bonus_allowances)
+        self.rates = _compile_rates(self.configuration, IntegerMoney)
+    #end def
+#end class
+
+class DecimalBpjs(DecimalMoney, Bpjs):
+    """ BPJS calculated using Decimal """
+    __slots__ = ("rates",)
+
+    def __init__(self, employee_information, configuration, cache=None):
+        super().__init__(employee_information, configuration, cache)
+        self.base_salary = self.amount(self.base_salary)
+        self.rates = _compile_rates(self.configuration, DecimalMoney)
+    #end def
+#end class
+
+class DecimalTax(DecimalMoney, Tax):
+    """ PPh 21 calculated using Decimal """
+    __slots__ = ("rates",)
+
+    def __init__(self, employee_information, configuration, with_bpjs=True, cache=None):
+        super().__init__(employee_information, configuration, with_bpjs, cache)
+        amount = self.amount
+        self.base_salary = amount(self.base_salary)
+        self.overtime_allowances = amount(self.overtime_allowances)
+        self.bonus_allowances = amount(self.bonus_allowances)
+        self.rates = _compile_rates(self.configuration, DecimalMoney)
+    #end def
+#end class
@@ -0,0 +1,281 @@
+"""
+    Calculation Stage Profiling
+
+    The stage methods of the calculator are wrapped only while the profiler
+    is enabled, the calculator is not touched when it is disabled so there
+    is no overhead at all.
+
+    The methods are replaced on the class so the whole process see the
+    wrapper, only calls from the thread that enabled the profiler are
+    recorded (other thread, ex : TaxService executor, only pay for the thread
+    check). Allocation is traced for the whole process, profile a single
+    threaded run when recording allocations.
+
+    usage :
+        with StageProfiler() as profiler:
+            Tax(employee_information, configuration).calculate_tax(0, 0)
+        profiler.stats()
+        profiler.write_prometheus("/var/lib/node_exporter/tax_bpjs.prom")
+"""
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from functools import wraps
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+
+# stage of Tax.calculate_tax in calling order, _annual_base and
+# _annual_tax_from_base are used with and without the cache
+STAGES = (
+    "calculate_tax",
+    "_annual_base",
+    "working_months",
+    "annual_fee",
+    "monthly_fee",
+    "total_year_income",
+    "annual_net_income",
+    "_taxable_income_yearly",
+    "_tax_on_taxable_income_yearly",
+    "_annual_tax_from_base",
+    "_non_tax_charge",
+)
+
+PROMETHEUS_PREFIX = "tax_bpjs_stage"
+
+# only one profiler can wrap the calculator at the same time
+_ACTIVE = []
+
+class StageProfiler:
+    """ record calls, cumulative time and allocation of every stage """
+
+    def __init__(self, stages=STAGES, classes=(Bpjs, Tax), allocations=False, hook=None):
+        """
+        Args:
+            stages (tuple): method name to record
+            classes (tuple): class defining the method, subclass overriding
+            a stage (ex : IntegerTax) has to be listed to be recorded
+            allocations (boolean): record memory allocated using tracemalloc,
+            slower
+            hook (callable): called after every stage with (stage, seconds,
+            allocated bytes)
+        """
+        self.stages = tuple(stages)
+        self.classes = tuple(classes)
+        self.allocations = allocations
+        self.hook = hook
+        # stage -> [calls, seconds, allocated bytes]
+        self._counters = OrderedDict((stage, [0, 0.0, 0]) for stage in self.stages)
+        self._originals = []
+        self._started_tracemalloc = False
+        # only calls from this thread are recorded, set by enable
+        self._thread = None
+    #end def
+
+    @property
+    def enabled(self):
+        """ True when the calculator is wrapped """
+        return bool(self._originals)
+    #end def
+
+    def _wrap(self, stage, function):
+        """
+            Function to wrap a stage method
+
+            Args:
+                stage (string): stage name
+                function (callable): original function
+
+            Returns:
+                wrapper (callable) : function recording the stage
+        """
+        counter = self._counters[stage]
+        hook = self.hook
+        perf_counter = time.perf_counter
+        get_ident = threading.get_ident
+        thread = self._thread
+
+        if self.allocations:
+            get_traced_memory = tracemalloc.get_traced_memory
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if get_ident() != thread:
+                    return function(*args, **kwargs)
+                #end if
+                allocated = get_traced_memory()[0]
+                started = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    seconds = perf_counter() - started
+                    allocated = get_traced_memory()[0] - allocated
+                    counter[0] += 1
+                    counter[1] += seconds
+                    counter[2] += allocated
+                    if hook is not None:
+                        hook(stage, seconds, allocated)
+                    #end if
+                #end try
+            #end def
+            return wrapper
+        #end if
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if get_ident() != thread:
+                return function(*args, **kwargs)
+            #end if
+            started = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - started
+                counter[0] += 1
+                counter[1] += seconds
+                if hook is not None:
+                    hook(stage, seconds, 0)
+                #end if
+            #end try
+        #end def
+        return wrapper
+    #end def
+
+    def enable(self):
+        """ wrap every stage method of the calculator """
+        if self.enabled:
+            return
+        #end if
+        if _ACTIVE:
+            raise RuntimeError("another StageProfiler is already enabled")
+        #end if
+        self._thread = threading.get_ident()
+
+        for cls in self.classes:
+            for stage in self.stages:
+                original = cls.__dict__.get(stage)
+                if original is None:
+                    continue
+                #end if
+                if isinstance(original, staticmethod):
+                    wrapped = staticmethod(self._wrap(stage, original.__func__))
+                elif isinstance(original, classmethod):
+                    wrapped = classmethod(self._wrap(stage, original.__func__))
+                elif callable(original):
+                    wrapped = self._wrap(stage, original)
+                else:
+                    continue
+                #end if
+                self._originals.append((cls, stage, original))
+                setattr(cls, stage, wrapped)
+            #end for
+        #end for
+
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        #end if
+        _ACTIVE.append(self)
+    #end def
+
+    def disable(self):
+        """ restore every stage method of the calculator """
+        if not self.enabled:
+            return
+        #end if
+        while self._originals:
+            cls, stage, original = self._originals.pop()
+            setattr(cls, stage, original)
+        #end while
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        #end if
+        _ACTIVE.remove(self)
+    #end def
+
+    def reset(self):
+        """ set every counter back to zero """
+        for counter in self._counters.values():
+            counter[:] = [0, 0.0, 0]
+        #end for
+    #end def
+
+    def stats(self):
+        """
+            Function to export the recorded stages
+
+            Returns:
+                stats (dictionary) : stage -> calls, seconds, mean_seconds,
+                allocated_bytes. Time of a stage include every stage it call
+        """
+        stats = OrderedDict()
+        for stage, (calls, seconds, allocated) in self._counters.items():
+            stats[stage] = {
+                "calls"           : calls,
+                "seconds"         : seconds,
+                "mean_seconds"    : seconds / calls if calls else 0.0,
+                "allocated_bytes" : allocated,
+            }
+        #end for
+        return stats
+    #end def
+
+    def to_prometheus(self, labels=None):
+        """
+            Function to export the recorded stages using Prometheus text format
+
+            Args:
+                labels (dictionary): additional label of every sample
+
+            Returns:
+                text (string) : Prometheus exposition text
+        """
+        metrics = (
+            ("calls_total", "counter", "Calls of every calculation stage", 0),
+            ("seconds_total", "counter", "Cumulative seconds of every calculation stage", 1),
+            ("allocated_bytes_total", "counter",
+             "Memory allocated by every calculation stage", 2),
+        )
+        extra = "".join(',{}="{}"'.format(key, value)
+                        for key, value in sorted((labels or {}).items()))
+        lines = []
+        for suffix, kind, description, index in metrics:
+            name = "{}_{}".format(PROMETHEUS_PREFIX, suffix)
+            lines.append("# HELP {} {}".format(name, description))
+            lines.append("# TYPE {} {}".format(name, kind))
+            for stage, counter in self._counters.items():
+                lines.append('{}{{stage="{}"{}}} {!r}'.format(name, stage, extra,
+                                                            counter[index]))
+            #end for
+        #end for
+        return "\n".join(lines) + "\n"
+    #end def
+
+    def write_prometheus(self, path, labels=None):
+        """
+            Function to write Prometheus text file, the file is replaced at
+            once so a collector never read half of it
+
+            Args:
+                path (string): output file
+                labels (dictionary): additional label of every sample
+        """
+        temporary = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary, "w") as output:
+            output.write(self.to_prometheus(labels))
+        #end with
+        os.replace(temporary, path)
+    #end def
+
+    def __enter__(self):
+        self.enable()
+        return self
+    #end def
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+    #end def
+#end class
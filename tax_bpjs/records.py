@@ -0,0 +1,310 @@
+"""
+    Employee and Calculation Result Records
+"""
+from collections import namedtuple
+
+def _to_plain(value):
+    """ Function to convert record inside a value into dictionary """
+    if isinstance(value, Record):
+        return value.to_dict()
+    #end if
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item) for item in value]
+    #end if
+    if isinstance(value, dict):
+        return {key : _to_plain(item) for key, item in value.items()}
+    #end if
+    return value
+#end def
+
+class Record:
+    """
+        Base class for calculation result
+
+        result are compact tuple but can still be read like the dictionary
+        the calculator used to return, ex : result["health_insurance"]["company"].
+        Iterating, len and in use the field name like a dictionary, the
+        record is still a tuple for json so use to_dict before json.dumps
+    """
+    __slots__ = ()
+    _nested = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+            #end try
+        #end if
+        return tuple.__getitem__(self, key)
+    #end def
+
+    def __iter__(self):
+        return iter(self._fields)
+    #end def
+
+    def __contains__(self, key):
+        return key in self._fields
+    #end def
+
+    def __len__(self):
+        return len(self._fields)
+    #end def
+
+    def get(self, key, default=None):
+        """ field value of the record or default """
+        return getattr(self, key, default) if key in self._fields else default
+    #end def
+
+    def keys(self):
+        """ field name of the record """
+        return self._fields
+    #end def
+
+    def values(self):
+        """ field value of the record """
+        return tuple(tuple.__iter__(self))
+    #end def
+
+    def items(self):
+        """ (field name, value) of the record """
+        return zip(self._fields, tuple.__iter__(self))
+    #end def
+
+    def _replace(self, **changes):
+        """ same as namedtuple _replace, iterating the record give the field name """
+        result = self._make(map(changes.pop, self._fields, tuple.__iter__(self)))
+        if changes:
+            raise ValueError("Got unexpected field names: {!r}".format(list(changes)))
+        #end if
+        return result
+    #end def
+
+    def _asdict(self):
+        return dict(self.items())
+    #end def
+
+    def __getnewargs__(self):
+        return self.values()
+    #end def
+
+    def to_dict(self):
+        """
+            Function to convert the record into the dictionary
+
+            Returns:
+                result (dictionary) : nested record (also inside list / tuple
+                / dictionary) converted into dictionary too, ready for json
+        """
+        return {key : _to_plain(value) for key, value in self.items()}
+    #end def
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+            Function to create the record from the dictionary
+
+            Args:
+                values (dictionary): result of to_dict
+
+            Returns:
+                record (Record) : record
+        """
+        fields = {}
+        for key in cls._fields:
+            value = values[key]
+            if key in cls._nested:
+                value = cls._nested[key].from_dict(value)
+            #end if
+            fields[key] = value
+        #end for
+        return cls(**fields)
+    #end def
+#end class
+
+class InsuranceShare(Record, namedtuple("InsuranceShare", [
+        "company",
+        "individual"])):
+    """ insurance paid by company and by individual """
+    __slots__ = ()
+#end class
+
+class BpjsContribution(Record, namedtuple("BpjsContribution", [
+        "old_age_insurance",
+        "pension_insurance",
+        "health_insurance",
+        "death_insurance",
+        "accident_insurance"])):
+    """ result of Bpjs.monthly_fee and Bpjs.annual_fee """
+    __slots__ = ()
+    _nested = {
+        "old_age_insurance" : InsuranceShare,
+        "pension_insurance" : InsuranceShare,
+        "health_insurance"  : InsuranceShare,
+    }
+#end class
+
+class YearIncome(Record, namedtuple("YearIncome", [
+        "annual_salary",
+        "annual_allowances",
+        "annual_bpjs_work",
+        "annual_bpjs_health",
+        "bonus",
+        "annual_bruto_income"])):
+    """ result of Tax.total_year_income """
+    __slots__ = ()
+#end class
+
+class NetIncome(Record, namedtuple("NetIncome", [
+        "occupation_support",
+        "thr_occupation_support",
+        "bpjs_pension_insurance",
+        "bpjs_old_age_insurance",
+        "annual_net_income"])):
+    """ result of Tax.annual_net_income """
+    __slots__ = ()
+#end class
+
+class AnnualTaxResult(Record, namedtuple("AnnualTaxResult", [
+        "working_months",
+        "total_income_result",
+        "net_income_result",
+        "annual_taxable_income",
+        "tax_exemption",
+        "annual_tax",
+        "annual_bpjs"])):
+    """ result of Tax.annual_tax """
+    __slots__ = ()
+    _nested = {
+        "total_income_result" : YearIncome,
+        "net_income_result"   : NetIncome,
+        "annual_bpjs"         : BpjsContribution,
+    }
+#end class
+
+class TaxDeduction(Record, namedtuple("TaxDeduction", [
+        "monthly_tax",
+        "old_age_insurance",
+        "pension_insurance",
+        "health_insurance"])):
+    """ monthly deduction returned by Tax.calculate_tax """
+    __slots__ = ()
+#end class
+
+EMPLOYEE_FIELDS = (
+    "base_salary",
+    "fixed_allowances",
+    "non_fixed_allowances",
+    "overtime_allowances",
+    "bonus_allowances",
+    "start_work_date",
+    "end_work_date",
+    "tax_method",
+    "npwp_status",
+    "marital_status",
+    "dependents",
+    "is_salary_allowances",
+    "accident_insurance_status",
+    "pension_insurance_status",
+    "old_age_insurance_status",
+    "death_insurance_status",
+    "health_insurance_status",
+    "industry_risk_rate",
+)
+
+class Employee:
+    """
+        Employee information that can be used instead of the dictionary
+        for Bpjs and Tax
+    """
+    __slots__ = EMPLOYEE_FIELDS
+
+    def __init__(self, base_salary, fixed_allowances=0, non_fixed_allowances=0,
+                 overtime_allowances=0, bonus_allowances=0, start_work_date=None,
+                 end_work_date=None, tax_method="GROSS", npwp_status=True,
+                 marital_status="SINGLE", dependents=0, is_salary_allowances=False,
+                 accident_insurance_status=False, pension_insurance_status=False,
+                 old_age_insurance_status=False, death_insurance_status=False,
+                 health_insurance_status=False, industry_risk_rate=0):
+        self.base_salary               = base_salary
+        self.fixed_allowances          = fixed_allowances
+        self.non_fixed_allowances      = non_fixed_allowances
+        self.overtime_allowances       = overtime_allowances
+        self.bonus_allowances          = bonus_allowances
+        self.start_work_date           = start_work_date
+        self.end_work_date             = end_work_date
+        self.tax_method                = tax_method
+        self.npwp_status               = npwp_status
+        self.marital_status            = marital_status
+        self.dependents                = dependents
+        self.is_salary_allowances      = is_salary_allowances
+        self.accident_insurance_status = accident_insurance_status
+        self.pension_insurance_status  = pension_insurance_status
+        self.old_age_insurance_status  = old_age_insurance_status
+        self.death_insurance_status    = death_insurance_status
+        self.health_insurance_status   = health_insurance_status
+        self.industry_risk_rate        = industry_risk_rate
+    #end def
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+        #end try
+    #end def
+
+    @classmethod
+    def from_dict(cls, employee_information):
+        """
+            Function to create employee from employee information dictionary
+
+            Args:
+                employee_information (dictionary): employee information
+
+            Returns:
+                employee (Employee) : employee, unknown key are ignored
+        """
+        return cls(**{
+            key : value for key, value in employee_information.items()
+            if key in EMPLOYEE_FIELDS
+        })
+    #end def
+
+    def to_dict(self):
+        """
+            Function to convert employee into employee information dictionary
+
+            Returns:
+                employee_information (dictionary) : employee information
+        """
+        return {key : getattr(self, key) for key in EMPLOYEE_FIELDS}
+    #end def
+
+    def __eq__(self, other):
+        if not isinstance(other, Employee):
+            return NotImplemented
+        #end if
+        return self.to_dict() == other.to_dict()
+    #end def
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Employee({})".format(", ".join(
+            "{}={!r}".format(key, getattr(self, key)) for key in EMPLOYEE_FIELDS))
+    #end def
+#end class
+
+def _employee_defaults():
+    """ Function to read the default of every optional Employee field """
+    code = Employee.__init__.__code__
+    names = code.co_varnames[1:code.co_argcount]
+    defaults = Employee.__init__.__defaults__
+    return dict(zip(names[len(names) - len(defaults):], defaults))
+#end def
+
+# value of a field missing from the input, shared by every reader (stream,
+# columnar) so the same input give the same result in every format
+EMPLOYEE_DEFAULTS = _employee_defaults()
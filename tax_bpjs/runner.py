@@ -0,0 +1,229 @@
+"""
+    Multiprocess Payroll Runner
+"""
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from tax_bpjs.records import Record, Employee
+from tax_bpjs.tax_year import TaxState, TaxYear
+from tax_bpjs.configuration import CompiledConfiguration
+
+class PayrollResult(Record, namedtuple("PayrollResult", [
+        "months",
+        "first_annual_tax",
+        "last_annual_tax",
+        "state"])):
+    """
+        result of one employee
+
+        months is a list of (calculated_tax, deduction) for every month,
+        first_annual_tax and last_annual_tax are the state for the next month,
+        state is the whole TaxState to resume the year
+    """
+    __slots__ = ()
+#end class
+
+def calculate_timeline(timeline, configuration, with_bpjs=True,
+                       first_annual_tax=None, last_annual_tax=0, state=None):
+    """
+        calculate tax for every month of one employee in order
+
+        Args:
+            timeline (list): employee information for every month, ordered
+            configuration (dictionary / CompiledConfiguration): configuration
+            with_bpjs (boolean): calculate bpjs or not
+            first_annual_tax (int): annual tax of the first month, None when
+            the timeline start from the first month
+            last_annual_tax (int): annual tax of the previous month
+            state (TaxState): state of the previous month, replace first and
+            last annual tax
+
+        Returns:
+            result (PayrollResult) : result of every month and the last state
+    """
+    if isinstance(timeline, (dict, Employee)):
+        timeline = (timeline,)
+    #end if
+
+    if state is None:
+        tax_year = TaxYear(configuration, with_bpjs, first_annual_tax, last_annual_tax)
+    else:
+        tax_year = TaxYear.resume(configuration, state, with_bpjs)
+    #end if
+    months = [tax_year.ingest(employee_information) for employee_information in timeline]
+    return PayrollResult(months, tax_year.first_annual_tax, tax_year.last_annual_tax,
+                         tax_year.state)
+#end def
+
+# configuration of the worker process, set once by _initialize
+_WORKER = {}
+
+def _initialize(configuration, with_bpjs):
+    """
+        Function to keep the configuration inside the worker process
+
+        Args:
+            configuration (CompiledConfiguration): configuration
+            with_bpjs (boolean): calculate bpjs or not
+    """
+    _WORKER["configuration"] = configuration
+    _WORKER["with_bpjs"] = with_bpjs
+#end def
+
+def _calculate_chunk(chunk):
+    """
+        Function to calculate a chunk of employee inside the worker process
+
+        Args:
+            chunk (list): list of (timeline, TaxState of the previous month)
+
+        Returns:
+            result (list) : PayrollResult for every timeline
+    """
+    configuration = _WORKER["configuration"]
+    with_bpjs = _WORKER["with_bpjs"]
+    return [
+        calculate_timeline(timeline, configuration, with_bpjs, state=state)
+        for timeline, state in chunk
+    ]
+#end def
+
+class PayrollRunner:
+    """ run payroll for many employee using many process """
+
+    def __init__(self, configuration, workers=None, chunk_size=256, with_bpjs=True,
+                 max_pending_chunks=None):
+        """
+        Args:
+            configuration (dictionary / CompiledConfiguration): configuration
+            workers (int): number of process, default to the number of cpu,
+            1 calculate inside the current process
+            chunk_size (int): number of employee sent to a worker at once
+            with_bpjs (boolean): calculate bpjs or not
+            max_pending_chunks (int): chunk waiting for result at the same time,
+            limit the memory used when employees are streamed, default to
+            4 x workers
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be greater than zero. Current value was : {}"
+                             .format(chunk_size))
+        #end if
+        self.configuration = CompiledConfiguration.compile(configuration)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.with_bpjs = with_bpjs
+        self.max_pending_chunks = max_pending_chunks or self.workers * 4
+    #end def
+
+    def _chunks(self, employees):
+        """
+            Function to split employees into chunk
+
+            Args:
+                employees (iterable): timeline of every employee
+
+            Returns:
+                chunks (generator) : list of timeline
+        """
+        employees = iter(employees)
+        while True:
+            chunk = list(islice(employees, self.chunk_size))
+            if not chunk:
+                return
+            #end if
+            yield chunk
+        #end while
+    #end def
+
+    def _state_chunks(self, employees, state):
+        """
+            Function to attach the state of the previous month to every timeline
+
+            Args:
+                employees (iterable): (employee id, timeline) when state is
+                given, timeline otherwise
+                state (StateFile): running tax state, None when not used
+
+            Returns:
+                chunks (generator) : (employee ids, list of (timeline, TaxState))
+        """
+        for chunk in self._chunks(employees):
+            if state is None:
+                yield None, [(timeline, None) for timeline in chunk]
+                continue
+            #end if
+            employee_ids = [employee_id for employee_id, _ in chunk]
+            yield employee_ids, [(timeline, state.get(employee_id))
+                                 for employee_id, timeline in chunk]
+        #end for
+    #end def
+
+    @staticmethod
+    def _save(employee_ids, results, state):
+        """
+            Function to write the state of every employee back in place
+
+            Returns:
+                results (list) : results as it is
+        """
+        if state is not None:
+            for employee_id, result in zip(employee_ids, results):
+                state.put(employee_id, result.state)
+            #end for
+        #end if
+        return results
+    #end def
+
+    def run(self, employees, state=None):
+        """
+            calculate tax for every employee
+
+            Args:
+                employees (iterable): every item is the timeline of one employee,
+                the employee information of each month in order (a single
+                employee information is a one month timeline). Every month of
+                an employee is calculated by the same worker so first and last
+                annual tax are carried month to month
+                state (StateFile): running tax state, every item of employees
+                is then (employee id, timeline). The state of the previous
+                month is read before the timeline is calculated and the new
+                state is written back in place, only by this process. An
+                employee appear once in a run
+
+            Returns:
+                results (generator) : PayrollResult for every employee in the
+                same order as employees
+        """
+        chunks = self._state_chunks(employees, state)
+        if self.workers == 1:
+            for employee_ids, chunk in chunks:
+                results = [
+                    calculate_timeline(timeline, self.configuration, self.with_bpjs,
+                                       state=previous)
+                    for timeline, previous in chunk
+                ]
+                yield from self._save(employee_ids, results, state)
+            #end for
+            return
+        #end if
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_initialize,
+                                 initargs=(self.configuration, self.with_bpjs)) as executor:
+            pending = deque()
+            for employee_ids, chunk in chunks:
+                pending.append((employee_ids, executor.submit(_calculate_chunk, chunk)))
+                if len(pending) >= self.max_pending_chunks:
+                    employee_ids, future = pending.popleft()
+                    yield from self._save(employee_ids, future.result(), state)
+                #end if
+            #end for
+            while pending:
+                employee_ids, future = pending.popleft()
+                yield from self._save(employee_ids, future.result(), state)
+            #end while
+        #end with
+    #end def
+#end class
@@ -0,0 +1,318 @@
+"""
+    Asyncio Tax Service
+
+    Facade for real time single employee query, ex : "what will my take home
+    pay be". The configuration is compiled once and kept in memory, request
+    arriving within max_delay of each other are evaluated together in one
+    vectorized batch (when numpy is available) and every caller await its
+    own result.
+
+    usage :
+        service = TaxService(configuration)
+        quote = await service.quote(employee_information)
+"""
+import asyncio
+from collections import namedtuple
+
+from tax_bpjs import batch
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.records import Record
+from tax_bpjs.tax import Tax
+
+# seconds a request wait for other request before the batch is evaluated,
+# 0 evaluate every request that arrive during the same event loop iteration
+DEFAULT_MAX_DELAY = 0
+
+DEFAULT_MAX_BATCH_SIZE = 512
+
+# smaller batch is faster using the scalar calculator
+MIN_VECTORIZED_BATCH_SIZE = 32
+
+class TaxQuote(Record, namedtuple("TaxQuote", [
+        "working_months",
+        "annual_tax",
+        "monthly_tax",
+        "old_age_insurance",
+        "pension_insurance",
+        "health_insurance",
+        "take_home_pay"])):
+    """
+        this month tax, BPJS deduction and take home pay of an employee,
+        same as Tax.calculate_tax(0, 0)
+    """
+    __slots__ = ()
+#end class
+
+def monthly_salary(employee_information):
+    """
+        Function to calculate monthly salary used for take home pay
+
+        Args:
+            employee_information (dictionary / Employee): employee information
+
+        Returns:
+            monthly_salary (int) : base salary + fixed, non fixed and overtime allowances
+    """
+    return employee_information["base_salary"] + \
+           Bpjs.summarize(employee_information["fixed_allowances"]) + \
+           Bpjs.summarize(employee_information["non_fixed_allowances"]) + \
+           employee_information["overtime_allowances"]
+#end def
+
+def quote(employee_information, configuration, with_bpjs=True):
+    """
+        calculate tax quote of an employee
+
+        Args:
+            employee_information (dictionary / Employee): same as Tax
+            configuration (dictionary / CompiledConfiguration): same as Tax
+            with_bpjs (boolean): calculate bpjs or not
+
+        Returns:
+            TaxQuote
+    """
+    tax = Tax(employee_information, configuration, with_bpjs)
+    calculated_tax, deduction = tax.calculate_tax(0, 0)
+    bpjs_fee = deduction.old_age_insurance + deduction.pension_insurance + \
+               deduction.health_insurance
+    return TaxQuote(
+        working_months=calculated_tax.working_months,
+        annual_tax=calculated_tax.annual_tax,
+        monthly_tax=deduction.monthly_tax,
+        old_age_insurance=deduction.old_age_insurance,
+        pension_insurance=deduction.pension_insurance,
+        health_insurance=deduction.health_insurance,
+        take_home_pay=Tax.take_home_pay(tax.tax_method, monthly_salary(employee_information),
+                                        deduction.monthly_tax, bpjs_fee)
+    )
+#end def
+
+def quote_batch(employees, configuration, with_bpjs=True):
+    """
+        Vectorized version of quote (require numpy)
+
+        Args:
+            employees (list): employee information
+            configuration (CompiledConfiguration): configuration
+            with_bpjs (boolean): calculate bpjs or not
+
+        Returns:
+            quotes (list) : TaxQuote for every employee in the same order
+    """
+    np = batch.np
+    batch.require_numpy()
+    table = batch.employees_table(employees)
+    columns = batch._employee_columns(table)
+    annual_bpjs = batch._annual_bpjs_arrays(columns, configuration, with_bpjs)
+    annual_tax = batch._annual_tax_arrays(columns, annual_bpjs, configuration)["annual_tax"]
+
+    working_months = columns["working_months"]
+    monthly_tax = batch._monthly_array(annual_tax, working_months)
+    old_age_insurance = batch._monthly_array(annual_bpjs["old_age_insurance"]["individual"],
+                                             working_months)
+    pension_insurance = batch._monthly_array(annual_bpjs["pension_insurance"]["individual"],
+                                             working_months)
+    health_insurance = batch._monthly_array(annual_bpjs["health_insurance"]["individual"],
+                                            working_months)
+
+    # same as Tax.take_home_pay
+    size = columns["size"]
+    salary = columns["base_salary"] + \
+             batch.allowance_column(table, "fixed_allowances", size) + \
+             columns["non_fixed_allowances"] + columns["overtime_allowances"]
+    tax_method = batch._column(table, "tax_method", size)
+    take_home_pay = np.where(
+        tax_method == "GROSS",
+        salary - (monthly_tax + (old_age_insurance + pension_insurance + health_insurance)),
+        np.where(tax_method == "NETT", salary, 0))
+
+    return [TaxQuote(*values) for values in zip(
+        working_months.tolist(), annual_tax.tolist(), monthly_tax.tolist(),
+        old_age_insurance.tolist(), pension_insurance.tolist(), health_insurance.tolist(),
+        take_home_pay.tolist())]
+#end def
+
+class TaxService:
+    """ micro batching asyncio facade of the tax calculator """
+
+    def __init__(self, configuration, with_bpjs=True, max_delay=DEFAULT_MAX_DELAY,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, executor=None):
+        """
+        Args:
+            configuration (dictionary / CompiledConfiguration): configuration,
+            compiled once for every request
+            with_bpjs (boolean): calculate bpjs or not
+            max_delay (float): seconds the first request of a batch wait
+            for other request, 0 batch the request arriving during the same
+            event loop iteration without waiting
+            max_batch_size (int): batch is evaluated at once when it is full
+            executor (Executor): evaluate the batch outside the event loop,
+            default evaluate inside the event loop
+        """
+        self.configuration = CompiledConfiguration.compile(configuration)
+        if not self.configuration.has_tax:
+            raise ValueError("configuration is missing tax configuration")
+        #end if
+        self.with_bpjs = with_bpjs
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+
+        self._pending = []
+        self._timer = None
+        self._running = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+    #end def
+
+    async def quote(self, employee_information):
+        """
+            Function to calculate tax quote of an employee
+
+            Args:
+                employee_information (dictionary / Employee): same as Tax
+
+            Returns:
+                TaxQuote
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((employee_information, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            if self.max_delay > 0:
+                self._timer = loop.call_later(self.max_delay, self.flush)
+            else:
+                self._timer = loop.call_soon(self.flush)
+            #end if
+        #end if
+        return await future
+    #end def
+
+    def _evaluate(self, employees):
+        """
+            Function to calculate a batch, a failing employee doesn't fail
+            the rest of the batch
+
+            Args:
+                employees (list): employee information
+
+            Returns:
+                results (list) : TaxQuote or the exception for every employee
+        """
+        if batch.np is not None and len(employees) >= MIN_VECTORIZED_BATCH_SIZE:
+            try:
+                return quote_batch(employees, self.configuration, self.with_bpjs)
+            except Exception: # pylint: disable=broad-except
+                # find the failing employee using the scalar calculator
+                pass
+            #end try
+        #end if
+        results = []
+        for employee_information in employees:
+            try:
+                results.append(quote(employee_information, self.configuration,
+                                     self.with_bpjs))
+            except Exception as error: # pylint: disable=broad-except
+                results.append(error)
+            #end try
+        #end for
+        return results
+    #end def
+
+    @staticmethod
+    def _resolve(futures, results):
+        """
+            Function to give every caller its result
+
+            Args:
+                futures (list): future of every request
+                results (list): result of _evaluate
+        """
+        for future, result in zip(futures, results):
+            if future.done():
+                # the caller has been cancelled
+                continue
+            #end if
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+            #end if
+        #end for
+    #end def
+
+    def flush(self):
+        """ evaluate every pending request now """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        #end if
+        if not self._pending:
+            return
+        #end if
+        pending, self._pending = self._pending, []
+        employees = [employee_information for employee_information, _ in pending]
+        futures = [future for _, future in pending]
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(pending))
+
+        if self.executor is None:
+            self._resolve(futures, self._evaluate(employees))
+            return
+        #end if
+
+        loop = futures[0].get_loop()
+        running = loop.run_in_executor(self.executor, self._evaluate, employees)
+        self._running.add(running)
+
+        def done(running):
+            self._running.discard(running)
+            if running.cancelled():
+                results = [asyncio.CancelledError()] * len(futures)
+            elif running.exception() is not None:
+                results = [running.exception()] * len(futures)
+            else:
+                results = running.result()
+            #end if
+            self._resolve(futures, results)
+        #end def
+        running.add_done_callback(done)
+    #end def
+
+    async def close(self):
+        """ evaluate every pending request and wait until they are done """
+        self.flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        #end if
+    #end def
+
+    def stats(self):
+        """
+            Function to report the batching
+
+            Returns:
+                stats (dictionary) : requests, batches, mean_batch_size, largest_batch
+        """
+        return {
+            "requests"        : self.requests,
+            "batches"         : self.batches,
+            "mean_batch_size" : self.requests / self.batches if self.batches else 0.0,
+            "largest_batch"   : self.largest_batch,
+        }
+    #end def
+
+    async def __aenter__(self):
+        return self
+    #end def
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    #end def
+#end class
@@ -0,0 +1,361 @@
+"""
+    Memory Mapped Tax State File
+
+    Running tax state (TaxState) of every employee kept in a fixed width
+    binary file, indexed by the employee id (unsigned 64 bit) using open
+    addressing with linear probing. The file is memory mapped so a monthly
+    run read and update the state of one employee in place without reading
+    the whole file. Only one process write the file at the same time.
+
+    layout :
+        header (64 bytes) : magic, version, record size, capacity, size
+        capacity x record (64 bytes) : employee id, flags, months, first
+        annual tax, last annual tax, annual bruto income, bonus, bpjs
+        deduction, tax withheld
+
+    Money is kept with its type : float as IEEE double, int and Decimal
+    (integer / Decimal money mode) as int64 whole rupiah so exact state stay
+    exact, the type of every money field is part of the flags.
+"""
+import mmap
+import os
+import struct
+from decimal import Decimal
+from numbers import Integral
+
+from tax_bpjs.tax_year import TaxState
+
+MAGIC = b"TBPJSST\0"
+VERSION = 2
+
+HEADER = struct.Struct("<8sIIQQ")
+HEADER_SIZE = 64
+RECORD = struct.Struct("<QIIqqqqqq")
+RECORD_SIZE = 64
+# employee id and flags, enough to probe a slot
+KEY = struct.Struct("<QI")
+
+# flags of a record
+OCCUPIED = 1
+HAS_FIRST_ANNUAL_TAX = 2
+
+MONEY_FIELDS = (
+    "first_annual_tax",
+    "last_annual_tax",
+    "annual_bruto_income",
+    "bonus",
+    "bpjs_deduction",
+    "tax_withheld",
+)
+# type of every money field, 2 bits for every field after the flags above
+MONEY_FLOAT = 0
+MONEY_INT = 1
+MONEY_DECIMAL = 2
+MONEY_SHIFT = 2
+_DOUBLE = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+
+DEFAULT_CAPACITY = 1024
+# the file grow when it is fuller than this
+MAX_LOAD_FACTOR = 0.75
+
+_MASK = (1 << 64) - 1
+
+def _hash(employee_id):
+    """
+        Function to spread sequential employee id over the slots (splitmix64)
+
+        Args:
+            employee_id (int): employee id
+
+        Returns:
+            hash (int) : unsigned 64 bit hash
+    """
+    value = (employee_id + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+#end def
+
+def _capacity(capacity):
+    """ Function to round capacity up to a power of two """
+    size = 1
+    while size < capacity:
+        size *= 2
+    #end while
+    return size
+#end def
+
+def _encode_money(value):
+    """
+        Function to store money into a signed 64 bit slot
+
+        Args:
+            value (float / int / Decimal): money
+
+        Returns:
+            kind (int) : MONEY_FLOAT / MONEY_INT / MONEY_DECIMAL
+            stored (int) : int64 of the slot
+
+        Raises:
+            ValueError : Decimal that is not a whole rupiah, int that doesn't
+            fit into 64 bit or unknown type
+    """
+    if isinstance(value, float):
+        return MONEY_FLOAT, _INT64.unpack(_DOUBLE.pack(value))[0]
+    #end if
+    if isinstance(value, Decimal):
+        if value != value.to_integral_value():
+            raise ValueError("money {} is not a whole rupiah".format(value))
+        #end if
+        kind, value = MONEY_DECIMAL, int(value)
+    elif isinstance(value, Integral) and not isinstance(value, bool):
+        kind, value = MONEY_INT, int(value)
+    else:
+        raise ValueError("unsupported money {!r}".format(value))
+    #end if
+    if not -(1 << 63) <= value < (1 << 63):
+        raise ValueError("money {} doesn't fit into 64 bit".format(value))
+    #end if
+    return kind, value
+#end def
+
+def _decode_money(kind, stored):
+    """
+        Function to read money stored by _encode_money
+
+        Args:
+            kind (int): MONEY_FLOAT / MONEY_INT / MONEY_DECIMAL
+            stored (int): int64 of the slot
+
+        Returns:
+            value (float / int / Decimal) : money with its original type
+    """
+    if kind == MONEY_FLOAT:
+        return _DOUBLE.unpack(_INT64.pack(stored))[0]
+    #end if
+    if kind == MONEY_DECIMAL:
+        return Decimal(stored)
+    #end if
+    return stored
+#end def
+
+class StateFile:
+    """ fixed width tax state of every employee inside a memory mapped file """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            path (string): state file, created when it doesn't exist
+            capacity (int): slot of a new file, rounded up to a power of two,
+            the file double its capacity when it is 75% full
+        """
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._create(path, _capacity(max(capacity, 1)))
+        #end if
+        self._open()
+    #end def
+
+    @staticmethod
+    def _create(path, capacity):
+        """
+            Function to create an empty state file
+
+            Args:
+                path (string): state file
+                capacity (int): slot, power of two
+        """
+        with open(path, "wb") as state_file:
+            header = HEADER.pack(MAGIC, VERSION, RECORD_SIZE, capacity, 0)
+            state_file.write(header.ljust(HEADER_SIZE, b"\0"))
+            state_file.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+        #end with
+    #end def
+
+    def _open(self):
+        """ Function to map the file and read the header """
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, record_size, capacity, size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self._map.close()
+            self._file.close()
+            raise ValueError("{} is not a tax state file".format(self.path))
+        #end if
+        if len(self._map) < HEADER_SIZE + capacity * RECORD_SIZE:
+            self._map.close()
+            self._file.close()
+            raise ValueError("{} is truncated".format(self.path))
+        #end if
+        self.capacity = capacity
+        self.size = size
+    #end def
+
+    def _find(self, employee_id):
+        """
+            Function to find the slot of an employee
+
+            Args:
+                employee_id (int): employee id
+
+            Returns:
+                offset (int) : offset of the slot
+                found (boolean) : False when the slot is empty
+        """
+        if not isinstance(employee_id, int) or not 0 <= employee_id <= _MASK:
+            raise ValueError("employee id must be an unsigned 64 bit integer. "
+                             "Current value was : {!r}".format(employee_id))
+        #end if
+        mask = self.capacity - 1
+        index = _hash(employee_id) & mask
+        memory = self._map
+        unpack_from = KEY.unpack_from
+        while True:
+            offset = HEADER_SIZE + index * RECORD_SIZE
+            key, flags = unpack_from(memory, offset)
+            if not flags & OCCUPIED:
+                return offset, False
+            #end if
+            if key == employee_id:
+                return offset, True
+            #end if
+            index = (index + 1) & mask
+        #end while
+    #end def
+
+    def get(self, employee_id, default=None):
+        """
+            Function to read the state of an employee
+
+            Args:
+                employee_id (int): employee id
+                default : returned when the employee doesn't have any state
+
+            Returns:
+                state (TaxState) : state of the employee or default
+        """
+        offset, found = self._find(employee_id)
+        if not found:
+            return default
+        #end if
+        return self._read(offset)
+    #end def
+
+    def _read(self, offset):
+        """ Function to convert a record into TaxState """
+        _, flags, months, *stored = RECORD.unpack_from(self._map, offset)
+        money = {}
+        for index, (key, value) in enumerate(zip(MONEY_FIELDS, stored)):
+            kind = (flags >> (MONEY_SHIFT + 2 * index)) & 3
+            money[key] = _decode_money(kind, value)
+        #end for
+        if not flags & HAS_FIRST_ANNUAL_TAX:
+            money["first_annual_tax"] = None
+        #end if
+        return TaxState(months=months, **money)
+    #end def
+
+    def put(self, employee_id, state):
+        """
+            Function to write the state of an employee in place
+
+            Args:
+                employee_id (int): employee id
+                state (TaxState): state of the employee
+
+            Raises:
+                ValueError : money that cannot be stored exactly, see _encode_money
+        """
+        # every money is encoded before a slot is taken
+        flags = OCCUPIED
+        stored = []
+        for index, key in enumerate(MONEY_FIELDS):
+            value = getattr(state, key)
+            if key == "first_annual_tax":
+                if value is None:
+                    value = 0.0
+                else:
+                    flags |= HAS_FIRST_ANNUAL_TAX
+                #end if
+            #end if
+            kind, value = _encode_money(value)
+            flags |= kind << (MONEY_SHIFT + 2 * index)
+            stored.append(value)
+        #end for
+        offset, found = self._find(employee_id)
+        if not found:
+            if self.size + 1 > self.capacity * MAX_LOAD_FACTOR:
+                self._grow()
+                offset, found = self._find(employee_id)
+            #end if
+            self.size += 1
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD_SIZE, self.capacity,
+                             self.size)
+        #end if
+        RECORD.pack_into(self._map, offset, employee_id, flags, state.months, *stored)
+    #end def
+
+    def _grow(self):
+        """ Function to double the capacity, every state is written again """
+        temporary = "{}.{}.tmp".format(self.path, os.getpid())
+        grown = StateFile.__new__(StateFile)
+        grown.path = temporary
+        self._create(temporary, self.capacity * 2)
+        grown._open()
+        for employee_id, state in self.items():
+            grown.put(employee_id, state)
+        #end for
+        grown.close()
+        self.close()
+        os.replace(temporary, self.path)
+        self._open()
+    #end def
+
+    def items(self):
+        """
+            Function to read every state
+
+            Returns:
+                items (generator) : (employee id, TaxState) in slot order
+        """
+        for index in range(self.capacity):
+            offset = HEADER_SIZE + index * RECORD_SIZE
+            employee_id, flags = KEY.unpack_from(self._map, offset)
+            if flags & OCCUPIED:
+                yield employee_id, self._read(offset)
+            #end if
+        #end for
+    #end def
+
+    def flush(self):
+        """ write every change to the disk """
+        self._map.flush()
+    #end def
+
+    def close(self):
+        """ flush and close the file """
+        if self._map.closed:
+            return
+        #end if
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+    #end def
+
+    def __enter__(self):
+        return self
+    #end def
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    #end def
+
+    def __len__(self):
+        return self.size
+    #end def
+
+    def __contains__(self, employee_id):
+        return self._find(employee_id)[1]
+    #end def
+#end class
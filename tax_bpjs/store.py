@@ -0,0 +1,205 @@
+"""
+    Persistent Result Store
+
+    SQLite file that keep calculation result between payroll run, it has
+    the same get / put as ResultCache so it can be passed as the cache of
+    Bpjs and Tax. Re-running a payroll only calculate the employee whose
+    input changed since the previous run.
+"""
+import json
+import os
+import sqlite3
+import time
+from decimal import Decimal
+
+from tax_bpjs import records
+from tax_bpjs.cache import fingerprint
+
+# result written before committing the transaction
+DEFAULT_COMMIT_INTERVAL = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key           TEXT PRIMARY KEY,
+    configuration TEXT NOT NULL,
+    kind          TEXT NOT NULL,
+    result        TEXT NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_configuration ON results (configuration);
+"""
+
+def _encode(value):
+    """ json encoder for value that json doesn't support """
+    if isinstance(value, Decimal):
+        return {"__decimal__" : str(value)}
+    #end if
+    raise TypeError("{!r} is not JSON serializable".format(value))
+#end def
+
+def _decode(value):
+    """ json decoder for value encoded by _encode """
+    if "__decimal__" in value:
+        return Decimal(value["__decimal__"])
+    #end if
+    return value
+#end def
+
+class ResultStore:
+    """ result kept inside an SQLite file """
+
+    def __init__(self, path, commit_interval=DEFAULT_COMMIT_INTERVAL):
+        """
+        Args:
+            path (string): SQLite file, created when it doesn't exist
+            commit_interval (int): result written before committing, every
+            result is committed on flush / close
+        """
+        self.path = path
+        self.commit_interval = commit_interval
+        self.configuration = None
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+        self._pending = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+    #end def
+
+    def validate(self, configuration):
+        """
+            Function to remember the configuration in use, result of other
+            configuration is kept until compact
+
+            Args:
+                configuration (CompiledConfiguration): configuration used
+                by the calculator
+        """
+        self.configuration = configuration.fingerprint
+    #end def
+
+    def get(self, key, default=None):
+        """
+            Function to fetch a result
+
+            Args:
+                key (tuple): cache key of the calculator
+                default : returned when the result is not stored
+
+            Returns:
+                result : stored result or default
+        """
+        row = self._connection.execute(
+            "SELECT kind, result FROM results WHERE key = ?", (fingerprint(key),)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        #end if
+        self.hits += 1
+        kind, result = row
+        return getattr(records, kind).from_dict(json.loads(result, object_hook=_decode))
+    #end def
+
+    def put(self, key, result):
+        """
+            Function to keep a result
+
+            Args:
+                key (tuple): cache key of the calculator, the third value is
+                the configuration fingerprint
+                result (Record): calculation result
+        """
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results (key, configuration, kind, result, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (fingerprint(key), key[2], type(result).__name__,
+             json.dumps(result.to_dict(), default=_encode), time.time())
+        )
+        self.writes += 1
+        self._pending += 1
+        if self._pending >= self.commit_interval:
+            self.flush()
+        #end if
+    #end def
+
+    def flush(self):
+        """ commit every pending result """
+        self._connection.commit()
+        self._pending = 0
+    #end def
+
+    def compact(self, configuration=None):
+        """
+            Function to delete result of every other configuration and
+            reclaim the file space
+
+            Args:
+                configuration (CompiledConfiguration): configuration to keep,
+                default to the configuration in use
+
+            Returns:
+                deleted (int) : how many result is deleted
+        """
+        keep = self.configuration
+        if configuration is not None:
+            keep = configuration.fingerprint
+        #end if
+        if keep is None:
+            raise ValueError("No configuration to keep")
+        #end if
+        cursor = self._connection.execute(
+            "DELETE FROM results WHERE configuration != ?", (keep,))
+        deleted = cursor.rowcount
+        self.flush()
+        self._connection.execute("VACUUM")
+        return deleted
+    #end def
+
+    def stats(self):
+        """
+            Function to report the store usage
+
+            Returns:
+                stats (dictionary) : size, configurations, hits, misses, hit_rate,
+                writes, file_size
+        """
+        size, configurations = self._connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT configuration) FROM results").fetchone()
+        lookups = self.hits + self.misses
+        file_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {
+            "size"           : size,
+            "configurations" : configurations,
+            "hits"           : self.hits,
+            "misses"         : self.misses,
+            "hit_rate"       : self.hits / lookups if lookups else 0.0,
+            "writes"         : self.writes,
+            "file_size"      : file_size,
+        }
+    #end def
+
+    def close(self):
+        """ commit and close the file """
+        self.flush()
+        self._connection.close()
+    #end def
+
+    def __enter__(self):
+        return self
+    #end def
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    #end def
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    #end def
+
+    def __contains__(self, key):
+        return self._connection.execute(
+            "SELECT 1 FROM results WHERE key = ?", (fingerprint(key),)).fetchone() is not None
+    #end def
+#end class
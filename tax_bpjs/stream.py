@@ -0,0 +1,411 @@
+"""
+    Streaming Payroll Pipeline
+
+    read employee row by row from CSV / JSON Lines, calculate and write the
+    result right away so memory stays the same no matter how big the input is
+
+    usage : python -m tax_bpjs.stream employees.csv result.jsonl -c configuration.json
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.records import EMPLOYEE_DEFAULTS, Record
+from tax_bpjs.configuration import CompiledConfiguration
+
+INTEGER_FIELDS = (
+    "base_salary",
+    "overtime_allowances",
+    "bonus_allowances",
+    "dependents",
+)
+
+ALLOWANCE_FIELDS = (
+    "fixed_allowances",
+    "non_fixed_allowances",
+)
+
+BOOLEAN_FIELDS = (
+    "npwp_status",
+    "is_salary_allowances",
+    "accident_insurance_status",
+    "pension_insurance_status",
+    "old_age_insurance_status",
+    "death_insurance_status",
+    "health_insurance_status",
+)
+
+STRING_FIELDS = (
+    "start_work_date",
+    "end_work_date",
+    "tax_method",
+    "marital_status",
+)
+
+# column that is not part of employee information but kept in the result
+ID_FIELD = "employee_id"
+STATE_FIELDS = ("first_annual_tax", "last_annual_tax")
+
+TRUE_VALUES = ("true", "t", "yes", "y", "1")
+FALSE_VALUES = ("false", "f", "no", "n", "0", "")
+
+def to_boolean(value):
+    """
+        Function to convert CSV value into boolean
+
+        Args:
+            value (string / boolean): true/false, yes/no, 1/0
+
+        Returns:
+            value (boolean) : converted value
+    """
+    if isinstance(value, bool):
+        return value
+    #end if
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    #end if
+    if text in FALSE_VALUES:
+        return False
+    #end if
+    raise ValueError("Invalid boolean value : {}".format(value))
+#end def
+
+def to_number(value, convert=int):
+    """
+        Function to convert CSV value into number, empty value is zero
+
+        Args:
+            value (string / int): number
+            convert: int / float
+
+        Returns:
+            value (int) : converted value, a fraction (ex : 100.5) stays
+            float like the calculator get it from JSON
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return convert(0)
+        #end if
+        try:
+            return convert(value)
+        except ValueError:
+            number = float(value)
+        #end try
+        if number.is_integer():
+            return convert(number)
+        #end if
+        return number
+    #end if
+    return value
+#end def
+
+def to_employee_information(row):
+    """
+        Function to map a row into employee information
+
+        allowances can be a single column (fixed_allowances) or one column for
+        every component (fixed_allowances.transport, fixed_allowances.meal)
+
+        Args:
+            row (dictionary): row from CSV / JSON Lines
+
+        Returns:
+            employee_information (dictionary) : employee information
+    """
+    # missing column use the Employee default (base salary is required by
+    # Employee, it stays 0), same as tax_bpjs.columnar
+    employee_information = {}
+    for key in INTEGER_FIELDS:
+        employee_information[key] = to_number(row.get(key, EMPLOYEE_DEFAULTS.get(key, 0)))
+    #end for
+    for key in BOOLEAN_FIELDS:
+        employee_information[key] = to_boolean(row.get(key, EMPLOYEE_DEFAULTS[key]))
+    #end for
+    for key in STRING_FIELDS:
+        employee_information[key] = row.get(key, EMPLOYEE_DEFAULTS[key])
+    #end for
+    employee_information["industry_risk_rate"] = to_number(
+        row.get("industry_risk_rate", EMPLOYEE_DEFAULTS["industry_risk_rate"]), float)
+
+    for key in ALLOWANCE_FIELDS:
+        prefix = key + "."
+        components = {
+            name[len(prefix):] : to_number(value)
+            for name, value in row.items() if name.startswith(prefix)
+        }
+        if components:
+            employee_information[key] = components
+        else:
+            value = row.get(key, EMPLOYEE_DEFAULTS[key])
+            if not isinstance(value, dict):
+                value = to_number(value)
+            #end if
+            employee_information[key] = value
+        #end if
+    #end for
+    return employee_information
+#end def
+
+def flatten(record, prefix=""):
+    """
+        Function to flatten nested record into a single row
+
+        Args:
+            record (Record): calculation result
+            prefix (string): prefix of the column name
+
+        Returns:
+            row (dictionary) : ex : {"health_insurance_company" : 320000}
+    """
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, Record):
+            row.update(flatten(value, prefix + key + "_"))
+        else:
+            row[prefix + key] = value
+        #end if
+    #end for
+    return row
+#end def
+
+def read_csv(source):
+    """
+        Function to read CSV row by row
+
+        Args:
+            source (file): opened CSV file with header
+
+        Returns:
+            rows (generator) : dictionary for every row
+    """
+    yield from csv.DictReader(source)
+#end def
+
+def read_jsonl(source):
+    """
+        Function to read JSON Lines row by row
+
+        Args:
+            source (file): opened JSON Lines file
+
+        Returns:
+            rows (generator) : dictionary for every line
+    """
+    for line in source:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+        #end if
+    #end for
+#end def
+
+def write_jsonl(rows, destination):
+    """
+        Function to write every row as soon as it is calculated
+
+        Args:
+            rows (iterable): result row
+            destination (file): opened file
+    """
+    for row in rows:
+        destination.write(json.dumps(row))
+        destination.write("\n")
+    #end for
+#end def
+
+def write_csv(rows, destination):
+    """
+        Function to write every row as soon as it is calculated,
+        the header is taken from the first row
+
+        Args:
+            rows (iterable): result row
+            destination (file): opened file
+    """
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(destination, fieldnames=list(row))
+            writer.writeheader()
+        #end if
+        writer.writerow(row)
+    #end for
+#end def
+
+READERS = {
+    "csv"   : read_csv,
+    "jsonl" : read_jsonl,
+}
+
+WRITERS = {
+    "csv"   : write_csv,
+    "jsonl" : write_jsonl,
+}
+
+def calculate(rows, configuration, mode="tax", with_bpjs=True):
+    """
+        Function to calculate every row lazily
+
+        Args:
+            rows (iterable): row from read_csv / read_jsonl
+            configuration (dictionary / CompiledConfiguration): configuration
+            mode (string): tax -- Tax.calculate_tax / bpjs -- Bpjs.monthly_fee
+            with_bpjs (boolean): calculate bpjs for tax
+
+        Returns:
+            results (generator) : flat result row for every row
+    """
+    configuration = CompiledConfiguration.compile(configuration)
+    for row in rows:
+        employee_information = to_employee_information(row)
+        result = {}
+        if ID_FIELD in row:
+            result[ID_FIELD] = row[ID_FIELD]
+        #end if
+
+        if mode == "bpjs":
+            result.update(flatten(Bpjs(employee_information, configuration).monthly_fee()))
+        elif mode == "tax":
+            tax = Tax(employee_information, configuration, with_bpjs)
+            calculated_tax, deduction = tax.calculate_tax(
+                to_number(row.get("last_annual_tax", 0), float),
+                to_number(row.get("first_annual_tax", 0), float))
+            result.update(deduction.to_dict())
+            result["working_months"] = calculated_tax.working_months
+            result["annual_taxable_income"] = calculated_tax.annual_taxable_income
+            result["annual_tax"] = calculated_tax.annual_tax
+        else:
+            raise ValueError("Invalid mode : {}".format(mode))
+        #end if
+        yield result
+    #end for
+#end def
+
+class Progress:
+    """ count rows that pass through and report the speed """
+
+    def __init__(self, output=None, interval=5.0):
+        """
+        Args:
+            output (file): where the report is written, default to stderr
+            interval (float): seconds between report
+        """
+        self.output = output or sys.stderr
+        self.interval = interval
+        self.rows = 0
+        self.started = None
+        self._reported = None
+    #end def
+
+    @property
+    def rows_per_second(self):
+        """ average rows per second since started """
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        if elapsed <= 0:
+            return 0.0
+        #end if
+        return self.rows / elapsed
+    #end def
+
+    def report(self):
+        """ write the current speed """
+        self.output.write("{} rows, {:.0f} rows/s\n".format(self.rows,
+                                                            self.rows_per_second))
+        self.output.flush()
+        self._reported = time.perf_counter()
+    #end def
+
+    def track(self, rows):
+        """
+            Function to count rows
+
+            Args:
+                rows (iterable): rows
+
+            Returns:
+                rows (generator) : the same rows
+        """
+        self.started = self._reported = time.perf_counter()
+        for row in rows:
+            self.rows += 1
+            yield row
+            if time.perf_counter() - self._reported >= self.interval:
+                self.report()
+            #end if
+        #end for
+        self.report()
+    #end def
+#end class
+
+def detect_format(path, default="jsonl"):
+    """
+        Function to detect file format from the extension
+
+        Args:
+            path (string): file path, - for stdin / stdout
+            default (string): format when it cannot be detected
+
+        Returns:
+            format (string) : csv / jsonl
+    """
+    if path.endswith(".csv"):
+        return "csv"
+    #end if
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    #end if
+    return default
+#end def
+
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(prog="tax_bpjs.stream",
+                                     description="Calculate tax / bpjs from CSV or JSON Lines")
+    parser.add_argument("input", help="CSV / JSON Lines file, - for stdin")
+    parser.add_argument("output", help="CSV / JSON Lines file, - for stdout")
+    parser.add_argument("-c", "--configuration", required=True,
+                        help="configuration JSON file")
+    parser.add_argument("-m", "--mode", choices=("tax", "bpjs"), default="tax")
+    parser.add_argument("--input-format", choices=tuple(READERS))
+    parser.add_argument("--output-format", choices=tuple(WRITERS))
+    parser.add_argument("--without-bpjs", action="store_true",
+                        help="calculate tax without bpjs")
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="seconds between progress report")
+    args = parser.parse_args(argv)
+
+    with open(args.configuration) as configuration_file:
+        configuration = CompiledConfiguration(json.load(configuration_file))
+    #end with
+
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    destination = sys.stdout if args.output == "-" else \
+                  open(args.output, "w", newline="")
+    progress = Progress(interval=args.interval)
+    try:
+        rows = progress.track(READERS[input_format](source))
+        results = calculate(rows, configuration, args.mode, not args.without_bpjs)
+        WRITERS[output_format](results, destination)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        #end if
+        if destination is not sys.stdout:
+            destination.close()
+        #end if
+    #end try
+    return 0
+#end def
+
+if __name__ == "__main__":
+    sys.exit(main())
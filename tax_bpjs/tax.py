@@ -1,14 +1,131 @@
 """
     Tax Calculation
 """
-from datetime import datetime
-from dateutil import relativedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.records import AnnualTaxResult, NetIncome, TaxDeduction, YearIncome
+
+# most employee share the same handful of working period
+WORKING_MONTHS_CACHE_SIZE = 1024
+
+def parse_date(value):
+    """
+        Function to convert dd/mm/yyyy into date
+
+        Args:
+            value (string / date): dd/mm/yyyy or date
+
+        Returns:
+            date (date) : parsed date
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    #end if
+    if isinstance(value, date):
+        return value
+    #end if
+    # fast path for the zero padded dd/mm/yyyy
+    if len(value) == 10 and value[2] == "/" and value[5] == "/" \
+            and value[0:2].isdigit() and value[3:5].isdigit() and value[6:].isdigit():
+        return date(int(value[6:]), int(value[3:5]), int(value[0:2]))
+    #end if
+    return datetime.strptime(value, '%d/%m/%Y').date()
+#end def
+
+def _add_months(value, months):
+    """
+        Function to move a date by months, the day is clamped to the end of
+        the month like relativedelta (31/01 + 1 month is 28/02 or 29/02)
+
+        Args:
+            value (date): date
+            months (int): months to add, can be negative
+
+        Returns:
+            date (date) : moved date
+    """
+    year, month = divmod(value.month - 1 + months, 12)
+    year, month = value.year + year, month + 1
+    last_day = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+    return value.replace(year=year, month=month, day=min(value.day, last_day))
+#end def
+
+def _month_difference(start, end):
+    """
+        Function to calculate whole months between two dates, same as
+        relativedelta(start, end) expressed in months
+
+        Args:
+            start (date): start date
+            end (date): end date
+
+        Returns:
+            months (int) : whole months from end to start, negative when
+            start is before end
+    """
+    months = (start.year - end.year) * 12 + start.month - end.month
+    if start < end:
+        while start > _add_months(end, months):
+            months += 1
+        #end while
+    else:
+        while start < _add_months(end, months):
+            months -= 1
+        #end while
+    #end if
+    return months
+#end def
+
+@lru_cache(maxsize=WORKING_MONTHS_CACHE_SIZE)
+def _working_months(start_work_date, end_work_date):
+    """
+        calculate how many working month, memoized on the date pair
+        Args:
+            start_work_date : dd/mm/yyyy or date
+            end_work_date : dd/mm/yyyy or date
+
+        Returns:
+            working_months : working_months
+    """
+    # start date , start month , start year
+    start = parse_date(start_work_date)
+    end = parse_date(end_work_date)
+    months = _month_difference(start, end)
+    if abs(months) > 11:
+        raise ValueError("Only can calculate in a year period")
+
+    start_year = start.year
+    return abs(months) + 1, abs(start_year)
+#end def
 
 class Tax(Bpjs):
     """ tax configuration """
-    def __init__(self, employee_information, configuration, with_bpjs=True):
+    __slots__ = (
+        "overtime_allowances",
+        "bonus_allowances",
+        "start_work_date",
+        "end_work_date",
+        "tax_method",
+        "npwp_status",
+        "marital_status",
+        "dependents",
+        "with_bpjs",
+    )
+
+    _cache_fields = Bpjs._cache_fields + (
+        "start_work_date",
+        "end_work_date",
+        "npwp_status",
+        "marital_status",
+        "dependents",
+        "with_bpjs",
+    )
+
+    _flag_fields = Bpjs._flag_fields | frozenset(("npwp_status", "with_bpjs"))
+
+    def __init__(self, employee_information, configuration, with_bpjs=True, cache=None):
         self.base_salary         = employee_information["base_salary"         ]
         self.non_fixed_allowances= employee_information["non_fixed_allowances"]
         self.overtime_allowances = employee_information["overtime_allowances" ]
@@ -27,15 +144,12 @@ class Tax(Bpjs):
         self.marital_status      = employee_information["marital_status"     ]
         self.dependents          = employee_information["dependents"         ]
 
-        self.max_occupation_support   = configuration["max_occupation_support"]
-        self.occupation_support_rate  = configuration["occupation_support_rate"]
-        self.tax_exemption_grade      = configuration["tax_exemption_grade"]
-        self.pph_grade_rate           = configuration["pph_grade_rate"]
-        self.pph_grade_range          = configuration["pph_grade_range"]
-
         self.with_bpjs = with_bpjs
 
-        super().__init__(employee_information, configuration)
+        super().__init__(employee_information, configuration, cache)
+        if not self.configuration.has_tax:
+            raise ValueError("configuration is missing tax configuration")
+        #end if
 
     @staticmethod
     def _round_down(num, divisor):
@@ -64,18 +178,26 @@ class Tax(Bpjs):
             Returns:
                 occupation_support_deduction (int) : amount of person occupation support fee.
         """
+        configuration = self.configuration
         annual_taxable_occupation_income = annual_bruto_income * \
-        self.occupation_support_rate
+        configuration.occupation_support_rate
 
-        if annual_taxable_occupation_income > self.max_occupation_support:
-            occupation_support_deduction = self.max_occupation_support
+        if annual_taxable_occupation_income > configuration.max_occupation_support:
+            occupation_support_deduction = configuration.max_occupation_support
         else:
             occupation_support_deduction = annual_taxable_occupation_income
         #endif
         return occupation_support_deduction
     #end def
 
-    def _taxable_income_yearly(self, yearly_net_income, marital_status, dependents):
+    @property
+    def _zero_occupation_support(self):
+        """ occupation support of a zero bonus """
+        return self.configuration.zero_occupation_support
+    #end def
+
+    def _taxable_income_yearly(self, yearly_net_income, marital_status, dependents,
+                               tax_exemption=None):
         """
             Function to calculate someone gross income annually
 
@@ -83,13 +205,16 @@ class Tax(Bpjs):
                 yearly_net_income(int) : monthly_net_income * working_months.
                 marital_status(string) : the person marital status (SINGLE/MARRIED/MARRIED_CI).
                 dependents(int) : amount of how many person have.
+                tax_exemption(int) : tax exemption when it is already classified.
 
             Returns:
                 annual_taxable_income (int) : The annual taxable net income.
         """
         annual_taxable_net_income = 0
 
-        tax_exemption = self._classify_tax_exemption(marital_status, dependents)
+        if tax_exemption is None:
+            tax_exemption = self._classify_tax_exemption(marital_status, dependents)
+        #end if
 
         if yearly_net_income > tax_exemption:
             annual_taxable_net_income = yearly_net_income - tax_exemption
@@ -109,19 +234,7 @@ class Tax(Bpjs):
                 tax_exemption(int) : The tax exemption amount for a person\
                                      based on marital status and dependents.
         """
-        try:
-            base_tax_grade = self.tax_exemption_grade[marital_status]
-        except KeyError:
-            return 0
-
-        if dependents > 3:
-            # if dependents more than 3 it considered 3
-            total_person_grade = self.tax_exemption_grade["PERSON"] * 3
-        else:
-            #if dependents <= 3
-            total_person_grade = self.tax_exemption_grade["PERSON"] * dependents
-        #end if
-        return base_tax_grade + total_person_grade
+        return self.configuration.tax_exemption(marital_status, dependents)
     #end def
 
     def _tax_on_taxable_income_yearly(self, annual_taxable_income):
@@ -134,44 +247,7 @@ class Tax(Bpjs):
             Returns:
                 tax_on_income (int) : The amount of tax that person have to pay annually.
         """
-        tax_on_income = 0
-
-        if annual_taxable_income > self.pph_grade_range["first"]:
-            tax_on_income = self.pph_grade_rate["first"] *\
-            self.pph_grade_range["first"]
-        else:
-            return self.pph_grade_rate["first"] * annual_taxable_income
-        #end if
-
-        if annual_taxable_income - self.pph_grade_range["first"] > 0:
-            if annual_taxable_income > self.pph_grade_range["second"]:
-                tax_on_income += self.pph_grade_rate["second"] * \
-                        (self.pph_grade_range["second"] -
-                         self.pph_grade_range["first"])
-            else:
-                tax_on_income += (annual_taxable_income -
-                                  self.pph_grade_range["first"]) \
-                                  * self.pph_grade_rate["second"]
-            #end if
-        #end if
-
-        if annual_taxable_income - self.pph_grade_range["second"] > 0:
-            if annual_taxable_income > self.pph_grade_range["third"]:
-                tax_on_income += self.pph_grade_rate["third"]\
-                * self.pph_grade_range["second"]
-            else:
-                tax_on_income += (annual_taxable_income - \
-                                  self.pph_grade_range["second"]) *\
-                                  self.pph_grade_rate["third"]
-            #end if
-        #end if
-
-        if annual_taxable_income - self.pph_grade_range["third"] > 0:
-            tax_on_income += (annual_taxable_income -
-                              self.pph_grade_range["third"]) * \
-                              self.pph_grade_rate["fourth"]
-        #end if
-        return tax_on_income
+        return self.configuration.bracket_table.tax(annual_taxable_income)
     #end def
 
     @staticmethod
@@ -238,23 +314,13 @@ class Tax(Bpjs):
         """
             calculate how many working month
             Args:
-                start_work_date : dd/mm/yyyy
-                end_work_date : dd/mm/yyyy
+                start_work_date : dd/mm/yyyy or date
+                end_work_date : dd/mm/yyyy or date
 
             Returns:
                 working_months : working_months
         """
-        # start date , start month , start year
-        start = datetime.strptime(start_work_date, '%d/%m/%Y').date()
-        end = datetime.strptime(end_work_date, '%d/%m/%Y').date()
-        date_diff = relativedelta.relativedelta(start, end)
-        months = date_diff.months
-        years = date_diff.years
-        if abs(years) > 0:
-            raise ValueError("Only can calculate in a year period")
-
-        start_year = start.year
-        return abs(months) + 1, abs(start_year)
+        return _working_months(start_work_date, end_work_date)
     #end def
 
     def total_year_income(self, base_salary, overtime_allowances, non_fixed_allowances, bonus_allowances, bpjs_calculation, working_months):
@@ -277,32 +343,39 @@ class Tax(Bpjs):
                 annual_bruto_income
         """
         annual_salary    = base_salary * working_months # monthly salary * working months
-        annual_allowances= overtime_allowances + \
-        self.summarize(non_fixed_allowances) # monthly allowances
+        if non_fixed_allowances is self.non_fixed_allowances:
+            non_fixed_allowances = self._allowance_totals()[1]
+        else:
+            non_fixed_allowances = self.summarize(non_fixed_allowances)
+        #end if
+        annual_allowances= overtime_allowances + non_fixed_allowances # monthly allowances
         annual_work      = bpjs_calculation["death_insurance"] \
                          + bpjs_calculation["accident_insurance"] #monthly bpjs work
         annual_health   = bpjs_calculation["health_insurance"]["company"] # monthly bpjs health
         bonus           = bonus_allowances # thr
 
-        result = {
-            "annual_salary"      : annual_salary,
-            "annual_allowances"  : annual_allowances,
-            "annual_bpjs_work"   : annual_work,
-            "annual_bpjs_health" : annual_health,
-            "bonus"              : bonus,
-            "annual_bruto_income": annual_salary + annual_allowances \
-                                   + annual_work + annual_health + bonus
-        }
+        result = YearIncome(
+            annual_salary=annual_salary,
+            annual_allowances=annual_allowances,
+            annual_bpjs_work=annual_work,
+            annual_bpjs_health=annual_health,
+            bonus=bonus,
+            annual_bruto_income=annual_salary + annual_allowances \
+                                + annual_work + annual_health + bonus
+        )
         return result
     #end def
 
-    def annual_net_income(self, annual_bruto_income, bonus, bpjs_calculation):
+    def annual_net_income(self, annual_bruto_income, bonus, bpjs_calculation,
+                          occupation_support=None):
         """
             calculate annual net income
             Args:
                 annual_bruto_income
                 bonus
                 bpjs_calculation
+                occupation_support -- occupation support of annual_bruto_income - bonus
+                when it is already calculated
 
             returns:
                 occupation_support
@@ -311,8 +384,14 @@ class Tax(Bpjs):
                 bpjs_old_age_insurance
                 annual_net_income
         """
-        occupation_support     = self._occupation_support(annual_bruto_income-bonus)
-        thr_occupation_support = self._occupation_support(bonus)
+        if occupation_support is None:
+            occupation_support = self._occupation_support(annual_bruto_income-bonus)
+        #end if
+        if bonus == 0:
+            thr_occupation_support = self._zero_occupation_support
+        else:
+            thr_occupation_support = self._occupation_support(bonus)
+        #end if
 
         bpjs_pension_insurance = bpjs_calculation["pension_insurance"]["individual"]
         bpjs_old_age_insurance = bpjs_calculation["old_age_insurance"]["individual"]
@@ -320,34 +399,31 @@ class Tax(Bpjs):
         annual_net_income = annual_bruto_income - \
                             (occupation_support + thr_occupation_support + \
                              bpjs_pension_insurance + bpjs_old_age_insurance)
-        result = {
-            "occupation_support"     : occupation_support,
-            "thr_occupation_support" : thr_occupation_support,
-            "bpjs_pension_insurance" : bpjs_pension_insurance,
-            "bpjs_old_age_insurance" : bpjs_old_age_insurance,
-            "annual_net_income"      : annual_net_income
-        }
+        result = NetIncome(
+            occupation_support=occupation_support,
+            thr_occupation_support=thr_occupation_support,
+            bpjs_pension_insurance=bpjs_pension_insurance,
+            bpjs_old_age_insurance=bpjs_old_age_insurance,
+            annual_net_income=annual_net_income
+        )
         return result
     #end def
 
-    def annual_tax(self, total_salary, overtime_allowances, non_fixed_allowances, bonus_allowances):
+    def _annual_base(self, total_salary, overtime_allowances, non_fixed_allowances):
         """
-            calculate annual tax
+            calculate every part of annual tax that doesn't depend on bonus
 
             Args:
                 total_salary
                 overtime_allowances
                 non_fixed_allowances
-                bonus_allowances
 
             Returns:
                 working_months
-                total_income_result,
-                net_income_result
-                annual_taxable_income
-                tax_exemption
-                annual_tax
                 annual_bpjs
+                total_income_result (without bonus)
+                tax_exemption
+                occupation_support (without bonus)
         """
         #calculate working months and working year
         working_months, working_year = self.working_months(self.start_work_date, self.end_work_date)
@@ -356,19 +432,56 @@ class Tax(Bpjs):
         annual_bpjs = self.annual_fee(working_months, working_year,
                                       self.with_bpjs)
 
-        # annual bruto income
+        # annual bruto income without bonus
         total_income_result = self.total_year_income(total_salary, overtime_allowances,
-                                                     non_fixed_allowances, bonus_allowances,
+                                                     non_fixed_allowances, 0,
                                                      annual_bpjs, working_months)
+        # occupation support without bonus
+        occupation_support = self._occupation_support(
+            total_income_result["annual_bruto_income"])
+        # tax exemption
+        tax_exemption = self._classify_tax_exemption( self.marital_status, self.dependents )
+        return working_months, annual_bpjs, total_income_result, tax_exemption, \
+               occupation_support
+    #end def
+
+    def _annual_tax_from_base(self, annual_base, bonus_allowances):
+        """
+            calculate annual tax using the result of _annual_base
+
+            Args:
+                annual_base
+                bonus_allowances
+
+            Returns:
+                same as annual_tax
+        """
+        working_months, annual_bpjs, base_income_result, tax_exemption, \
+        base_occupation_support = annual_base
+
+        # annual bruto income, bonus is the last component of bruto income
+        total_income_result = base_income_result._replace(
+            bonus=bonus_allowances,
+            annual_bruto_income=base_income_result.annual_bruto_income + bonus_allowances
+        )
+
+        # occupation support without bonus is reused when removing the bonus
+        # give back exactly the same bruto income
+        annual_bruto_income = total_income_result.annual_bruto_income
+        occupation_support = None
+        if annual_bruto_income - bonus_allowances == base_income_result.annual_bruto_income:
+            occupation_support = base_occupation_support
+        #end if
+
         # abbyak net income
-        net_income_result = self.annual_net_income(total_income_result["annual_bruto_income"],
+        net_income_result = self.annual_net_income(annual_bruto_income,
                                                    bonus_allowances,
-                                                   annual_bpjs)
+                                                   annual_bpjs,
+                                                   occupation_support)
         # annual taxable income
         annual_taxable_income = self._taxable_income_yearly(net_income_result["annual_net_income"],
-                                                            self.marital_status, self.dependents)
-        # tax exemption
-        tax_exemption = self._classify_tax_exemption( self.marital_status, self.dependents )
+                                                            self.marital_status, self.dependents,
+                                                            tax_exemption)
 
         # annual tax
         annual_tax = self._tax_on_taxable_income_yearly(annual_taxable_income)
@@ -377,23 +490,149 @@ class Tax(Bpjs):
         additional_charge =  self._non_tax_charge(self.npwp_status, annual_tax)
         annual_tax = annual_tax + additional_charge
 
-        result = {
-            "working_months"       : working_months,
-            "total_income_result"  : total_income_result,
-            "net_income_result"    : net_income_result,
-            "annual_taxable_income": annual_taxable_income,
-            "tax_exemption"        : tax_exemption,
-            "annual_tax"           : annual_tax,
-            "annual_bpjs"          : annual_bpjs
-        }
+        result = AnnualTaxResult(
+            working_months=working_months,
+            total_income_result=total_income_result,
+            net_income_result=net_income_result,
+            annual_taxable_income=annual_taxable_income,
+            tax_exemption=tax_exemption,
+            annual_tax=annual_tax,
+            annual_bpjs=annual_bpjs
+        )
         return result
     #end def
 
+    def annual_tax(self, total_salary, overtime_allowances, non_fixed_allowances, bonus_allowances):
+        """
+            calculate annual tax, using the cache when available
+
+            Args:
+                total_salary
+                overtime_allowances
+                non_fixed_allowances
+                bonus_allowances
+
+            Returns:
+                AnnualTaxResult
+        """
+        if self.cache is None:
+            return self._annual_tax(total_salary, overtime_allowances, non_fixed_allowances,
+                                    bonus_allowances)
+        #end if
+        # allowances dictionary is keyed by its total like total_year_income use it
+        non_fixed_total = non_fixed_allowances
+        if isinstance(non_fixed_allowances, dict):
+            if non_fixed_allowances is self.non_fixed_allowances:
+                non_fixed_total = self._allowance_totals()[1]
+            else:
+                non_fixed_total = self.summarize(non_fixed_allowances)
+            #end if
+        #end if
+        key = self._cache_key("annual_tax", total_salary, overtime_allowances,
+                              non_fixed_total, bonus_allowances)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._annual_tax(total_salary, overtime_allowances, non_fixed_allowances,
+                                      bonus_allowances)
+            self.cache.put(key, result)
+        #end if
+        return result
+    #end def
+
+    @staticmethod
+    def annual_tax_batch(employees_table, configuration, with_bpjs=True, with_bonus=True):
+        """
+            calculate annual tax for many person at once (require numpy),
+            working months is resolved once for every working period
+
+            Args:
+                employees_table -- column name -> array of employee_information
+                configuration -- configuration
+                with_bpjs -- calculate bpjs or not
+                with_bonus -- include bonus_allowances
+
+            Returns:
+                same structure as AnnualTaxResult where every value is an array
+        """
+        from tax_bpjs.batch import annual_tax_batch
+        return annual_tax_batch(employees_table, configuration, with_bpjs, with_bonus)
+    #end def
+
+    def _annual_tax(self, total_salary, overtime_allowances, non_fixed_allowances,
+                    bonus_allowances):
+        """
+            calculate annual tax
+
+            Args:
+                total_salary
+                overtime_allowances
+                non_fixed_allowances
+                bonus_allowances
+
+            Returns:
+                working_months
+                total_income_result,
+                net_income_result
+                annual_taxable_income
+                tax_exemption
+                annual_tax
+                annual_bpjs
+        """
+        annual_base = self._annual_base(total_salary, overtime_allowances,
+                                        non_fixed_allowances)
+        return self._annual_tax_from_base(annual_base, bonus_allowances)
+    #end def
+
     def calculate_tax(self, last_annual_tax, first_annual_tax):
         """ calculate tax """
+        if self.cache is not None:
+            # the cache keep the annual tax with and without bonus
+            annual_tax_without_bonus = self.annual_tax(self.base_salary,
+                                                       self.overtime_allowances,
+                                                       self.non_fixed_allowances, 0)
+            annual_tax_with_bonus = None
+            if last_annual_tax > 0 and self.bonus_allowances > 0:
+                annual_tax_with_bonus = self.annual_tax(self.base_salary,
+                                                        self.overtime_allowances,
+                                                        self.non_fixed_allowances,
+                                                        self.bonus_allowances)
+            #end if
+            return self._deduction(annual_tax_without_bonus, annual_tax_with_bonus,
+                                   last_annual_tax, first_annual_tax)
+        #end if
+
+        # everything that doesn't depend on bonus is only calculated once
+        annual_base = self._annual_base(self.base_salary, self.overtime_allowances,
+                                        self.non_fixed_allowances)
         # calculate annual tax without bonus
-        annual_tax_without_bonus = self.annual_tax(self.base_salary, self.overtime_allowances,
-                                                   self.non_fixed_allowances, 0 )
+        annual_tax_without_bonus = self._annual_tax_from_base(annual_base, 0)
+
+        annual_tax_with_bonus = None
+        if last_annual_tax > 0 and self.bonus_allowances > 0:
+            # calculate bonus tax
+            annual_tax_with_bonus = self._annual_tax_from_base(annual_base,
+                                                               self.bonus_allowances)
+        #end if
+        return self._deduction(annual_tax_without_bonus, annual_tax_with_bonus,
+                               last_annual_tax, first_annual_tax)
+    #end def
+
+    def _deduction(self, annual_tax_without_bonus, annual_tax_with_bonus,
+                   last_annual_tax, first_annual_tax):
+        """
+            convert annual tax into this month deduction
+
+            Args:
+                annual_tax_without_bonus -- annual tax without bonus
+                annual_tax_with_bonus -- annual tax with bonus, only needed
+                when last_annual_tax > 0 and there is bonus
+                last_annual_tax -- annual tax of the previous month
+                first_annual_tax -- annual tax of the first month
+
+            Returns:
+                calculated_tax
+                deduction
+        """
         # calculate monthly tax
         if first_annual_tax > 0:
             monthly_tax = self._monthly(first_annual_tax,
@@ -406,12 +645,7 @@ class Tax(Bpjs):
         calculated_tax = annual_tax_without_bonus
         # calculate differences using last calculated annual tax
         if last_annual_tax > 0:
-            # calculate bonus tax
             if self.bonus_allowances > 0:
-                annual_tax_with_bonus = self.annual_tax(self.base_salary,
-                                                        self.overtime_allowances,
-                                                        self.non_fixed_allowances,
-                                                        self.bonus_allowances)
                 calculated_tax = annual_tax_with_bonus
             #end if
             differences = calculated_tax["annual_tax"] - last_annual_tax
@@ -428,12 +662,12 @@ class Tax(Bpjs):
         annual_health_insurance = annual_bpjs["health_insurance"]["individual"]
 
         # new response
-        deduction = {
-            "monthly_tax" : monthly_tax + differences,
-            "old_age_insurance" : int(annual_old_age_insurance/working_months),
-            "pension_insurance" : int(annual_pension_insurance/working_months),
-            "health_insurance"  : int(annual_health_insurance/working_months)
-        }
+        deduction = TaxDeduction(
+            monthly_tax=monthly_tax + differences,
+            old_age_insurance=self._monthly(annual_old_age_insurance, working_months),
+            pension_insurance=self._monthly(annual_pension_insurance, working_months),
+            health_insurance=self._monthly(annual_health_insurance, working_months)
+        )
         return calculated_tax, deduction
     #end def
 #end class
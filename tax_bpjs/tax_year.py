@@ -0,0 +1,299 @@
+"""
+    Running PPh 21 for one employee in one year
+"""
+from collections import namedtuple
+
+from tax_bpjs.tax import Tax, parse_date
+from tax_bpjs.records import BpjsContribution, Employee, InsuranceShare, Record
+from tax_bpjs.configuration import CompiledConfiguration
+
+NO_BPJS = BpjsContribution(InsuranceShare(0, 0), InsuranceShare(0, 0),
+                           InsuranceShare(0, 0), 0, 0)
+
+class TaxTrueUp(Record, namedtuple("TaxTrueUp", [
+        "months",
+        "annual_bruto_income",
+        "occupation_support",
+        "thr_occupation_support",
+        "bpjs_deduction",
+        "annual_net_income",
+        "tax_exemption",
+        "annual_taxable_income",
+        "annual_tax",
+        "tax_withheld",
+        "tax_due"])):
+    """
+        annual tax calculated from what is actually paid during the year,
+        tax_due is what is left to pay (negative means over withheld)
+    """
+    __slots__ = ()
+#end class
+
+class TaxState(Record, namedtuple("TaxState", [
+        "first_annual_tax",
+        "last_annual_tax",
+        "months",
+        "annual_bruto_income",
+        "bonus",
+        "bpjs_deduction",
+        "tax_withheld"])):
+    """
+        running state of TaxYear carried to the next month, first_annual_tax
+        is None before the first month
+    """
+    __slots__ = ()
+#end class
+
+def _snapshot(employee_information):
+    """
+        Function to copy employee information to compare it with the next
+        month, allowances dictionary is copied too so changing it in place
+        is seen as a change
+
+        Args:
+            employee_information (dictionary / Employee): this month information
+
+        Returns:
+            information (dictionary) : copy of employee information
+    """
+    if isinstance(employee_information, Employee):
+        information = employee_information.to_dict()
+    else:
+        information = dict(employee_information)
+    #end if
+    for key, value in information.items():
+        if isinstance(value, dict):
+            information[key] = dict(value)
+        #end if
+    #end for
+    return information
+#end def
+
+class TaxYear:
+    """ ingest payroll month by month and keep the running annual tax state """
+    __slots__ = (
+        "configuration",
+        "with_bpjs",
+        "first_annual_tax",
+        "last_annual_tax",
+        "months",
+        "annual_bruto_income",
+        "bonus",
+        "bpjs_deduction",
+        "tax_withheld",
+        "_information",
+        "_tax",
+        "_annual_base",
+        "_without_bonus",
+        "_with_bonus",
+    )
+
+    def __init__(self, configuration, with_bpjs=True, first_annual_tax=None,
+                 last_annual_tax=0):
+        """
+        Args:
+            configuration (dictionary / CompiledConfiguration): configuration
+            with_bpjs (boolean): calculate bpjs or not
+            first_annual_tax (int): annual tax of the first month when the
+            year is resumed, None when the year start from the first month
+            last_annual_tax (int): annual tax of the previous month when the
+            year is resumed
+        """
+        self.configuration = CompiledConfiguration.compile(configuration)
+        self.with_bpjs = with_bpjs
+        self.first_annual_tax = first_annual_tax
+        self.last_annual_tax = last_annual_tax
+
+        # running total of what is actually paid
+        self.months = 0
+        self.annual_bruto_income = 0
+        self.bonus = 0
+        self.bpjs_deduction = 0
+        self.tax_withheld = 0
+
+        self._information = None
+        self._tax = None
+        self._annual_base = None
+        self._without_bonus = None
+        self._with_bonus = None
+    #end def
+
+    @classmethod
+    def resume(cls, configuration, state, with_bpjs=True):
+        """
+            Function to continue a year from the state of the previous month
+
+            Args:
+                configuration (dictionary / CompiledConfiguration): configuration
+                state (TaxState): result of TaxYear.state, None start a new year
+                with_bpjs (boolean): calculate bpjs or not
+
+            Returns:
+                tax_year (TaxYear) : tax year ready to ingest the next month
+        """
+        if state is None:
+            return cls(configuration, with_bpjs)
+        #end if
+        tax_year = cls(configuration, with_bpjs, state.first_annual_tax, state.last_annual_tax)
+        tax_year.months = state.months
+        tax_year.annual_bruto_income = state.annual_bruto_income
+        tax_year.bonus = state.bonus
+        tax_year.bpjs_deduction = state.bpjs_deduction
+        tax_year.tax_withheld = state.tax_withheld
+        return tax_year
+    #end def
+
+    @property
+    def state(self):
+        """ running state to carry to the next month, see resume """
+        return TaxState(
+            first_annual_tax=self.first_annual_tax,
+            last_annual_tax=self.last_annual_tax,
+            months=self.months,
+            annual_bruto_income=self.annual_bruto_income,
+            bonus=self.bonus,
+            bpjs_deduction=self.bpjs_deduction,
+            tax_withheld=self.tax_withheld
+        )
+    #end def
+
+    def _calculator(self, employee_information):
+        """
+            Function to get the calculator of this month, the annual
+            calculation of the previous month is reused when nothing change
+
+            Args:
+                employee_information (dictionary / Employee): this month information
+
+            Returns:
+                tax (Tax) : calculator
+        """
+        information = _snapshot(employee_information)
+        if information != self._information:
+            tax = Tax(employee_information, self.configuration, self.with_bpjs)
+            self._information = information
+            self._tax = tax
+            self._annual_base = tax._annual_base(tax.base_salary,
+                                                 tax.overtime_allowances,
+                                                 tax.non_fixed_allowances)
+            self._without_bonus = tax._annual_tax_from_base(self._annual_base, 0)
+            self._with_bonus = None
+        #end if
+        return self._tax
+    #end def
+
+    def ingest(self, employee_information):
+        """
+            calculate tax of the next month
+
+            Args:
+                employee_information (dictionary / Employee): this month information
+
+            Returns:
+                calculated_tax
+                deduction
+                same as Tax.calculate_tax using the carried first / last annual tax
+        """
+        tax = self._calculator(employee_information)
+
+        last_annual_tax = self.last_annual_tax
+        if last_annual_tax > 0 and tax.bonus_allowances > 0 and self._with_bonus is None:
+            self._with_bonus = tax._annual_tax_from_base(self._annual_base,
+                                                         tax.bonus_allowances)
+        #end if
+        calculated_tax, deduction = tax._deduction(self._without_bonus, self._with_bonus,
+                                                   last_annual_tax,
+                                                   self.first_annual_tax or 0)
+        if self.first_annual_tax is None:
+            self.first_annual_tax = calculated_tax.annual_tax
+        #end if
+        self.last_annual_tax = calculated_tax.annual_tax
+
+        self._add_month(tax, deduction)
+        return calculated_tax, deduction
+    #end def
+
+    def _add_month(self, tax, deduction):
+        """
+            Function to add what is paid this month into the running total
+
+            Args:
+                tax (Tax): calculator of this month
+                deduction (TaxDeduction): deduction of this month
+        """
+        start = parse_date(tax.start_work_date)
+        month = start.month + self.months
+
+        bpjs = NO_BPJS
+        if self.with_bpjs is True:
+            bpjs = tax.monthly_fee(month, start.year)
+        #end if
+
+        self.months += 1
+        self.annual_bruto_income += tax.base_salary + tax.overtime_allowances \
+                                    + tax._allowance_totals()[1] \
+                                    + bpjs.death_insurance + bpjs.accident_insurance \
+                                    + bpjs.health_insurance.company \
+                                    + tax.bonus_allowances
+        self.bonus += tax.bonus_allowances
+        self.bpjs_deduction += bpjs.pension_insurance.individual \
+                               + bpjs.old_age_insurance.individual
+        self.tax_withheld += deduction.monthly_tax
+    #end def
+
+    @property
+    def working_months(self):
+        """ working months of the year, None before the first month """
+        if self._tax is None:
+            return None
+        #end if
+        return self._without_bonus.working_months
+    #end def
+
+    @property
+    def is_complete(self):
+        """ True when every working month has been ingested """
+        return self._tax is not None and self.months >= self.working_months
+    #end def
+
+    def true_up(self):
+        """
+            calculate the annual tax from what is actually paid so far,
+            usually called after the last month (December)
+
+            Returns:
+                TaxTrueUp
+        """
+        if self._tax is None:
+            raise ValueError("No month has been ingested")
+        #end if
+        tax = self._tax
+
+        occupation_support = tax._occupation_support(self.annual_bruto_income - self.bonus)
+        thr_occupation_support = tax._occupation_support(self.bonus)
+        annual_net_income = self.annual_bruto_income - \
+                            (occupation_support + thr_occupation_support +
+                             self.bpjs_deduction)
+        tax_exemption = tax._classify_tax_exemption(tax.marital_status, tax.dependents)
+        annual_taxable_income = tax._taxable_income_yearly(annual_net_income,
+                                                           tax.marital_status,
+                                                           tax.dependents,
+                                                           tax_exemption)
+        annual_tax = tax._tax_on_taxable_income_yearly(annual_taxable_income)
+        annual_tax = annual_tax + tax._non_tax_charge(tax.npwp_status, annual_tax)
+
+        return TaxTrueUp(
+            months=self.months,
+            annual_bruto_income=self.annual_bruto_income,
+            occupation_support=occupation_support,
+            thr_occupation_support=thr_occupation_support,
+            bpjs_deduction=self.bpjs_deduction,
+            annual_net_income=annual_net_income,
+            tax_exemption=tax_exemption,
+            annual_taxable_income=annual_taxable_income,
+            annual_tax=annual_tax,
+            tax_withheld=self.tax_withheld,
+            tax_due=annual_tax - self.tax_withheld
+        )
+    #end def
+#end class
@@ -0,0 +1,235 @@
+import unittest
+import random
+
+from datetime import date
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.batch import np, employees_table
+from tax_bpjs.test.test_configuration import CONFIGURATION as TAX_CONFIGURATION, \
+                                              EMPLOYEE_INFO
+
+FLAGS = [
+    "is_salary_allowances",
+    "accident_insurance_status",
+    "pension_insurance_status",
+    "old_age_insurance_status",
+    "death_insurance_status",
+    "health_insurance_status",
+]
+
+CONFIGURATION = {
+    "health_max_fee"                    : 8000000,
+    "pension_max_fee"                   : 8094000,
+    "old_pension_max_fee"               : 7703500,
+    "individual_health_insurance_rate"  : 0.01,
+    "company_health_insurance_rate"     : 0.04,
+    "death_insurance_rate"              : 0.003,
+    "individual_old_age_insurance_rate" : 0.02,
+    "company_old_age_insurance_rate"    : 0.037,
+    "individual_pension_insurance_rate" : 0.01,
+    "company_pension_insurance_rate"    : 0.02,
+}
+
+def random_employees(size, seed=0):
+    """ generate random employee information """
+    generator = random.Random(seed)
+    employees = []
+    for _ in range(size):
+        employee = {
+            "base_salary"          : generator.randrange(1000000, 30000000, 500),
+            "fixed_allowances"     : {"other" : generator.randrange(0, 3000000, 250)},
+            "non_fixed_allowances" : {"living": generator.randrange(0, 3000000, 250)},
+            "industry_risk_rate"   : generator.choice([0.24, 0.54, 0.89, 1.27, 1.74]),
+        }
+        for flag in FLAGS:
+            employee[flag] = generator.random() > 0.2
+        employees.append(employee)
+    return employees
+
+def to_table(employees):
+    """ convert list of employee into columns """
+    return {
+        key : [employee[key] for employee in employees]
+        for key in employees[0]
+    }
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchBpjs(unittest.TestCase):
+    """ test class for batch BPJS """
+
+    def _assert_monthly_match(self, employees, result):
+        for index, employee in enumerate(employees):
+            expected = Bpjs(employee, CONFIGURATION).monthly_fee()
+            for key, value in expected.items():
+                if hasattr(value, "items"):
+                    for sub_key, sub_value in value.items():
+                        self.assertEqual(result[key][sub_key][index], sub_value)
+                else:
+                    self.assertEqual(result[key][index], value)
+
+    def test_monthly_fee_batch_match_scalar(self):
+        """ batch result must be identical with the scalar result """
+        employees = random_employees(2000)
+        result = Bpjs.monthly_fee_batch(to_table(employees), CONFIGURATION)
+        self._assert_monthly_match(employees, result)
+
+    def test_monthly_fee_batch_broadcast_scalar(self):
+        """ scalar column are used for every employee """
+        table = {
+            "base_salary"          : [8000000, 8500000, 3700000],
+            "fixed_allowances"     : 0,
+            "non_fixed_allowances" : {"living" : 0},
+            "industry_risk_rate"   : 0.24,
+        }
+        for flag in FLAGS:
+            table[flag] = True
+        result = Bpjs.monthly_fee_batch(table, CONFIGURATION)
+        self.assertEqual(list(result["health_insurance"]["company"]),
+                         [320000, 320000, 148000])
+        self.assertEqual(list(result["death_insurance"]), [24000, 25500, 11100])
+        self.assertEqual(list(result["accident_insurance"]), [19200, 20400, 8880])
+
+    def test_monthly_fee_batch_flag_is_true(self):
+        """ non boolean flag is not enrolled, same as the scalar is True check """
+        employees = random_employees(40, seed=5)
+        for index, employee in enumerate(employees):
+            for flag in FLAGS:
+                employee[flag] = [True, False, 1, "yes", 0][(index + len(flag)) % 5]
+        self._assert_monthly_match(employees,
+                                   Bpjs.monthly_fee_batch(to_table(employees), CONFIGURATION))
+        table = to_table(employees)
+        for flag in FLAGS:
+            table[flag] = 1
+        result = Bpjs.monthly_fee_batch(table, CONFIGURATION)
+        self.assertFalse(result["health_insurance"]["company"].any())
+
+    def test_monthly_fee_batch_index(self):
+        """ distinct combination are calculated once and gathered """
+        from tax_bpjs.batch import combination_index
+        grades = random_employees(40, seed=3)
+        employees = [dict(grades[index % len(grades)]) for index in range(2000)]
+        table = to_table(employees)
+
+        index = combination_index(table)
+        self.assertLessEqual(len(index.total_salary), len(grades))
+        self._assert_monthly_match(employees,
+                                   Bpjs.monthly_fee_batch(table, CONFIGURATION, True))
+
+        # the index is reused for another configuration
+        configuration = dict(CONFIGURATION, health_max_fee=12000000)
+        expected = Bpjs.monthly_fee_batch(table, configuration)
+        result = Bpjs.monthly_fee_batch(table, configuration, index)
+        for key in ("old_age_insurance", "pension_insurance", "health_insurance"):
+            for share in ("company", "individual"):
+                self.assertTrue(np.array_equal(result[key][share], expected[key][share]))
+        self.assertTrue(np.array_equal(result["accident_insurance"],
+                                       expected["accident_insurance"]))
+
+        # combination that doesn't repeat is not indexed
+        self.assertIsNone(combination_index(to_table(random_employees(2000))))
+        self._assert_monthly_match(
+            random_employees(200),
+            Bpjs.monthly_fee_batch(to_table(random_employees(200)), CONFIGURATION, True))
+
+    def test_summarize_column(self):
+        """ allowances column must be identical with Bpjs.summarize """
+        from tax_bpjs.batch import allowance_column, summarize_column
+        allowances = [{"meal" : 250000, "transport" : 300000.0}, {}, {"other" : "125000"},
+                      {"living" : 1000000}]
+        self.assertEqual(list(summarize_column(allowances)),
+                         [Bpjs.summarize(value) for value in allowances])
+        # summarized allowances mixed with dictionary
+        self.assertEqual(list(summarize_column([{"meal" : 250000}, 400000, {}])),
+                         [250000, 400000, 0])
+        # float summarized allowances is not truncated, same as Bpjs.summarize
+        allowances = [{"meal" : 250000.75}, 400000.5, {}]
+        self.assertEqual(list(summarize_column(allowances)),
+                         [Bpjs.summarize(value) for value in allowances])
+        self.assertEqual(len(summarize_column([])), 0)
+        self.assertEqual(list(allowance_column({"fixed_allowances" : {"meal" : 100, "other" : 25}},
+                                               "fixed_allowances", 3)), [125, 125, 125])
+
+    def test_round_tenth(self):
+        """ vectorized round must behave like builtin round """
+        from tax_bpjs.batch import round_tenth
+        values = [0.05, 0.15, 0.25, 2.675, 1234.45, 19200.05, 8880.349999999]
+        result = round_tenth(np.asarray(values))
+        self.assertEqual(list(result), [round(value, 1) for value in values])
+
+def random_tax_employees(size, seed=0):
+    """ generate random employee information with different working period """
+    generator = random.Random(seed)
+    employees = []
+    for _ in range(size):
+        employees.append(dict(
+            EMPLOYEE_INFO,
+            base_salary=generator.randrange(1000000, 60000000, 500),
+            non_fixed_allowances={"living" : generator.randrange(0, 3000000, 250)},
+            overtime_allowances=generator.randrange(0, 1000000, 1000),
+            bonus_allowances=generator.choice([0, 0, 2500000, 7500000.5, 150000000]),
+            start_work_date="01/{:02d}/2018".format(generator.randrange(1, 13)),
+            npwp_status=generator.random() > 0.2,
+            marital_status=generator.choice(["SINGLE", "MARRIED", "MARRIED_CI"]),
+            dependents=generator.randrange(0, 4),
+            pension_insurance_status=generator.random() > 0.3,
+        ))
+    return employees
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchTax(unittest.TestCase):
+    """ test class for batch annual tax """
+
+    def _assert_annual_tax_match(self, employees, with_bpjs, with_bonus):
+        result = Tax.annual_tax_batch(employees_table(employees), TAX_CONFIGURATION,
+                                      with_bpjs, with_bonus)
+        for index, employee in enumerate(employees):
+            expected = Tax(employee, TAX_CONFIGURATION, with_bpjs).annual_tax(
+                employee["base_salary"], employee["overtime_allowances"],
+                employee["non_fixed_allowances"],
+                employee["bonus_allowances"] if with_bonus else 0)
+            for key in ("working_months", "annual_taxable_income", "tax_exemption",
+                        "annual_tax"):
+                self.assertEqual(result[key][index], expected[key])
+            for group in ("total_income_result", "net_income_result", "annual_bpjs"):
+                for key, value in expected[group].items():
+                    if hasattr(value, "items"):
+                        for share, share_value in value.items():
+                            self.assertEqual(result[group][key][share][index], share_value)
+                    else:
+                        self.assertEqual(result[group][key][index], value)
+
+    def test_annual_tax_batch_match_scalar(self):
+        """ batch result must be identical with the scalar result """
+        employees = random_tax_employees(500)
+        for with_bpjs in (True, False):
+            for with_bonus in (True, False):
+                self._assert_annual_tax_match(employees, with_bpjs, with_bonus)
+
+    def test_annual_tax_batch_single_period(self):
+        """ every employee sharing one working period """
+        employees = [dict(employee, start_work_date=date(2018, 1, 1),
+                          end_work_date=date(2018, 12, 1))
+                     for employee in random_tax_employees(50, seed=1)]
+        self._assert_annual_tax_match(employees, True, True)
+
+    def test_unique_apply(self):
+        """ function is called once for every distinct combination """
+        from tax_bpjs.batch import _unique_apply
+        calls = []
+
+        def function(*key):
+            calls.append(key)
+            return key
+        #end def
+
+        columns = (np.asarray(["01/01/2018", "01/06/2018", "01/01/2018", "01/06/2018"]),
+                   np.asarray([1, 1, 1, 2]),
+                   np.asarray([date(2018, 12, 1)] * 4, dtype=object))
+        results, inverse = _unique_apply(function, *columns)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual([results[code] for code in inverse],
+                         list(zip(*(column.tolist() for column in columns))))
+
+if __name__ ==  '__main__' :
+    unittest.main()
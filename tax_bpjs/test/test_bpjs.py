@@ -1,9 +1,35 @@
 import unittest
 import sys
 import json
+import random
 
 from tax_bpjs.bpjs import Bpjs
 
+def reference_annual_fee(bpjs, working_months, year):
+    """ previous month by month annual fee used to verify annual_fee """
+    total_salary = bpjs.base_salary
+    if bpjs.is_salary_allowances is True:
+        total_salary = total_salary + bpjs.summarize(bpjs.non_fixed_allowances) \
+                       + bpjs.summarize(bpjs.fixed_allowances)
+    annual = [0] * 8
+    for month in range(1, working_months + 1):
+        monthly = [0] * 8
+        if bpjs.old_age_insurance_status is True:
+            monthly[0] = bpjs._company_old_age_insurance(total_salary)
+            monthly[1] = bpjs._individual_old_age_insurance(total_salary)
+        if bpjs.pension_insurance_status is True:
+            monthly[2] = bpjs._company_pension_insurance(total_salary, month, year)
+            monthly[3] = bpjs._individual_pension_insurance(total_salary, month, year)
+        if bpjs.health_insurance_status is True:
+            monthly[4] = bpjs._company_health_insurance(total_salary)
+            monthly[5] = bpjs._individual_health_insurance(total_salary)
+        if bpjs.death_insurance_status is True:
+            monthly[6] = bpjs._death_insurance(total_salary)
+        if bpjs.accident_insurance_status is True:
+            monthly[7] = bpjs._accident_insurance(total_salary, bpjs.industry_risk_rate)
+        annual = [total + value for total, value in zip(annual, monthly)]
+    return annual
+
 class TestBpjs(unittest.TestCase):
     """ "test class for BPJS """
 
@@ -208,6 +234,30 @@ class TestBpjs(unittest.TestCase):
         self.assertEqual(annually["accident_insurance"], 230400)
         self.assertEqual(annually["death_insurance"], 288000)
 
+    def test_calc_annual_fee_match_monthly_loop(self):
+        """ annual fee must be identical with adding every month """
+        generator = random.Random(0)
+        for _ in range(200):
+            self.bpjs.base_salary = generator.randrange(1000000, 30000000, 100)
+            self.bpjs.fixed_allowances = generator.randrange(0, 2000000, 100)
+            self.bpjs.industry_risk_rate = generator.choice([0.24, 0.54, 0.89, 1.27, 1.74])
+            self.bpjs.is_salary_allowances = generator.random() > 0.5
+            for year in (2017, 2018, 2019):
+                for working_months in range(0, 13):
+                    annually = self.bpjs.annual_fee(working_months, year)
+                    result = [
+                        annually["old_age_insurance"]["company"],
+                        annually["old_age_insurance"]["individual"],
+                        annually["pension_insurance"]["company"],
+                        annually["pension_insurance"]["individual"],
+                        annually["health_insurance"]["company"],
+                        annually["health_insurance"]["individual"],
+                        annually["death_insurance"],
+                        annually["accident_insurance"],
+                    ]
+                    expected = reference_annual_fee(self.bpjs, working_months, year)
+                    self.assertEqual(result, expected)
+
     def test_summarize(self):
         """ calculating fixed allowances """
         fixed_allowances = {
@@ -215,6 +265,27 @@ class TestBpjs(unittest.TestCase):
         }
         result = self.bpjs.summarize(fixed_allowances)
         self.assertEqual(result, 1000000)
+        # summarized allowances is used as it is
+        self.assertEqual(self.bpjs.summarize(1500000), 1500000)
+        self.assertEqual(self.bpjs.summarize({}), 0)
+
+    def test_allowance_totals(self):
+        """ allowances is summarized once until another allowances is assigned """
+        self.bpjs.fixed_allowances = {"meal" : 250000, "transport" : 300000}
+        self.bpjs.non_fixed_allowances = 100000
+        self.assertEqual(self.bpjs._allowance_totals(), (550000, 100000))
+        totals = self.bpjs._allowances
+        self.assertEqual(self.bpjs._allowance_totals(), (550000, 100000))
+        self.assertIs(self.bpjs._allowances, totals)
+
+        self.bpjs.fixed_allowances = {"meal" : 250000}
+        self.assertEqual(self.bpjs._allowance_totals(), (250000, 100000))
+
+        # allowances changed in place is summarized again
+        self.bpjs.fixed_allowances["transport"] = 125000
+        self.assertEqual(self.bpjs._allowance_totals(), (375000, 100000))
+        self.bpjs.non_fixed_allowances = 100000.5
+        self.assertEqual(self.bpjs._allowance_totals(), (375000, 100000.5))
 
 if __name__ ==  '__main__' :
     unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import random
+
+from tax_bpjs.brackets import BracketTable
+from tax_bpjs.batch import np
+
+PPH_GRADE_RATE = {
+    "first" : 0.05,
+    "second": 0.15,
+    "third" : 0.25,
+    "fourth": 0.30
+}
+
+PPH_GRADE_RANGE = {
+    "first" : 50000000,
+    "second": 250000000,
+    "third" : 500000000
+}
+
+def four_tier_tax(income, rate, grade_range):
+    """ previous hardcoded four tier calculation """
+    if income > grade_range["first"]:
+        tax = rate["first"] * grade_range["first"]
+    else:
+        return rate["first"] * income
+    if income > grade_range["second"]:
+        tax += rate["second"] * (grade_range["second"] - grade_range["first"])
+    else:
+        tax += (income - grade_range["first"]) * rate["second"]
+    if income - grade_range["second"] > 0:
+        if income > grade_range["third"]:
+            tax += rate["third"] * (grade_range["third"] - grade_range["second"])
+        else:
+            tax += (income - grade_range["second"]) * rate["third"]
+    if income - grade_range["third"] > 0:
+        tax += (income - grade_range["third"]) * rate["fourth"]
+    return tax
+
+class TestBracketTable(unittest.TestCase):
+    """ test class for progressive tax bracket """
+
+    def setUp(self):
+        self.table = BracketTable(PPH_GRADE_RATE, PPH_GRADE_RANGE)
+
+    def test_tax(self):
+        """ tax on taxable income """
+        self.assertEqual(self.table.tax(0), 0)
+        self.assertEqual(self.table.tax(4650000), 232500)
+        self.assertEqual(self.table.tax(50000000), 2500000)
+        self.assertEqual(self.table.tax(159600000), 18940000)
+        self.assertEqual(self.table.tax(261384000), 35346000)
+        self.assertEqual(self.table.tax(600000000), 125000000)
+
+    def test_tax_match_four_tier(self):
+        """ table lookup is identical with the four tier calculation """
+        generator = random.Random(0)
+        incomes = [generator.randrange(0, 1000000000, 1000) for _ in range(5000)]
+        incomes += [50000000, 250000000, 500000000]
+        for income in incomes:
+            self.assertEqual(self.table.tax(income),
+                             four_tier_tax(income, PPH_GRADE_RATE, PPH_GRADE_RANGE))
+
+    def test_third_bracket_use_bracket_width(self):
+        """ third bracket is charged on its own width """
+        table = BracketTable(PPH_GRADE_RATE, {
+            "first" : 50000000,
+            "second": 250000000,
+            "third" : 600000000
+        })
+        self.assertEqual(table.tax(700000000),
+                         2500000 + 30000000 + 87500000 + 30000000)
+
+    def test_five_bracket(self):
+        """ five bracket schedule using list configuration """
+        table = BracketTable([0.05, 0.15, 0.25, 0.30, 0.35],
+                             [60000000, 250000000, 500000000, 5000000000])
+        self.assertEqual(table.tax(60000000), 3000000)
+        self.assertEqual(table.tax(6000000000),
+                         3000000 + 28500000 + 62500000 + 1350000000 + 350000000)
+
+        table = BracketTable(dict(PPH_GRADE_RATE, fifth=0.35),
+                             dict(PPH_GRADE_RANGE, fourth=5000000000))
+        self.assertEqual(len(table.rates), 5)
+
+    def test_invalid_configuration(self):
+        """ invalid bracket configuration """
+        with self.assertRaises(ValueError):
+            BracketTable([0.05, 0.15], [50000000, 250000000])
+
+        with self.assertRaises(ValueError):
+            BracketTable([0.05, 0.15, 0.25], [250000000, 50000000])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_tax_batch(self):
+        """ vectorized tax is identical with the scalar tax """
+        generator = random.Random(1)
+        incomes = [generator.randrange(0, 1000000000, 1000) for _ in range(5000)]
+        incomes += [0, 50000000, 250000000, 500000000]
+        result = self.table.tax_batch(np.asarray(incomes))
+        self.assertEqual(list(result), [self.table.tax(income) for income in incomes])
+
+if __name__ ==  '__main__' :
+    unittest.main()
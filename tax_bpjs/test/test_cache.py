@@ -0,0 +1,102 @@
+import unittest
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.money import IntegerTax
+from tax_bpjs.cache import ResultCache, fingerprint
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+class TestResultCache(unittest.TestCase):
+    """ test class for the result cache """
+
+    def test_fingerprint(self):
+        """ fingerprint doesn't depend on dictionary order """
+        self.assertEqual(fingerprint({"a" : 1, "b" : [1, 2]}),
+                         fingerprint({"b" : (1, 2), "a" : 1}))
+        self.assertNotEqual(fingerprint({"a" : 1}), fingerprint({"a" : 1.0}))
+        self.assertEqual(len(fingerprint("x")), 32)
+        self.assertEqual(CompiledConfiguration(CONFIGURATION).fingerprint,
+                         CompiledConfiguration(dict(CONFIGURATION)).fingerprint)
+
+    def test_lru(self):
+        """ least recently used result is evicted """
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 1, 1))
+        with self.assertRaises(ValueError):
+            ResultCache(maxsize=0)
+
+    def test_calculate_tax(self):
+        """ cached result is identical and shared between employee """
+        cache = ResultCache()
+        configuration = CompiledConfiguration(CONFIGURATION)
+        for _ in range(3):
+            result = Tax(dict(EMPLOYEE_INFO), configuration, cache=cache).calculate_tax(0, 0)
+            self.assertEqual(result, Tax(EMPLOYEE_INFO, configuration).calculate_tax(0, 0))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 2)
+
+        # different input is a different result
+        Tax(dict(EMPLOYEE_INFO, dependents=1), configuration, cache=cache).calculate_tax(0, 0)
+        self.assertEqual(cache.misses, 2)
+        # integer money mode doesn't share the float result
+        IntegerTax(EMPLOYEE_INFO, configuration, cache=cache).calculate_tax(0, 0)
+        self.assertEqual(cache.misses, 3)
+
+    def test_key_type(self):
+        """ equal value of different type is a different result """
+        cache = ResultCache()
+        configuration = CompiledConfiguration(CONFIGURATION)
+        Tax(EMPLOYEE_INFO, configuration, cache=cache).calculate_tax(0, 0)
+        employee_info = dict(EMPLOYEE_INFO, npwp_status=1, pension_insurance_status=1)
+        self.assertEqual(Tax(employee_info, configuration, cache=cache).calculate_tax(0, 0),
+                         Tax(employee_info, configuration).calculate_tax(0, 0))
+        self.assertEqual(cache.misses, 2)
+        self.assertNotEqual(fingerprint(True), fingerprint(1))
+
+    def test_key_allowances(self):
+        """ allowances is keyed by its total, changing it in place is a new key """
+        cache = ResultCache()
+        configuration = CompiledConfiguration(CONFIGURATION)
+        employee_info = dict(EMPLOYEE_INFO, fixed_allowances={"meal" : 300000},
+                             non_fixed_allowances={"living" : 500000})
+        tax = Tax(employee_info, configuration, cache=cache)
+        tax.calculate_tax(0, 0)
+        Tax(dict(employee_info, non_fixed_allowances={"a" : 200000, "b" : 300000}),
+            configuration, cache=cache).calculate_tax(0, 0)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        employee_info["non_fixed_allowances"]["living"] = 4000000
+        self.assertEqual(tax.calculate_tax(0, 0),
+                         Tax(employee_info, configuration).calculate_tax(0, 0))
+        self.assertEqual(cache.misses, 2)
+
+    def test_monthly_fee(self):
+        """ month and year are part of the key """
+        cache = ResultCache()
+        bpjs = Bpjs(EMPLOYEE_INFO, CONFIGURATION, cache=cache)
+        self.assertEqual(bpjs.monthly_fee(1, 2018), Bpjs(EMPLOYEE_INFO, CONFIGURATION)
+                         .monthly_fee(1, 2018))
+        self.assertNotEqual(bpjs.monthly_fee(1, 2018), bpjs.monthly_fee(3, 2018))
+        bpjs.monthly_fee(3, 2018)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_invalidate(self):
+        """ configuration change drop every result """
+        cache = ResultCache()
+        Bpjs(EMPLOYEE_INFO, CONFIGURATION, cache=cache).monthly_fee()
+        self.assertEqual(len(cache), 1)
+        Bpjs(EMPLOYEE_INFO, dict(CONFIGURATION, health_max_fee=12000000),
+             cache=cache).monthly_fee()
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.invalidations, 1)
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -62,7 +62,7 @@ class TestCasseteTax(unittest.TestCase):
                 tax= Tax(case["input"], configuration, False)
                 calculated_tax, deduction = tax.calculate_tax(last_annual_tax,
                                                               first_annual_tax)
-                print(json.dumps(calculated_tax))
+                print(json.dumps(calculated_tax.to_dict()))
                 print(deduction)
                 self._match_dictionary(deduction, case["output"])
 
@@ -0,0 +1,100 @@
+import unittest
+import os
+import tempfile
+
+from tax_bpjs import stream
+from tax_bpjs.batch import np
+from tax_bpjs.columnar import pa
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+EMPLOYEES = [
+    dict(EMPLOYEE_INFO, employee_id="A1"),
+    dict(EMPLOYEE_INFO, employee_id="A2", base_salary=12500000, npwp_status=False,
+         last_annual_tax=1500000.0),
+    dict(EMPLOYEE_INFO, employee_id="A3", base_salary=45000000, marital_status="MARRIED",
+         dependents=4, bonus_allowances=20000000, last_annual_tax=90000000.0,
+         first_annual_tax=85000000.0),
+    dict(EMPLOYEE_INFO, employee_id="A4", base_salary=3700000, start_work_date="01/06/2018",
+         non_fixed_allowances=450000, overtime_allowances=120000),
+]
+
+def _columns(employees):
+    keys = list(employees[0])
+    for employee_information in employees:
+        for key in employee_information:
+            if key not in keys:
+                keys.append(key)
+    return {key : np.asarray([employee_information.get(key, 0)
+                              for employee_information in employees])
+            for key in keys}
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestColumnar(unittest.TestCase):
+    """ test class for columnar payroll """
+
+    def _assert_match(self, results, expected):
+        for index, row in enumerate(expected):
+            for key, value in row.items():
+                actual = results[key][index]
+                self.assertEqual(actual.item() if hasattr(actual, "item") else actual,
+                                 value, (index, key))
+
+    def test_calculate_tax(self):
+        """ columnar tax match the streaming pipeline """
+        from tax_bpjs.columnar import calculate
+        expected = list(stream.calculate(EMPLOYEES, CONFIGURATION))
+        self._assert_match(calculate(_columns(EMPLOYEES), CONFIGURATION), expected)
+
+    def test_calculate_bpjs(self):
+        """ columnar bpjs match the streaming pipeline """
+        from tax_bpjs.columnar import calculate
+        expected = list(stream.calculate(EMPLOYEES, CONFIGURATION, "bpjs"))
+        self._assert_match(calculate(_columns(EMPLOYEES), CONFIGURATION, "bpjs"), expected)
+
+    def test_scalar_column(self):
+        """ bonus row calculated by the scalar calculator read scalar column """
+        from tax_bpjs.columnar import calculate
+        expected = list(stream.calculate(EMPLOYEES, CONFIGURATION))
+        columns = _columns(EMPLOYEES)
+        columns.update(tax_method="GROSS", is_salary_allowances=True, industry_risk_rate=0.24,
+                       fixed_allowances={"transport" : 0})
+        self._assert_match(calculate(columns, CONFIGURATION), expected)
+
+    @unittest.skipUnless(pa is not None, "pyarrow is not installed")
+    def test_parquet_missing_column(self):
+        """ missing column use the default, also for the bonus row """
+        from tax_bpjs.columnar import read_table, calculate
+        missing = ("dependents", "accident_insurance_status", "tax_method")
+        employees = [{key : value for key, value in employee_information.items()
+                      if key not in missing}
+                     for employee_information in EMPLOYEES]
+        expected = list(stream.calculate(employees, CONFIGURATION))
+
+        rows = _columns(employees)
+        table = pa.table({key : pa.array(value.tolist()) for key, value in rows.items()})
+        self._assert_match(calculate(read_table(table), CONFIGURATION), expected)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet(self):
+        """ read employee from Parquet and write the result as Parquet """
+        from tax_bpjs.columnar import read_parquet, calculate, write_parquet
+        import pyarrow.parquet as pq
+        employees = [dict(employee_information,
+                          fixed_allowances={"transport" : 250000, "meal" : 0})
+                     for employee_information in EMPLOYEES]
+        expected = list(stream.calculate(employees, CONFIGURATION))
+
+        rows = _columns(EMPLOYEES)
+        rows["fixed_allowances"] = [{"transport" : 250000, "meal" : 0}] * len(EMPLOYEES)
+        table = pa.table({key : pa.array(value if isinstance(value, list) else value.tolist())
+                          for key, value in rows.items()})
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "employees.parquet")
+            destination = os.path.join(directory, "result.parquet")
+            pq.write_table(table, source)
+            write_parquet(calculate(read_parquet(source), CONFIGURATION), destination)
+            results = pq.read_table(destination).to_pydict()
+        self._assert_match(results, expected)
+
+if __name__ ==  '__main__' :
+    unittest.main()
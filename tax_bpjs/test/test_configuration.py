@@ -0,0 +1,146 @@
+import unittest
+import pickle
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.configuration import CompiledConfiguration
+
+BPJS_CONFIGURATION = {
+    "health_max_fee"                    : 8000000,
+    "pension_max_fee"                   : 8094000,
+    "old_pension_max_fee"               : 7703500,
+    "individual_health_insurance_rate"  : 0.01,
+    "company_health_insurance_rate"     : 0.04,
+    "death_insurance_rate"              : 0.003,
+    "individual_old_age_insurance_rate" : 0.02,
+    "company_old_age_insurance_rate"    : 0.037,
+    "individual_pension_insurance_rate" : 0.01,
+    "company_pension_insurance_rate"    : 0.02,
+}
+
+CONFIGURATION = dict(BPJS_CONFIGURATION, **{
+    "max_occupation_support" : 6000000,
+    "occupation_support_rate": 0.05,
+    "tax_exemption_grade"    : {
+        "SINGLE"    : 54000000,
+        "MARRIED"   : 58500000,
+        "MARRIED_CI": 112500000,
+        "PERSON"    : 4500000
+    },
+    "pph_grade_rate" : {
+        "first" : 0.05,
+        "second": 0.15,
+        "third" : 0.25,
+        "fourth": 0.30
+    },
+    "pph_grade_range" : {
+        "first" : 50000000,
+        "second": 250000000,
+        "third" : 500000000
+    }
+})
+
+EMPLOYEE_INFO = {
+    "base_salary"          : 8000000,
+    "fixed_allowances"     : 0,
+    "non_fixed_allowances" : 0,
+    "overtime_allowances"  : 0,
+    "bonus_allowances"     : 0,
+    "start_work_date"      : "01/01/2018",
+    "end_work_date"        : "01/12/2018",
+    "tax_method"           : "GROSS",
+    "npwp_status"          : True,
+    "marital_status"       : "SINGLE",
+    "dependents"           : 0,
+    "is_salary_allowances"      : True,
+    "accident_insurance_status" : True,
+    "pension_insurance_status"  : True,
+    "old_age_insurance_status"  : True,
+    "death_insurance_status"    : True,
+    "health_insurance_status"   : True,
+    "industry_risk_rate"        : 0.24
+}
+
+class TestCompiledConfiguration(unittest.TestCase):
+    """ test class for compiled configuration """
+
+    def setUp(self):
+        self.configuration = CompiledConfiguration(CONFIGURATION)
+
+    def test_derived_value(self):
+        """ cap x rate are precomputed """
+        self.assertEqual(self.configuration.max_company_health_insurance, 320000)
+        self.assertEqual(self.configuration.max_individual_pension_insurance, 80940)
+        self.assertEqual(self.configuration.old_max_individual_pension_insurance, 77035)
+        self.assertEqual(self.configuration.bracket_table.cumulative_tax[1], 2500000)
+
+    def test_tax_exemption(self):
+        """ tax exemption table """
+        self.assertEqual(self.configuration.tax_exemption("MARRIED", 3), 72000000)
+        self.assertEqual(self.configuration.tax_exemption("MARRIED", 5), 72000000)
+        self.assertEqual(self.configuration.tax_exemption("SINGLE", 0), 54000000)
+        self.assertEqual(self.configuration.tax_exemption("UNKNOWN", 1), 0)
+
+    def test_immutable(self):
+        """ compiled configuration cannot be changed """
+        with self.assertRaises(AttributeError):
+            self.configuration.health_max_fee = 0
+
+    def test_compile_return_compiled(self):
+        """ compiled configuration is not compiled again """
+        self.assertIs(CompiledConfiguration.compile(self.configuration),
+                      self.configuration)
+
+    def test_compile_same_dictionary(self):
+        """ the same dictionary is compiled again only when it change """
+        configuration = dict(CONFIGURATION)
+        compiled = CompiledConfiguration.compile(configuration)
+        self.assertIs(CompiledConfiguration.compile(configuration), compiled)
+        self.assertIs(Tax(EMPLOYEE_INFO, configuration).configuration, compiled)
+
+        configuration["health_max_fee"] = 12000000
+        changed = CompiledConfiguration.compile(configuration)
+        self.assertIsNot(changed, compiled)
+        self.assertEqual(changed.health_max_fee, 12000000)
+        self.assertNotEqual(changed.fingerprint, compiled.fingerprint)
+
+    def test_pickle(self):
+        """ compiled configuration can be sent to another process """
+        configuration = pickle.loads(pickle.dumps(self.configuration))
+        self.assertEqual(configuration.source, CONFIGURATION)
+        self.assertEqual(configuration.tax_exemption("MARRIED", 1), 63000000)
+
+    def test_invalid_configuration(self):
+        """ invalid configuration raise ValueError """
+        configuration = dict(CONFIGURATION)
+        del configuration["health_max_fee"]
+        with self.assertRaises(ValueError):
+            CompiledConfiguration(configuration)
+
+        configuration = dict(CONFIGURATION, death_insurance_rate="0.003")
+        with self.assertRaises(ValueError):
+            CompiledConfiguration(configuration)
+
+        configuration = dict(CONFIGURATION)
+        del configuration["pph_grade_range"]
+        with self.assertRaises(ValueError):
+            CompiledConfiguration(configuration)
+
+    def test_bpjs_only_configuration(self):
+        """ tax configuration is optional for bpjs """
+        configuration = CompiledConfiguration(BPJS_CONFIGURATION)
+        self.assertFalse(configuration.has_tax)
+        Bpjs(EMPLOYEE_INFO, configuration)
+        with self.assertRaises(ValueError):
+            Tax(EMPLOYEE_INFO, configuration)
+
+    def test_shared_between_calculator(self):
+        """ calculator reference the same compiled configuration """
+        first = Tax(EMPLOYEE_INFO, self.configuration)
+        second = Tax(EMPLOYEE_INFO, self.configuration)
+        self.assertIs(first.configuration, second.configuration)
+        self.assertEqual(first.calculate_tax(0, 0),
+                         Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0))
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.money import IntegerTax
+from tax_bpjs.grossup import gross_up, gross_up_batch, solve, _AnnualTaxFunction, _bisect
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+EMPLOYEES = [
+    EMPLOYEE_INFO,
+    dict(EMPLOYEE_INFO, base_salary=3000000),
+    dict(EMPLOYEE_INFO, base_salary=30000000, npwp_status=False),
+    dict(EMPLOYEE_INFO, base_salary=95000000, marital_status="MARRIED", dependents=2),
+    dict(EMPLOYEE_INFO, start_work_date="01/06/2018", overtime_allowances=750000),
+]
+
+class TestGrossUp(unittest.TestCase):
+    """ test class for the gross up solver """
+
+    def test_allowance_cover_its_own_tax(self):
+        """ annual tax including the allowance is the allowance """
+        for employee_info in EMPLOYEES:
+            result = gross_up(employee_info, CONFIGURATION)
+            function = _AnnualTaxFunction(Tax(employee_info, CONFIGURATION), 0)
+            self.assertEqual(function(result.annual_tax_allowance), result.annual_tax_allowance)
+            self.assertEqual(result.tax_allowance,
+                             Tax._monthly(result.annual_tax_allowance, result.working_months))
+            self.assertLessEqual(result.evaluations, 5)
+
+    def test_gross_up(self):
+        """ allowance of the default employee """
+        result = gross_up(EMPLOYEE_INFO, CONFIGURATION)
+        self.assertEqual(result.annual_tax_allowance, 2019200)
+        self.assertEqual(result.tax_allowance, 168266)
+
+    def test_without_tax(self):
+        """ employee below tax exemption doesn't need allowance """
+        result = gross_up(dict(EMPLOYEE_INFO, base_salary=3000000), CONFIGURATION)
+        self.assertEqual(result.annual_tax_allowance, 0)
+        self.assertEqual(result.evaluations, 1)
+
+    def test_match_bisection(self):
+        """ closed form and bisection find the same allowance """
+        for employee_info in EMPLOYEES:
+            function = _AnnualTaxFunction(Tax(employee_info, CONFIGURATION), 0)
+            self.assertEqual(_bisect(function),
+                             gross_up(employee_info, CONFIGURATION).annual_tax_allowance)
+
+    def test_batch(self):
+        """ batch give the same result in the same order """
+        self.assertEqual(list(gross_up_batch(EMPLOYEES, CONFIGURATION)),
+                         [gross_up(employee_info, CONFIGURATION) for employee_info in EMPLOYEES])
+
+    def test_integer_money(self):
+        """ integer money mode give whole rupiah allowance """
+        result = solve(IntegerTax(EMPLOYEE_INFO, CONFIGURATION))
+        self.assertIs(type(result.annual_tax_allowance), int)
+        self.assertEqual(result.annual_tax_allowance, 2019200)
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import json
+import os
+from decimal import Decimal
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.money import (DecimalBpjs, DecimalTax, IntegerBpjs, IntegerTax,
+                            to_ppm, to_rupiah)
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+__location__ = os.path.realpath(
+    os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+def leaves(value):
+    """ every number inside nested record """
+    if hasattr(value, "items"):
+        for item in value.values():
+            yield from leaves(item)
+    else:
+        yield value
+
+class TestMoney(unittest.TestCase):
+    """ test class for the exact money mode """
+
+    def test_to_ppm(self):
+        """ rate is converted without floating point error """
+        self.assertEqual(to_ppm(0.037), 37000)
+        self.assertEqual(to_ppm(0.003), 3000)
+        self.assertEqual(to_ppm(0.24, 100), 2400)
+        with self.assertRaises(ValueError):
+            to_ppm(0.0000001)
+
+    def test_to_rupiah(self):
+        """ only whole rupiah is accepted """
+        self.assertEqual(to_rupiah(8000000.0), 8000000)
+        self.assertEqual(to_rupiah(Decimal("8000000")), 8000000)
+        with self.assertRaises(ValueError):
+            to_rupiah(8000000.5)
+
+    def test_monthly_fee(self):
+        """ every contribution is a whole rupiah int """
+        result = IntegerBpjs(EMPLOYEE_INFO, CONFIGURATION).monthly_fee(1, 2018)
+        self.assertEqual(result["old_age_insurance"]["company"], 296000)
+        self.assertEqual(result["pension_insurance"]["individual"], 77035)
+        self.assertEqual(result["death_insurance"], 24000)
+        self.assertEqual(result["accident_insurance"], 19200)
+        for value in leaves(result):
+            self.assertIs(type(value), int)
+
+    def test_rounding(self):
+        """ accident is rounded half up and death is truncated """
+        employee_info = dict(EMPLOYEE_INFO, base_salary=1234567)
+        result = IntegerBpjs(employee_info, CONFIGURATION).monthly_fee()
+        # 1234567 x 0.24% = 2962.9608
+        self.assertEqual(result["accident_insurance"], 2963)
+        # 1234567 x 0.3% = 3703.701
+        self.assertEqual(result["death_insurance"], 3703)
+        # 1234567 x 3.7% = 45678.979
+        self.assertEqual(result["old_age_insurance"]["company"], 45679)
+
+    def test_integer_match_decimal(self):
+        """ integer and Decimal mode give the same result """
+        with open(os.path.join(__location__, 'tax_case.json')) as f:
+            data = json.load(f)
+        for case in data["case"]:
+            for base_salary in (case["input"]["base_salary"], 1234567, 9876543):
+                employee_info = dict(case["input"], base_salary=base_salary)
+                integer = IntegerTax(employee_info, data["configuration"]).calculate_tax(0, 0)
+                decimal = DecimalTax(employee_info, data["configuration"]).calculate_tax(0, 0)
+                self.assertEqual(integer, decimal)
+                self.assertEqual(IntegerBpjs(employee_info, data["configuration"]).monthly_fee(),
+                                 DecimalBpjs(employee_info, data["configuration"]).monthly_fee())
+                for value in leaves(integer[1]):
+                    self.assertIs(type(value), int)
+
+    def test_calculate_tax(self):
+        """ whole rupiah configuration give the same tax as the float mode """
+        with open(os.path.join(__location__, 'tax_case.json')) as f:
+            data = json.load(f)
+        for case in data["case"]:
+            _, deduction = IntegerTax(case["input"], data["configuration"]).calculate_tax(0, 0)
+            _, expected = Tax(case["input"], data["configuration"]).calculate_tax(0, 0)
+            self.assertEqual(deduction, expected)
+
+    def test_non_npwp(self):
+        """ additional charge without npwp is an int """
+        employee_info = dict(EMPLOYEE_INFO, npwp_status=False)
+        calculated_tax, _ = IntegerTax(employee_info, CONFIGURATION).calculate_tax(0, 0)
+        self.assertEqual(calculated_tax["annual_tax"], 1923300 + 384660)
+        self.assertIs(type(calculated_tax["annual_tax"]), int)
+
+if __name__ ==  '__main__' :
+    unittest.main()
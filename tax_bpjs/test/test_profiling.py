@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.profiling import StageProfiler
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+class TestStageProfiler(unittest.TestCase):
+    """ test class for stage profiling """
+
+    def test_record_stage(self):
+        """ every stage of annual tax is recorded """
+        expected = Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        with StageProfiler() as profiler:
+            for _ in range(3):
+                result = Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        self.assertEqual(result, expected)
+
+        stats = profiler.stats()
+        self.assertEqual(stats["calculate_tax"]["calls"], 3)
+        self.assertEqual(stats["annual_fee"]["calls"], 3)
+        self.assertEqual(stats["_non_tax_charge"]["calls"], 3)
+        self.assertGreater(stats["calculate_tax"]["seconds"],
+                           stats["annual_fee"]["seconds"])
+        # calculate_tax goes through the annual tax stages
+        self.assertEqual(stats["_annual_base"]["calls"], 3)
+        self.assertEqual(stats["_annual_tax_from_base"]["calls"], 3)
+        self.assertGreaterEqual(stats["calculate_tax"]["seconds"],
+                                stats["_annual_base"]["seconds"] +
+                                stats["_annual_tax_from_base"]["seconds"])
+
+    def test_other_thread(self):
+        """ calls from another thread are not recorded """
+        import threading
+        with StageProfiler() as profiler:
+            thread = threading.Thread(
+                target=lambda: Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0))
+            thread.start()
+            thread.join()
+            Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        self.assertEqual(profiler.stats()["calculate_tax"]["calls"], 1)
+
+    def test_disabled(self):
+        """ calculator is restored when the profiler is disabled """
+        original = Tax.__dict__["_non_tax_charge"]
+        profiler = StageProfiler()
+        with profiler:
+            self.assertIsNot(Tax.__dict__["_non_tax_charge"], original)
+            with self.assertRaises(RuntimeError):
+                StageProfiler().enable()
+        self.assertIs(Tax.__dict__["_non_tax_charge"], original)
+        Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        self.assertEqual(profiler.stats()["calculate_tax"]["calls"], 0)
+
+    def test_hook_and_allocations(self):
+        """ hook receive every stage and allocation is recorded """
+        calls = []
+        with StageProfiler(allocations=True,
+                           hook=lambda *values: calls.append(values)) as profiler:
+            Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        self.assertIn("annual_fee", [stage for stage, _, _ in calls])
+        self.assertGreater(profiler.stats()["calculate_tax"]["allocated_bytes"], 0)
+
+    def test_prometheus(self):
+        """ Prometheus text file """
+        with StageProfiler() as profiler:
+            Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        text = profiler.to_prometheus({"instance" : "payroll"})
+        self.assertIn("# TYPE tax_bpjs_stage_calls_total counter", text)
+        self.assertIn('tax_bpjs_stage_calls_total{stage="annual_fee",instance="payroll"} 1',
+                      text)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tax_bpjs.prom")
+            profiler.write_prometheus(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), profiler.to_prometheus())
+
+if __name__ ==  '__main__' :
+    unittest.main()
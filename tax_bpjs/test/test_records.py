@@ -0,0 +1,69 @@
+import unittest
+import json
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.records import AnnualTaxResult, BpjsContribution, Employee
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+class TestRecords(unittest.TestCase):
+    """ test class for employee and result records """
+
+    def test_bpjs_contribution(self):
+        """ monthly fee can be read like the previous dictionary """
+        monthly_fee = Bpjs(EMPLOYEE_INFO, CONFIGURATION).monthly_fee()
+        self.assertIsInstance(monthly_fee, BpjsContribution)
+        self.assertEqual(monthly_fee["health_insurance"]["company"], 320000)
+        self.assertEqual(monthly_fee.health_insurance.individual, 80000)
+        self.assertEqual(monthly_fee.to_dict(), {
+            "old_age_insurance" : {"company" : 296000, "individual" : 160000},
+            "pension_insurance" : {"company" : 160000, "individual" : 80000},
+            "health_insurance"  : {"company" : 320000, "individual" : 80000},
+            "death_insurance"   : 24000,
+            "accident_insurance": 19200,
+        })
+        with self.assertRaises(KeyError):
+            monthly_fee["unknown"]
+
+    def test_round_trip(self):
+        """ record can be converted from and to dictionary """
+        calculated_tax, deduction = Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        self.assertIsInstance(calculated_tax, AnnualTaxResult)
+        result = AnnualTaxResult.from_dict(json.loads(json.dumps(calculated_tax.to_dict())))
+        self.assertEqual(result, calculated_tax)
+        self.assertEqual(dict(deduction.items())["monthly_tax"], 160275)
+
+    def test_mapping(self):
+        """ iterating, len and in use the field name like the previous dictionary """
+        import copy
+        import pickle
+        deduction = Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)[1]
+        self.assertEqual(list(deduction), ["monthly_tax", "old_age_insurance",
+                                           "pension_insurance", "health_insurance"])
+        self.assertIn("monthly_tax", deduction)
+        self.assertNotIn(160275, deduction)
+        self.assertEqual(len(deduction), 4)
+        self.assertEqual(dict(deduction)["monthly_tax"], 160275)
+        self.assertEqual(deduction.get("unknown", 0), 0)
+        self.assertEqual(deduction._replace(monthly_tax=0).monthly_tax, 0)
+        self.assertEqual(pickle.loads(pickle.dumps(deduction)), deduction)
+        self.assertEqual(copy.copy(deduction), deduction)
+        self.assertEqual(json.loads(json.dumps(deduction.to_dict()))["monthly_tax"], 160275)
+
+    def test_no_instance_dictionary(self):
+        """ calculator and record doesn't carry __dict__ """
+        tax = Tax(EMPLOYEE_INFO, CONFIGURATION)
+        calculated_tax, _ = tax.calculate_tax(0, 0)
+        self.assertFalse(hasattr(tax, "__dict__"))
+        self.assertFalse(hasattr(calculated_tax, "__dict__"))
+        self.assertFalse(hasattr(Employee(0), "__dict__"))
+
+    def test_employee(self):
+        """ employee record can be used as employee information """
+        employee = Employee.from_dict(dict(EMPLOYEE_INFO, unknown=1))
+        self.assertEqual(employee.to_dict(), EMPLOYEE_INFO)
+        self.assertEqual(Tax(employee, CONFIGURATION).calculate_tax(0, 0),
+                         Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0))
+
+if __name__ ==  '__main__' :
+    unittest.main()
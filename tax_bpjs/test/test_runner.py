@@ -0,0 +1,69 @@
+import unittest
+import json
+import os
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.runner import PayrollRunner, calculate_timeline
+
+__location__ = os.path.realpath(
+    os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+class TestRunner(unittest.TestCase):
+    """ test class for payroll runner """
+
+    def setUp(self):
+        with open(os.path.join(__location__, 'tax_case.json')) as f:
+            data = json.load(f)
+        self.timeline = [case["input"] for case in data["case"]]
+        self.expected = [case["output"] for case in data["case"]]
+        self.configuration = data["configuration"]
+
+    def _assert_timeline(self, result):
+        self.assertEqual(len(result.months), len(self.expected))
+        for (_, deduction), expected in zip(result.months, self.expected):
+            for key, value in expected.items():
+                self.assertEqual(deduction[key], value)
+
+    def test_calculate_timeline(self):
+        """ first and last annual tax are carried between month """
+        result = calculate_timeline(self.timeline, self.configuration)
+        self._assert_timeline(result)
+        self.assertEqual(result.first_annual_tax, result.months[0][0].annual_tax)
+        self.assertEqual(result.last_annual_tax, result.months[-1][0].annual_tax)
+
+    def test_calculate_single_month(self):
+        """ employee information is a one month timeline """
+        result = calculate_timeline(self.timeline[0], self.configuration)
+        expected = Tax(self.timeline[0], self.configuration).calculate_tax(0, 0)
+        self.assertEqual(result.months, [expected])
+
+    def test_run_in_process(self):
+        """ single worker calculate inside the current process """
+        runner = PayrollRunner(self.configuration, workers=1, chunk_size=2)
+        results = list(runner.run([self.timeline] * 5))
+        self.assertEqual(len(results), 5)
+        for result in results:
+            self._assert_timeline(result)
+
+    def test_run_multiprocess(self):
+        """ result keep the input order """
+        employees = []
+        for index in range(20):
+            employees.append([
+                dict(month, base_salary=month["base_salary"] + index * 100000)
+                for month in self.timeline
+            ])
+        runner = PayrollRunner(self.configuration, workers=2, chunk_size=3,
+                               max_pending_chunks=2)
+        results = list(runner.run(iter(employees)))
+        self.assertEqual(results, [
+            calculate_timeline(timeline, self.configuration) for timeline in employees
+        ])
+
+    def test_invalid_chunk_size(self):
+        """ chunk size must be positive """
+        with self.assertRaises(ValueError):
+            PayrollRunner(self.configuration, chunk_size=0)
+
+if __name__ ==  '__main__' :
+    unittest.main()
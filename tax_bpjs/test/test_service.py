@@ -0,0 +1,76 @@
+import unittest
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.batch import np
+from tax_bpjs.service import TaxService, quote, quote_batch
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+EMPLOYEES = [
+    EMPLOYEE_INFO,
+    dict(EMPLOYEE_INFO, base_salary=12500000, npwp_status=False),
+    dict(EMPLOYEE_INFO, base_salary=45000000, marital_status="MARRIED", dependents=4,
+         tax_method="NETT"),
+    dict(EMPLOYEE_INFO, base_salary=3700000, start_work_date="01/06/2018",
+         non_fixed_allowances={"living" : 450000}, overtime_allowances=120000),
+    dict(EMPLOYEE_INFO, base_salary=7950000, industry_risk_rate=1.27,
+         pension_insurance_status=False),
+] * 8
+
+class TestTaxService(unittest.TestCase):
+    """ test class for the asyncio tax service """
+
+    def _run(self, service, employees):
+        async def main():
+            async with service:
+                return await asyncio.gather(*(service.quote(employee_info)
+                                              for employee_info in employees),
+                                            return_exceptions=True)
+        return asyncio.run(main())
+
+    def test_quote(self):
+        """ quote match Tax.calculate_tax """
+        calculated_tax, deduction = Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        result = quote(EMPLOYEE_INFO, CONFIGURATION)
+        self.assertEqual(result.annual_tax, calculated_tax.annual_tax)
+        self.assertEqual(result.monthly_tax, deduction.monthly_tax)
+        self.assertEqual(result.health_insurance, deduction.health_insurance)
+        self.assertEqual(result.take_home_pay, EMPLOYEE_INFO["base_salary"] +
+                         EMPLOYEE_INFO["fixed_allowances"] +
+                         EMPLOYEE_INFO["non_fixed_allowances"] +
+                         EMPLOYEE_INFO["overtime_allowances"] -
+                         (deduction.monthly_tax + deduction.old_age_insurance +
+                          deduction.pension_insurance + deduction.health_insurance))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_quote_batch(self):
+        """ vectorized quote is identical to the scalar quote """
+        expected = [quote(employee_info, CONFIGURATION) for employee_info in EMPLOYEES]
+        service = TaxService(CONFIGURATION)
+        self.assertEqual(quote_batch(EMPLOYEES, service.configuration), expected)
+
+    def test_micro_batch(self):
+        """ concurrent request are evaluated together """
+        expected = [quote(employee_info, CONFIGURATION) for employee_info in EMPLOYEES]
+        service = TaxService(CONFIGURATION, max_batch_size=16)
+        self.assertEqual(self._run(service, EMPLOYEES), expected)
+        stats = service.stats()
+        self.assertEqual(stats["requests"], len(EMPLOYEES))
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["largest_batch"], 16)
+
+    def test_executor_and_error(self):
+        """ a failing employee doesn't fail the rest of the batch """
+        missing = {key : value for key, value in EMPLOYEE_INFO.items() if key != "tax_method"}
+        employees = EMPLOYEES + [missing]
+        with ThreadPoolExecutor(1) as executor:
+            service = TaxService(CONFIGURATION, max_delay=0.001, executor=executor)
+            results = self._run(service, employees)
+        self.assertEqual(results[:-1], [quote(employee_info, CONFIGURATION)
+                                        for employee_info in EMPLOYEES])
+        self.assertIsInstance(results[-1], KeyError)
+        self.assertEqual(service.stats()["batches"], 1)
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import json
+import os
+import tempfile
+
+from tax_bpjs.runner import PayrollRunner, calculate_timeline
+from tax_bpjs.state import StateFile
+from tax_bpjs.tax_year import TaxState, TaxYear
+
+__location__ = os.path.realpath(
+    os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+STATE = TaxState(first_annual_tax=None, last_annual_tax=1250000.0, months=3,
+                 annual_bruto_income=27000000, bonus=0, bpjs_deduction=720000,
+                 tax_withheld=312500)
+
+class TestStateFile(unittest.TestCase):
+    """ test class for memory mapped tax state """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state.bin")
+        with open(os.path.join(__location__, 'tax_case.json')) as f:
+            data = json.load(f)
+        self.timeline = [case["input"] for case in data["case"]]
+        self.configuration = data["configuration"]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_get(self):
+        """ state is kept in place and survive reopening """
+        with StateFile(self.path, capacity=4) as state:
+            self.assertIsNone(state.get(42))
+            state.put(42, STATE)
+            state.put(2 ** 64 - 1, STATE._replace(first_annual_tax=1500000.0))
+            state.put(42, STATE._replace(months=4))
+            self.assertEqual(len(state), 2)
+            # grow beyond the initial capacity
+            for employee_id in range(1000, 1100):
+                state.put(employee_id, STATE._replace(months=employee_id % 12))
+            self.assertGreaterEqual(state.capacity, 128)
+
+        with StateFile(self.path) as state:
+            self.assertEqual(len(state), 102)
+            self.assertEqual(state.get(42), STATE._replace(months=4))
+            self.assertEqual(state.get(2 ** 64 - 1).first_annual_tax, 1500000.0)
+            self.assertEqual(state.get(1077).months, 1077 % 12)
+            self.assertIn(1099, state)
+            self.assertNotIn(7, state)
+            self.assertEqual(len(list(state.items())), 102)
+            with self.assertRaises(ValueError):
+                state.get(-1)
+
+    def test_money_type(self):
+        """ integer and Decimal money is kept exact with its type """
+        from decimal import Decimal
+        exact = TaxState(first_annual_tax=2 ** 62 + 1, last_annual_tax=Decimal("1250001"),
+                         months=3, annual_bruto_income=27000000, bonus=Decimal(0),
+                         bpjs_deduction=-720000, tax_withheld=312500.5)
+        with StateFile(self.path) as state:
+            state.put(1, exact)
+            result = state.get(1)
+            self.assertEqual(result, exact)
+            self.assertEqual(result.first_annual_tax, 2 ** 62 + 1)
+            self.assertIsInstance(result.last_annual_tax, Decimal)
+            self.assertIsInstance(result.annual_bruto_income, int)
+            self.assertIsInstance(result.tax_withheld, float)
+            for value in (Decimal("0.5"), 2 ** 64, "100"):
+                with self.assertRaises(ValueError):
+                    state.put(2, exact._replace(bonus=value))
+            self.assertNotIn(2, state)
+            self.assertEqual(len(state), 1)
+
+    def test_invalid_file(self):
+        """ other file is refused """
+        with open(self.path, "wb") as f:
+            f.write(b"not a state file".ljust(128, b"\0"))
+        with self.assertRaises(ValueError):
+            StateFile(self.path)
+
+    def test_resume_tax_year(self):
+        """ resumed tax year match the year calculated at once """
+        whole = TaxYear(self.configuration)
+        for employee_information in self.timeline:
+            whole.ingest(employee_information)
+
+        resumed = None
+        for employee_information in self.timeline:
+            tax_year = TaxYear.resume(self.configuration, resumed)
+            tax_year.ingest(employee_information)
+            resumed = tax_year.state
+        self.assertEqual(resumed, whole.state)
+        self.assertEqual(tax_year.true_up(), whole.true_up())
+
+    def test_runner_month_by_month(self):
+        """ monthly run carry the state through the file """
+        employees = {
+            index : [dict(month, base_salary=month["base_salary"] + index * 100000)
+                     for month in self.timeline]
+            for index in (3, 11, 25)
+        }
+        runner = PayrollRunner(self.configuration, workers=1)
+        with StateFile(self.path) as state:
+            months = {employee_id : [] for employee_id in employees}
+            for month in range(len(self.timeline)):
+                results = runner.run(((employee_id, timeline[month])
+                                      for employee_id, timeline in employees.items()),
+                                     state)
+                for employee_id, result in zip(employees, results):
+                    months[employee_id].extend(result.months)
+            for employee_id, timeline in employees.items():
+                expected = calculate_timeline(timeline, self.configuration)
+                self.assertEqual(months[employee_id], expected.months)
+                self.assertEqual(state.get(employee_id), expected.state)
+
+    def test_runner_multiprocess(self):
+        """ state is read and written by the parent process """
+        employees = [(index, self.timeline[:6]) for index in range(10)]
+        runner = PayrollRunner(self.configuration, workers=2, chunk_size=3)
+        with StateFile(self.path) as state:
+            list(runner.run(employees, state))
+            results = list(runner.run([(index, self.timeline[6:])
+                                       for index in range(10)], state))
+            expected = calculate_timeline(self.timeline, self.configuration)
+            self.assertEqual(results[0].months, expected.months[6:])
+            self.assertEqual(state.get(9), expected.state)
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import tempfile
+
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.money import DecimalTax
+from tax_bpjs.store import ResultStore
+from tax_bpjs.configuration import CompiledConfiguration
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+EMPLOYEES = [dict(EMPLOYEE_INFO, base_salary=base_salary)
+             for base_salary in (5000000, 8000000, 12000000, 25000000)]
+
+class TestResultStore(unittest.TestCase):
+    """ test class for the persistent result store """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "payroll.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _run(self, employees, configuration=CONFIGURATION):
+        with ResultStore(self.path) as store:
+            results = [Tax(employee_info, configuration, cache=store).calculate_tax(0, 0)
+                       for employee_info in employees]
+            return results, store.stats()
+
+    def test_rerun_only_calculate_changed_employee(self):
+        """ second run read every unchanged employee from the file """
+        expected = [Tax(employee_info, CONFIGURATION).calculate_tax(0, 0)
+                    for employee_info in EMPLOYEES]
+        results, stats = self._run(EMPLOYEES)
+        self.assertEqual(results, expected)
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 4))
+
+        corrected = list(EMPLOYEES)
+        corrected[2] = dict(corrected[2], dependents=2)
+        results, stats = self._run(corrected)
+        self.assertEqual(results[:2], expected[:2])
+        self.assertEqual(results[2], Tax(corrected[2], CONFIGURATION).calculate_tax(0, 0))
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+        self.assertEqual(stats["size"], 5)
+
+    def test_record_round_trip(self):
+        """ stored record keep the same type and value """
+        with ResultStore(self.path) as store:
+            bpjs = Bpjs(EMPLOYEE_INFO, CONFIGURATION, cache=store)
+            expected = bpjs.monthly_fee(1, 2018)
+            key = bpjs._cache_key("monthly_fee", 1, 2018)
+            self.assertIn(key, store)
+            self.assertEqual(store.get(key), expected)
+            self.assertEqual(type(store.get(key)), type(expected))
+
+            tax = DecimalTax(EMPLOYEE_INFO, CONFIGURATION, cache=store)
+            expected = tax.annual_tax(8000000, 0, 0, 0)
+            stored = store.get(tax._cache_key("annual_tax", 8000000, 0, 0, 0))
+            self.assertEqual(stored, expected)
+            self.assertEqual(repr(stored), repr(expected))
+
+    def test_compact(self):
+        """ compact delete result of every other configuration """
+        self._run(EMPLOYEES)
+        changed = dict(CONFIGURATION, health_max_fee=12000000)
+        _, stats = self._run(EMPLOYEES, changed)
+        self.assertEqual(stats["configurations"], 2)
+
+        with ResultStore(self.path) as store:
+            deleted = store.compact(CompiledConfiguration(changed))
+            self.assertEqual(deleted, 4)
+            self.assertEqual(len(store), 4)
+            self.assertEqual(store.stats()["configurations"], 1)
+            with self.assertRaises(ValueError):
+                ResultStore(":memory:").compact()
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+
+from tax_bpjs import stream
+from tax_bpjs.bpjs import Bpjs
+from tax_bpjs.tax import Tax
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+CSV_INPUT = """employee_id,base_salary,fixed_allowances.other,non_fixed_allowances.living,overtime_allowances,bonus_allowances,start_work_date,end_work_date,tax_method,npwp_status,marital_status,dependents,is_salary_allowances,accident_insurance_status,pension_insurance_status,old_age_insurance_status,death_insurance_status,health_insurance_status,industry_risk_rate
+A1,8000000,0,0,0,0,01/01/2018,01/12/2018,GROSS,true,SINGLE,0,true,true,true,true,true,true,0.24
+A2,8000000,0,8000000,560000,0,01/01/2018,01/12/2018,GROSS,true,SINGLE,0,true,true,true,true,true,true,0.24
+"""
+
+class TestStream(unittest.TestCase):
+    """ test class for streaming pipeline """
+
+    def test_to_employee_information(self):
+        """ CSV row is converted into employee information """
+        row = next(stream.read_csv(io.StringIO(CSV_INPUT)))
+        employee_information = stream.to_employee_information(row)
+        self.assertEqual(employee_information["base_salary"], 8000000)
+        self.assertEqual(employee_information["fixed_allowances"], {"other" : 0})
+        self.assertIs(employee_information["npwp_status"], True)
+        self.assertEqual(employee_information["industry_risk_rate"], 0.24)
+        self.assertEqual(employee_information["start_work_date"], "01/01/2018")
+
+        with self.assertRaises(ValueError):
+            stream.to_boolean("maybe")
+
+    def test_missing_column(self):
+        """ missing column use the Employee default, same as the columnar reader """
+        from tax_bpjs.columnar import DEFAULTS
+        from tax_bpjs.records import Employee
+        employee_information = stream.to_employee_information({"base_salary" : "8000000"})
+        employee = Employee(8000000)
+        for key, value in employee_information.items():
+            self.assertEqual(value, employee[key], key)
+        self.assertIs(employee_information["npwp_status"], True)
+        for key, value in DEFAULTS.items():
+            self.assertEqual(employee_information[key], value, key)
+
+    def test_fraction(self):
+        """ fraction in an integer column is kept like the calculator get it """
+        self.assertEqual(stream.to_number("100.5"), 100.5)
+        self.assertIs(type(stream.to_number("100.0")), int)
+        self.assertEqual(stream.to_number(" 8000000 "), 8000000)
+
+        row = dict(next(stream.read_csv(io.StringIO(CSV_INPUT))),
+                   base_salary="8000000.5", overtime_allowances="560000.25")
+        employee_information = stream.to_employee_information(row)
+        self.assertEqual(employee_information["base_salary"], 8000000.5)
+        expected = dict(EMPLOYEE_INFO, base_salary=8000000.5, overtime_allowances=560000.25,
+                        fixed_allowances={"other" : 0}, non_fixed_allowances={"living" : 0})
+        result = next(stream.calculate([row], CONFIGURATION))
+        self.assertEqual(result["monthly_tax"],
+                         Tax(expected, CONFIGURATION).calculate_tax(0, 0)[1].monthly_tax)
+
+    def test_calculate_tax_csv(self):
+        """ calculate tax from CSV and write JSON Lines """
+        output = io.StringIO()
+        rows = stream.read_csv(io.StringIO(CSV_INPUT))
+        stream.write_jsonl(stream.calculate(rows, CONFIGURATION), output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([result["employee_id"] for result in results], ["A1", "A2"])
+        self.assertEqual(results[0]["monthly_tax"], 160275)
+
+    def test_calculate_bpjs_jsonl(self):
+        """ calculate bpjs from JSON Lines and write CSV """
+        source = io.StringIO(json.dumps(EMPLOYEE_INFO) + "\n\n")
+        output = io.StringIO()
+        rows = stream.read_jsonl(source)
+        stream.write_csv(stream.calculate(rows, CONFIGURATION, "bpjs"), output)
+        header, row = output.getvalue().splitlines()
+        result = dict(zip(header.split(","), row.split(",")))
+        expected = Bpjs(EMPLOYEE_INFO, CONFIGURATION).monthly_fee()
+        self.assertEqual(float(result["health_insurance_company"]),
+                         expected.health_insurance.company)
+        self.assertEqual(float(result["accident_insurance"]), expected.accident_insurance)
+
+    def test_progress(self):
+        """ progress report rows per second """
+        output = io.StringIO()
+        progress = stream.Progress(output, interval=3600)
+        self.assertEqual(list(progress.track(range(10))), list(range(10)))
+        self.assertEqual(progress.rows, 10)
+        self.assertIn("10 rows", output.getvalue())
+
+    def test_main(self):
+        """ command line entry point """
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "employees.csv")
+            output_path = os.path.join(directory, "result.csv")
+            configuration_path = os.path.join(directory, "configuration.json")
+            with open(input_path, "w") as f:
+                f.write(CSV_INPUT)
+            with open(configuration_path, "w") as f:
+                json.dump(CONFIGURATION, f)
+
+            stream.main([input_path, output_path, "-c", configuration_path,
+                         "--interval", "3600"])
+            with open(output_path) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 3)
+            self.assertTrue(lines[0].startswith("employee_id,monthly_tax"))
+
+if __name__ ==  '__main__' :
+    unittest.main()
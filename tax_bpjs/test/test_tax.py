@@ -187,6 +187,47 @@ class TestTax(unittest.TestCase):
         expected_result = 2,2018
         self.assertEqual(result, expected_result)
 
+    def test_calc_working_months_end_of_month(self):
+        """ day is clamped to the end of the month like relativedelta """
+        from datetime import date
+        from tax_bpjs.tax import _month_difference
+        self.assertEqual(_month_difference(date(2018, 1, 31), date(2018, 2, 28)), 0)
+        self.assertEqual(_month_difference(date(2018, 1, 31), date(2018, 3, 30)), -1)
+        self.assertEqual(_month_difference(date(2018, 3, 31), date(2018, 2, 28)), 1)
+        self.assertEqual(_month_difference(date(2016, 2, 29), date(2017, 2, 28)), -11)
+        self.assertEqual(_month_difference(date(2018, 12, 31), date(2018, 1, 1)), 11)
+
+        self.assertEqual(self.tax.working_months("31/01/2018", "28/02/2018"), (1, 2018))
+        self.assertEqual(self.tax.working_months("31/01/2018", "31/12/2018"), (12, 2018))
+        with self.assertRaises(ValueError):
+            self.tax.working_months("31/01/2018", "31/01/2019")
+
+    def test_lazy_package_attribute(self):
+        """ package expose the calculator on first use """
+        import tax_bpjs
+        self.assertIs(tax_bpjs.Tax, Tax)
+        self.assertIn("Bpjs", dir(tax_bpjs))
+        with self.assertRaises(AttributeError):
+            tax_bpjs.Unknown
+
+    def test_calc_working_months_using_date(self):
+        """ working months accept date and non zero padded date """
+        from datetime import date, datetime
+        result = self.tax.working_months(date(2018, 6, 1), datetime(2018, 12, 1))
+        self.assertEqual(result, (7, 2018))
+
+        result = self.tax.working_months("1/6/2018", "01/12/2018")
+        self.assertEqual(result, (7, 2018))
+
+        result = self.tax.working_months("15/01/2018", "01/03/2018")
+        self.assertEqual(result, (2, 2018))
+
+        with self.assertRaises(ValueError):
+            self.tax.working_months("31/02/2018", "01/12/2018")
+
+        with self.assertRaises(ValueError):
+            self.tax.working_months("2018-01-01", "01/12/2018")
+
     def test_calc_non_tax_charge(self):
         """ calculate non tax charge"""
         result = self.tax._non_tax_charge(True, 35346000)
@@ -290,5 +331,27 @@ class TestTax(unittest.TestCase):
         self.assertTrue(result["annual_tax"])
         self.assertTrue(result["annual_bpjs"])
 
+    def test_calculate_tax_with_bonus(self):
+        """ bonus tax reuse the calculation without bonus """
+        self.tax.bonus_allowances = 8000000
+        calculated_tax, deduction = self.tax.calculate_tax(1923300, 1923300)
+
+        expected = self.tax.annual_tax(8000000, 0, {"living" : 0}, 8000000)
+        self.assertEqual(calculated_tax, expected)
+        self.assertEqual(calculated_tax["total_income_result"]["bonus"], 8000000)
+
+        without_bonus = self.tax.annual_tax(8000000, 0, {"living" : 0}, 0)
+        self.assertEqual(deduction["monthly_tax"],
+                         self.tax._monthly(1923300, 12) + expected["annual_tax"] - 1923300)
+        self.assertNotEqual(without_bonus["annual_tax"], expected["annual_tax"])
+
+    def test_taxable_income_yearly_with_tax_exemption(self):
+        """ classified tax exemption give the same taxable income """
+        tax_exemption = self.tax._classify_tax_exemption("SINGLE", 5)
+        self.assertEqual(tax_exemption, self.tax._classify_tax_exemption("SINGLE", 3))
+        self.assertEqual(self.tax._taxable_income_yearly(100000000, "SINGLE", 5),
+                         self.tax._taxable_income_yearly(100000000, "SINGLE", 5,
+                                                         tax_exemption))
+
 if __name__ ==  '__main__' :
     unittest.main()
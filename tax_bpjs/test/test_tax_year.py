@@ -0,0 +1,89 @@
+import unittest
+import json
+import os
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.tax_year import TaxYear
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+__location__ = os.path.realpath(
+    os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+class TestTaxYear(unittest.TestCase):
+    """ test class for running annual tax """
+
+    def test_ingest_cassette(self):
+        """ first and last annual tax are carried like the cassette test """
+        with open(os.path.join(__location__, 'tax_case.json')) as f:
+            data = json.load(f)
+        tax_year = TaxYear(data["configuration"])
+        for case in data["case"]:
+            _, deduction = tax_year.ingest(case["input"])
+            for key, value in case["output"].items():
+                self.assertEqual(deduction[key], value)
+        self.assertEqual(tax_year.months, len(data["case"]))
+
+    def test_ingest_match_calculate_tax(self):
+        """ reused calculation is identical with calculate_tax """
+        tax_year = TaxYear(CONFIGURATION)
+        first_annual_tax, last_annual_tax = 0, 0
+        timeline = [EMPLOYEE_INFO] * 6 + [dict(EMPLOYEE_INFO, bonus_allowances=8000000)] \
+                   + [EMPLOYEE_INFO] * 5
+        for month, employee_information in enumerate(timeline):
+            expected = Tax(employee_information, CONFIGURATION).calculate_tax(
+                last_annual_tax, first_annual_tax)
+            if month == 0:
+                first_annual_tax = expected[0].annual_tax
+            last_annual_tax = expected[0].annual_tax
+            self.assertEqual(tax_year.ingest(employee_information), expected)
+
+    def test_allowances_changed_in_place(self):
+        """ allowances changed in place is not reused from the previous month """
+        tax_year = TaxYear(CONFIGURATION)
+        employee_information = dict(EMPLOYEE_INFO, fixed_allowances={"position" : 1000000},
+                                    non_fixed_allowances={"meal" : 500000})
+        tax_year.ingest(employee_information)
+        last_annual_tax = tax_year.last_annual_tax
+        first_annual_tax = tax_year.first_annual_tax
+
+        employee_information["fixed_allowances"]["position"] = 20000000
+        employee_information["non_fixed_allowances"]["meal"] = 4000000
+        expected = Tax(employee_information, CONFIGURATION).calculate_tax(
+            last_annual_tax, first_annual_tax)
+        self.assertEqual(tax_year.ingest(employee_information), expected)
+
+    def test_true_up(self):
+        """ december true up of a steady salary """
+        tax_year = TaxYear(CONFIGURATION)
+        self.assertFalse(tax_year.is_complete)
+        with self.assertRaises(ValueError):
+            tax_year.true_up()
+
+        for _ in range(12):
+            tax_year.ingest(EMPLOYEE_INFO)
+        self.assertTrue(tax_year.is_complete)
+
+        true_up = tax_year.true_up()
+        calculated_tax, deduction = Tax(EMPLOYEE_INFO, CONFIGURATION).calculate_tax(0, 0)
+        self.assertEqual(true_up.annual_bruto_income,
+                         calculated_tax.total_income_result.annual_bruto_income)
+        self.assertEqual(true_up.annual_tax, calculated_tax.annual_tax)
+        self.assertEqual(true_up.tax_withheld, deduction.monthly_tax * 12)
+        self.assertEqual(true_up.tax_due, calculated_tax.annual_tax - deduction.monthly_tax * 12)
+
+    def test_true_up_bonus(self):
+        """ bonus paid in the last month is taxed in the true up """
+        tax_year = TaxYear(CONFIGURATION, with_bpjs=False)
+        for _ in range(11):
+            tax_year.ingest(EMPLOYEE_INFO)
+        tax_year.ingest(dict(EMPLOYEE_INFO, bonus_allowances=8000000))
+
+        true_up = tax_year.true_up()
+        self.assertEqual(true_up.annual_bruto_income, 8000000 * 12 + 8000000)
+        self.assertEqual(true_up.thr_occupation_support, 400000)
+        # december deduction already withhold the bonus difference
+        self.assertGreater(true_up.annual_tax, 1923300)
+        self.assertEqual(true_up.tax_due, 0)
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from tax_bpjs.tax import Tax
+from tax_bpjs.batch import np
+from tax_bpjs.test.test_configuration import CONFIGURATION, EMPLOYEE_INFO
+
+EMPLOYEES = [
+    EMPLOYEE_INFO,
+    dict(EMPLOYEE_INFO, base_salary=12500000, npwp_status=False),
+    dict(EMPLOYEE_INFO, base_salary=45000000, marital_status="MARRIED", dependents=4),
+    dict(EMPLOYEE_INFO, base_salary=3700000, start_work_date="01/06/2018",
+         non_fixed_allowances={"living" : 450000}, overtime_allowances=120000),
+    dict(EMPLOYEE_INFO, base_salary=7950000, industry_risk_rate=1.27,
+         pension_insurance_status=False),
+    dict(EMPLOYEE_INFO, base_salary=9000000, bonus_allowances=15000000),
+]
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestWhatIf(unittest.TestCase):
+    """ test class for what if analysis """
+
+    def _annual_tax(self, configuration, with_bonus=True):
+        result = []
+        for employee_info in EMPLOYEES:
+            tax = Tax(employee_info, configuration)
+            result.append(tax.annual_tax(tax.base_salary, tax.overtime_allowances,
+                                         tax.non_fixed_allowances,
+                                         tax.bonus_allowances if with_bonus else 0))
+        return result
+
+    def test_baseline_match_scalar(self):
+        """ every employee match the scalar annual tax """
+        from tax_bpjs.whatif import WhatIf
+        result = WhatIf(EMPLOYEES, CONFIGURATION).evaluate(
+            WhatIf(EMPLOYEES, CONFIGURATION).configuration)
+        for index, expected in enumerate(self._annual_tax(CONFIGURATION)):
+            self.assertEqual(result["annual_tax"][index], expected.annual_tax)
+            self.assertEqual(result["annual_bruto_income"][index],
+                             expected.total_income_result.annual_bruto_income)
+            self.assertEqual(result["annual_net_income"][index],
+                             expected.net_income_result.annual_net_income)
+
+    def test_bonus(self):
+        """ bonus is part of the annual tax unless with_bonus is False """
+        from tax_bpjs.whatif import WhatIf
+        for with_bonus in (True, False):
+            what_if = WhatIf(EMPLOYEES, CONFIGURATION, with_bonus=with_bonus)
+            result = what_if.evaluate(what_if.configuration)
+            expected = self._annual_tax(CONFIGURATION, with_bonus)
+            self.assertEqual(list(result["annual_tax"]),
+                             [value.annual_tax for value in expected])
+            self.assertEqual(list(result["annual_bruto_income"]),
+                             [value.total_income_result.annual_bruto_income
+                              for value in expected])
+        self.assertGreater(expected[-1].annual_tax, 0)
+        self.assertLess(result["annual_tax"][-1],
+                        WhatIf(EMPLOYEES, CONFIGURATION).evaluate(
+                            what_if.configuration)["annual_tax"][-1])
+
+    def test_scenario(self):
+        """ delta and total of every scenario match the scalar calculation """
+        from tax_bpjs.whatif import what_if
+        scenarios = {
+            "health" : {"health_max_fee" : 12000000},
+            "range"  : {"pph_grade_range" : {"first" : 60000000, "second" : 250000000,
+                                             "third" : 500000000}},
+        }
+        result = what_if(EMPLOYEES, CONFIGURATION, scenarios)
+        self.assertEqual(list(result.totals), ["baseline", "health", "range"])
+
+        baseline = self._annual_tax(CONFIGURATION)
+        for name, changes in scenarios.items():
+            expected = self._annual_tax(dict(CONFIGURATION, **changes))
+            self.assertEqual(result.totals[name].annual_tax,
+                             sum(value.annual_tax for value in expected))
+            self.assertEqual(list(result.deltas[name]["annual_tax"]),
+                             [after.annual_tax - before.annual_tax
+                              for before, after in zip(baseline, expected)])
+        self.assertTrue(any(result.deltas["health"]["company_bpjs"] > 0))
+        self.assertFalse(any(result.deltas["range"]["company_bpjs"]))
+
+    def test_reuse_stage(self):
+        """ tax only change reuse the annual bpjs """
+        from tax_bpjs.whatif import WhatIf
+        what_if = WhatIf(EMPLOYEES, CONFIGURATION)
+        what_if.run({
+            "first" : {"pph_grade_rate" : {"first" : 0.06, "second": 0.15,
+                                           "third" : 0.25, "fourth": 0.30}},
+            "range" : {"pph_grade_range" : {"first" : 60000000, "second" : 250000000,
+                                            "third" : 500000000}},
+            "same"  : {},
+        })
+        self.assertEqual(len(what_if._annual_bpjs), 1)
+        self.assertEqual(len(what_if._results), 3)
+
+if __name__ ==  '__main__' :
+    unittest.main()
@@ -0,0 +1,223 @@
+"""
+    What If Analysis of Configuration Change (require numpy)
+
+    One workforce is evaluated against many candidate configuration. Every
+    stage is only calculated again when the configuration it depends on
+    change, ex : changing pph_grade_range reuse the annual BPJS of the
+    baseline, changing health_max_fee reuse the working months and salary.
+"""
+from collections import OrderedDict, namedtuple
+
+from tax_bpjs import batch
+from tax_bpjs.configuration import BPJS_KEYS, CompiledConfiguration
+from tax_bpjs.records import Record
+
+class ScenarioTotal(Record, namedtuple("ScenarioTotal", [
+        "employees",
+        "annual_bruto_income",
+        "annual_net_income",
+        "annual_tax",
+        "company_bpjs",
+        "individual_bpjs"])):
+    """ total of the whole workforce for one scenario """
+    __slots__ = ()
+#end class
+
+class WhatIfResult(Record, namedtuple("WhatIfResult", [
+        "baseline",
+        "totals",
+        "deltas"])):
+    """
+        result of every scenario
+
+        totals is scenario name -> ScenarioTotal (the baseline included),
+        deltas is scenario name -> column name -> array of the difference
+        against the baseline for every employee
+    """
+    __slots__ = ()
+#end class
+
+# per employee value compared between scenario
+DELTA_COLUMNS = ("annual_bruto_income", "annual_net_income", "annual_tax",
+                 "company_bpjs", "individual_bpjs")
+
+def _stage_key(configuration, keys):
+    """
+        Function to build the cache key of a stage
+
+        Args:
+            configuration (CompiledConfiguration): configuration
+            keys (tuple): configuration key used by the stage
+
+        Returns:
+            key (tuple) : hashable configuration value
+    """
+    return tuple(repr(configuration.source.get(key)) for key in keys)
+#end def
+
+class WhatIf:
+    """ evaluate many configuration against the same workforce """
+
+    BASELINE = "baseline"
+
+    def __init__(self, employees, configuration, with_bpjs=True, with_bonus=True):
+        """
+        Args:
+            employees (dictionary / iterable): column name -> sequence / scalar
+            like Bpjs.monthly_fee_batch, or employee information for every employee
+            configuration (dictionary / CompiledConfiguration): baseline configuration
+            with_bpjs (boolean): calculate bpjs or not
+            with_bonus (boolean): include bonus_allowances, same as
+            Tax.annual_tax_batch
+        """
+        batch.require_numpy()
+        if not isinstance(employees, dict):
+            employees = batch.employees_table(employees)
+        #end if
+        self.configuration = CompiledConfiguration.compile(configuration)
+        self.with_bpjs = with_bpjs
+        # everything that doesn't depend on the configuration
+        self.columns = batch._employee_columns(employees)
+        self.bonus = None
+        if with_bonus and "bonus_allowances" in employees:
+            self.bonus = batch._column(employees, "bonus_allowances", self.columns["size"])
+        #end if
+
+        # stage result keyed by the configuration it depends on
+        self._annual_bpjs = {}
+        self._tax_exemption = {}
+        self._results = {}
+    #end def
+
+    def scenario(self, changes):
+        """
+            Function to build the configuration of a scenario
+
+            Args:
+                changes (dictionary / CompiledConfiguration): configuration
+                value that differ from the baseline, or a whole configuration
+
+            Returns:
+                configuration (CompiledConfiguration) : configuration of the scenario
+        """
+        if isinstance(changes, CompiledConfiguration):
+            return changes
+        #end if
+        configuration = dict(self.configuration.source)
+        configuration.update(changes)
+        return CompiledConfiguration(configuration)
+    #end def
+
+    def evaluate(self, configuration):
+        """
+            Function to calculate every employee using one configuration
+
+            Args:
+                configuration (CompiledConfiguration): configuration
+
+            Returns:
+                result (dictionary) : column name of DELTA_COLUMNS -> array
+        """
+        np = batch.np
+        key = _stage_key(configuration, tuple(sorted(configuration.source)))
+        if key in self._results:
+            return self._results[key]
+        #end if
+
+        bpjs_key = _stage_key(configuration, BPJS_KEYS)
+        annual_bpjs = self._annual_bpjs.get(bpjs_key)
+        if annual_bpjs is None:
+            annual_bpjs = batch._annual_bpjs_arrays(self.columns, configuration,
+                                                    self.with_bpjs)
+            self._annual_bpjs[bpjs_key] = annual_bpjs
+        #end if
+
+        exemption_key = _stage_key(configuration, ("tax_exemption_grade",))
+        tax_exemption = self._tax_exemption.get(exemption_key)
+        if tax_exemption is None:
+            tax_exemption = batch._tax_exemption_array(self.columns, configuration)
+            self._tax_exemption[exemption_key] = tax_exemption
+        #end if
+
+        annual_tax = batch._annual_tax_arrays(self.columns, annual_bpjs, configuration,
+                                              tax_exemption, self.bonus)
+        result = {
+            "annual_bruto_income" : annual_tax["annual_bruto_income"],
+            "annual_net_income"   : annual_tax["annual_net_income"],
+            "annual_tax"          : annual_tax["annual_tax"],
+            "company_bpjs"        : np.add.reduce([
+                annual_bpjs["old_age_insurance"]["company"],
+                annual_bpjs["pension_insurance"]["company"],
+                annual_bpjs["health_insurance"]["company"],
+                annual_bpjs["death_insurance"],
+                annual_bpjs["accident_insurance"],
+            ]),
+            "individual_bpjs"     : np.add.reduce([
+                annual_bpjs["old_age_insurance"]["individual"],
+                annual_bpjs["pension_insurance"]["individual"],
+                annual_bpjs["health_insurance"]["individual"],
+            ]),
+        }
+        self._results[key] = result
+        return result
+    #end def
+
+    def run(self, scenarios):
+        """
+            evaluate every scenario against the baseline
+
+            Args:
+                scenarios (dictionary): scenario name -> configuration
+                changes, ex : {"higher cap" : {"health_max_fee" : 12000000}}
+
+            Returns:
+                WhatIfResult
+        """
+        baseline = self.evaluate(self.configuration)
+        totals = OrderedDict()
+        deltas = OrderedDict()
+        totals[self.BASELINE] = self._total(baseline)
+        for name, changes in scenarios.items():
+            result = self.evaluate(self.scenario(changes))
+            totals[name] = self._total(result)
+            deltas[name] = {
+                key : result[key] - baseline[key]
+                for key in DELTA_COLUMNS
+            }
+        #end for
+        return WhatIfResult(baseline=self.BASELINE, totals=totals, deltas=deltas)
+    #end def
+
+    def _total(self, result):
+        """
+            Function to summarize the result of a scenario
+
+            Args:
+                result (dictionary): result of evaluate
+
+            Returns:
+                ScenarioTotal
+        """
+        return ScenarioTotal(
+            employees=self.columns["size"],
+            **{key : float(result[key].sum()) for key in DELTA_COLUMNS}
+        )
+    #end def
+#end class
+
+def what_if(employees, configuration, scenarios, with_bpjs=True, with_bonus=True):
+    """
+        evaluate configuration changes against a workforce (require numpy)
+
+        Args:
+            employees (dictionary / iterable): same as WhatIf
+            configuration (dictionary / CompiledConfiguration): baseline configuration
+            scenarios (dictionary): scenario name -> configuration changes
+            with_bpjs (boolean): calculate bpjs or not
+            with_bonus (boolean): include bonus_allowances
+
+        Returns:
+            WhatIfResult
+    """
+    return WhatIf(employees, configuration, with_bpjs, with_bonus).run(scenarios)
+#end def